@@ -0,0 +1,215 @@
+"""
+Prueba de carga: endpoints síncronos en el *threadpool* contra el *event loop*.
+
+Levanta la aplicación con uvicorn en un proceso aparte, sobre una base SQLite
+temporal con estudiantes, cursos y matrículas, y le envía peticiones concurrentes
+en dos modos:
+
+* `threadpool`: el comportamiento actual, los endpoints `def` se ejecutan en el
+  *threadpool* de FastAPI.
+* `loop`: el comportamiento anterior, el cuerpo del endpoint se ejecuta en el
+  *event loop* (como un `async def` que llama a la sesión síncrona), así que cada
+  consulta detiene al resto de peticiones.
+
+Con `--latencia-db` cada sentencia SQL espera esos milisegundos antes de
+ejecutarse, como el viaje de red a un PostgreSQL remoto; esa espera es la que el
+*threadpool* puede solapar entre peticiones.
+
+Además de las peticiones por segundo se mide la latencia de `GET /`, que no toca
+la base de datos: muestra cuánto espera una petición ligera detrás de las
+consultas de las demás.
+
+Con una concurrencia mayor que el pool (`DB_POOL_SIZE` + `DB_MAX_OVERFLOW`) el
+modo `loop` puede quedar bloqueado hasta el `pool_timeout`: el endpoint espera una
+conexión en el *event loop* y las sesiones que la liberarían no pueden cerrarse.
+
+Uso:
+
+    python benchmarks/threadpool.py --peticiones 4000 --concurrencia 16 --escrituras 5
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+RAIZ = Path(__file__).resolve().parents[1]
+ESTUDIANTES = 20000
+CURSOS = 200
+
+
+def servir(modo: str, puerto: int, latenciaDB: float):
+    """
+    Ejecutar la aplicación con uvicorn en el modo indicado (proceso hijo).
+    """
+    import uvicorn
+    import fastapi.routing
+    from sqlalchemy import event
+
+    if modo == "loop":
+        async def enElLoop(funcion, *args, **kwargs):
+            return funcion(*args, **kwargs)
+
+        fastapi.routing.run_in_threadpool = enElLoop
+
+    sys.path.insert(0, str(RAIZ.parent))
+    app = __import__(f"{RAIZ.name}.main", fromlist=["app"]).app
+    if latenciaDB:
+        engine = __import__(f"{RAIZ.name}.db.db", fromlist=["engine"]).engine
+        event.listen(engine, "before_cursor_execute", lambda *args: time.sleep(latenciaDB / 1000))
+    uvicorn.run(app, port=puerto, log_level="warning")
+
+
+def puertoLibre() -> int:
+    with socket.socket() as conexion:
+        conexion.bind(("127.0.0.1", 0))
+        return conexion.getsockname()[1]
+
+
+def iniciarServidor(modo: str, entorno: dict, latenciaDB: float) -> tuple[subprocess.Popen, str]:
+    puerto = puertoLibre()
+    proceso = subprocess.Popen([
+        sys.executable, "-W", "ignore", __file__,
+        "--servir", modo, "--puerto", str(puerto), "--latencia-db", str(latenciaDB)
+    ], env=entorno)
+    url = f"http://127.0.0.1:{puerto}"
+    for _ in range(200):
+        try:
+            httpx.get(f"{url}/")
+            return proceso, url
+        except httpx.TransportError:
+            time.sleep(0.05)
+    proceso.kill()
+    raise RuntimeError("El servidor no inicio")
+
+
+def rutas(cantidad: int, escrituras: int = 0) -> list[str]:
+    """
+    Mezcla de lecturas: por llave, filtros con prefijo y listados paginados. Con
+    `escrituras` mayor a 0, una de cada `escrituras` peticiones actualiza un estudiante.
+    """
+    plantillas = [
+        lambda numero: f"/estudiante/cedula/{1000000 + numero % ESTUDIANTES}",
+        lambda numero: f"/curso/codigo/CUR{numero % CURSOS:04d}",
+        lambda numero: f"/estudiante/filtrar?nombre=EST{numero % 10}&limit=50",
+        lambda numero: "/estudiante/todos?limit=200",
+        lambda numero: f"/matricula/curso/CUR{numero % CURSOS:04d}",
+    ]
+    return [
+        f"PATCH /estudiante/{1000000 + numero % ESTUDIANTES}/actualizar"
+        if escrituras and numero % escrituras == 0 else plantillas[numero % len(plantillas)](numero)
+        for numero in range(cantidad)
+    ]
+
+
+async def poblar(url: str):
+    filas = [f"{1000000 + numero},est{numero},e{numero}@ucatolica.edu.co,1" for numero in range(ESTUDIANTES)]
+    contenido = "\n".join(["cedula,nombre,email,semestre"] + filas).encode("utf-8")
+    async with httpx.AsyncClient(base_url=url, timeout=120) as cliente:
+        respuesta = await cliente.post("/estudiante/importar", files={"archivo": ("e.csv", contenido, "text/csv")})
+        respuesta.raise_for_status()
+        for numero in range(CURSOS):
+            await cliente.post("/curso/crear", data=dict(
+                codigo=f"CUR{numero:04d}", nombre=f"curso {numero}", creditos="3", horario="SIETE_A_NUEVE"
+            ))
+        for numero in range(0, ESTUDIANTES, 10):
+            await cliente.post("/matricula/matricular-estudiante", data=dict(
+                codigo=f"CUR{numero % CURSOS:04d}", cedula=str(1000000 + numero)
+            ))
+
+
+def percentil(latencias: list[float], fraccion: float) -> float:
+    ordenadas = sorted(latencias)
+    return ordenadas[max(int(len(ordenadas) * fraccion) - 1, 0)] * 1000
+
+
+async def medir(url: str, peticiones: int, concurrencia: int, escrituras: int) -> dict:
+    latencias = []
+    latenciasInicio = []
+    pendientes = iter(rutas(peticiones, escrituras))
+    terminado = asyncio.Event()
+
+    async def trabajador(cliente: httpx.AsyncClient):
+        for ruta in pendientes:
+            inicio = time.perf_counter()
+            if ruta.startswith("PATCH "):
+                respuesta = await cliente.patch(ruta.removeprefix("PATCH "), data={"semestre": "2"})
+            else:
+                respuesta = await cliente.get(ruta)
+            latencias.append(time.perf_counter() - inicio)
+            assert respuesta.status_code < 500, respuesta.text
+
+    async def sonda(cliente: httpx.AsyncClient):
+        while not terminado.is_set():
+            inicio = time.perf_counter()
+            await cliente.get("/")
+            latenciasInicio.append(time.perf_counter() - inicio)
+            await asyncio.sleep(0.01)
+
+    limites = httpx.Limits(max_connections=concurrencia + 1)
+    async with httpx.AsyncClient(base_url=url, limits=limites, timeout=120) as cliente:
+        # Calentar el pool de conexiones y las cachés
+        await asyncio.gather(*(cliente.get(ruta) for ruta in rutas(concurrencia)))
+        tareaSonda = asyncio.create_task(sonda(cliente))
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabajador(cliente) for _ in range(concurrencia)))
+        duracion = time.perf_counter() - inicio
+        terminado.set()
+        await tareaSonda
+
+    return {
+        "rps": peticiones / duracion,
+        "p50": percentil(latencias, 0.5),
+        "p99": percentil(latencias, 0.99),
+        "inicioP50": percentil(latenciasInicio, 0.5),
+        "inicioP99": percentil(latenciasInicio, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--peticiones", type=int, default=4000)
+    parser.add_argument("--concurrencia", type=int, default=16)
+    parser.add_argument("--escrituras", type=int, default=0,
+                        help="una de cada N peticiones es una escritura (0: solo lecturas)")
+    parser.add_argument("--latencia-db", type=float, default=0,
+                        help="milisegundos de espera antes de cada sentencia SQL")
+    parser.add_argument("--servir", choices=["threadpool", "loop"], help=argparse.SUPPRESS)
+    parser.add_argument("--puerto", type=int, help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    if argumentos.servir:
+        servir(argumentos.servir, argumentos.puerto, argumentos.latencia_db)
+        return
+
+    directorio = tempfile.mkdtemp(prefix="universidad-carga-")
+    entorno = {**os.environ, "DATABASE_URL": f"sqlite:///{Path(directorio, 'universidad.sqlite3')}"}
+    # La base se llena una sola vez y sin latencia simulada
+    proceso, url = iniciarServidor("threadpool", entorno, 0)
+    try:
+        asyncio.run(poblar(url))
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+    for modo in ("threadpool", "loop"):
+        proceso, url = iniciarServidor(modo, entorno, argumentos.latencia_db)
+        try:
+            resultado = asyncio.run(medir(url, argumentos.peticiones, argumentos.concurrencia, argumentos.escrituras))
+        finally:
+            proceso.terminate()
+            proceso.wait()
+        print(f"{modo:>10}: {resultado['rps']:7.1f} req/s  "
+              f"p50 {resultado['p50']:6.1f} ms  p99 {resultado['p99']:6.1f} ms  "
+              f"GET / p50 {resultado['inicioP50']:6.1f} ms  p99 {resultado['inicioP99']:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Módulo: busqueda
+----------------
+Índices de búsqueda por nombre de cursos y estudiantes.
+
+Cada índice se carga completo desde la base de datos en la primera búsqueda y
+después se mantiene al día desde los *endpoints* que crean o eliminan registros
+(el nombre no se puede modificar). Si otras peticiones escriben mientras se lee
+la tabla la carga se descarta y se reintenta hasta `REINTENTOS_CARGA` veces; si
+ninguna se acepta, la búsqueda se responde con un índice temporal armado con las
+filas recién leídas, así nunca se busca sobre un índice vacío.
+
+El índice es local a cada proceso, así que se sincroniza con los cambios de los
+demás procesos antes de buscar, como mucho una vez cada `BUSQUEDA_INTERVALO`
+segundos (1 por defecto):
+
+* Una consulta por índice obtiene la cantidad de registros y el mayor `id` de la
+  tabla, y se agregan los registros con `id` mayor al de la última
+  sincronización.
+* Si la cantidad de claves del índice no coincide con la de la tabla (otro
+  proceso eliminó registros) o pasaron `BUSQUEDA_TTL` segundos (60 por defecto)
+  desde la última comparación completa, se comparan todas las claves del
+  índice con las de la tabla.
+
+El índice devuelve las claves de la página pedida y solo esos registros se leen
+por clave; las claves que ya no están en la tabla se quitan del índice y no
+cuentan en el total.
+"""
+
+import os
+import time
+from sqlmodel import select, func
+from .db import SessionDep
+from ..models.curso import Curso
+from ..models.estudiante import Estudiante
+from ..utils.busqueda import IndiceBusqueda
+from ..utils.lotes import fragmentar
+
+indiceCursos = IndiceBusqueda()
+indiceEstudiantes = IndiceBusqueda()
+
+# Segundos entre comparaciones completas de las claves del indice con la tabla
+BUSQUEDA_TTL = float(os.getenv("BUSQUEDA_TTL", "60"))
+
+# Segundos minimos entre sincronizaciones con los cambios de otros procesos
+BUSQUEDA_INTERVALO = float(os.getenv("BUSQUEDA_INTERVALO", "1"))
+
+# Intentos de carga completa del indice antes de buscar sobre las filas leidas
+REINTENTOS_CARGA = 3
+
+# Cantidad maxima de claves por consulta IN al leer los nombres de registros nuevos
+TAMANO_LOTE_BUSQUEDA = 500
+
+
+def sincronizarIndice(session: SessionDep, indice: IndiceBusqueda, modelo, llave) -> IndiceBusqueda:
+
+    """
+    Cargar el índice de un modelo o ponerlo al día con los cambios de la tabla.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        indice (IndiceBusqueda): Índice del modelo.
+        modelo: Modelo de la tabla (`Curso` o `Estudiante`).
+        llave: Columna con la que se indexa cada registro.
+
+    Returns:
+        IndiceBusqueda: Índice sobre el que se busca: el del modelo o, si no se
+            pudo cargar, uno temporal con las filas leídas de la tabla.
+    """
+
+    # Cargar el indice completo si todavia no se ha hecho
+    if not indice.cargado:
+        for _ in range(REINTENTOS_CARGA):
+            generacion = indice.generacion
+            filas = session.exec(select(modelo.id, llave, modelo.nombre)).all()
+            if indice.cargar(((clave, nombre) for _, clave, nombre in filas), generacion):
+                indice.maximo = max((fila.id for fila in filas), default=0)
+                indice.verificado = indice.sincronizado = time.monotonic()
+                return indice
+
+        # Otras peticiones siguen escribiendo: buscar sobre las filas ya leidas
+        temporal = IndiceBusqueda()
+        temporal.cargar(((clave, nombre) for _, clave, nombre in filas), temporal.generacion)
+        return temporal
+
+    # Consultar los cambios de otros procesos como mucho una vez por intervalo
+    ahora = time.monotonic()
+    if ahora - indice.sincronizado < BUSQUEDA_INTERVALO:
+        return indice
+
+    generacion = indice.generacion
+    cantidad, maximo = session.exec(select(func.count(), func.max(modelo.id))).one()
+
+    # Registros creados despues de la ultima sincronizacion
+    nuevos = session.exec(
+        select(modelo.id, llave, modelo.nombre).where(modelo.id > indice.maximo)
+    ).all() if (maximo or 0) > indice.maximo else []
+    agregados = [(clave, nombre) for _, clave, nombre in nuevos if clave not in indice]
+    eliminadas = set()
+
+    # Comparar todas las claves si faltan o sobran registros o si vencio el TTL
+    comparar = len(indice) + len(agregados) != cantidad or ahora - indice.verificado >= BUSQUEDA_TTL
+    if comparar:
+        # Leer las claves sin pasar por el ORM: en tablas grandes es varias veces mas rapido
+        existentes = set(session.connection().execute(select(llave)).scalars())
+        indexadas = indice.claves()
+        eliminadas = indexadas - existentes
+        faltantes = existentes - indexadas - {clave for clave, _ in agregados}
+        for fragmento in fragmentar(faltantes, TAMANO_LOTE_BUSQUEDA):
+            agregados += session.exec(select(llave, modelo.nombre).where(llave.in_(fragmento))).all()
+
+    if indice.sincronizar(agregados, eliminadas, generacion):
+        indice.maximo = max([indice.maximo] + [fila.id for fila in nuevos])
+        indice.sincronizado = ahora
+        if comparar:
+            indice.verificado = ahora
+    return indice
+
+
+def buscarRegistros(
+    session: SessionDep,
+    indice: IndiceBusqueda,
+    modelo,
+    llave,
+    consulta: str,
+    limite: int,
+    desplazamiento: int
+    ) -> tuple[int, list]:
+
+    """
+    Buscar registros por nombre usando el índice en memoria del modelo.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        indice (IndiceBusqueda): Índice del modelo.
+        modelo: Modelo de la tabla (`Curso` o `Estudiante`).
+        llave: Columna con la que se indexa cada registro.
+        consulta (str): Texto a buscar.
+        limite (int): Cantidad máxima de resultados.
+        desplazamiento (int): Resultados a omitir.
+
+    Returns:
+        tuple[int, list]: Total de coincidencias y registros de la página, del
+            más al menos parecido.
+    """
+
+    indice = sincronizarIndice(session, indice, modelo, llave)
+
+    total, resultados = indice.buscar(consulta, limite, desplazamiento)
+    claves = [clave for clave, _ in resultados]
+    registros = {getattr(registro, llave.key): registro for registro in session.exec(select(modelo).where(llave.in_(claves))).all()}
+
+    # Quitar del indice y del total los registros que otro proceso elimino despues de sincronizar
+    for clave in claves:
+        if clave not in registros:
+            indice.eliminar(clave)
+            total -= 1
+    return total, [registros[clave] for clave in claves if clave in registros]
+
+
+def buscarCursos(session: SessionDep, consulta: str, limite: int, desplazamiento: int) -> tuple[int, list[Curso]]:
+    """
+    Buscar cursos por nombre.
+    """
+    return buscarRegistros(session, indiceCursos, Curso, Curso.codigo, consulta, limite, desplazamiento)
+
+
+def buscarEstudiantes(session: SessionDep, consulta: str, limite: int, desplazamiento: int) -> tuple[int, list[Estudiante]]:
+    """
+    Buscar estudiantes por nombre.
+    """
+    return buscarRegistros(session, indiceEstudiantes, Estudiante, Estudiante.cedula, consulta, limite, desplazamiento)
@@ -0,0 +1,134 @@
+"""
+Módulo: cache
+-------------
+Cachés de lectura de los registros más consultados por los routers.
+
+Los cursos cambian muy poco y casi todos los *endpoints* los buscan por código,
+y los estudiantes se buscan por cédula (o email) en casi todas las validaciones.
+Se guardan copias desacopladas de la sesión en una `CacheLRU` por entidad, y los
+*endpoints* de escritura de cada router invalidan la entrada de forma explícita.
+
+El tamaño (cantidad máxima de registros en memoria) y el tiempo de vida se
+configuran con las variables de entorno `CACHE_CURSOS_TAMANO`, `CACHE_CURSOS_TTL`,
+`CACHE_ESTUDIANTES_TAMANO` y `CACHE_ESTUDIANTES_TTL` (segundos).
+
+Los listados del catálogo de cursos también se pueden cachear en el cliente:
+`versionCursos` cambia con cada escritura del router de cursos y alimenta sus
+`ETag`. `CACHE_HTTP_MAX_AGE` define el `max-age` de esas respuestas (0 por
+defecto, es decir, el cliente siempre revalida).
+"""
+
+import os
+from typing import Optional
+from sqlmodel import select
+from .db import SessionDep
+from ..models.curso import Curso
+from ..models.estudiante import Estudiante
+from ..utils.cache import CacheLRU
+from ..utils.versiones import VersionTabla
+
+cacheCursos = CacheLRU(
+    tamanoMaximo=int(os.getenv("CACHE_CURSOS_TAMANO", "1024")),
+    ttl=float(os.getenv("CACHE_CURSOS_TTL", "300"))
+)
+
+# Version de la tabla de cursos para las respuestas condicionales del catalogo
+versionCursos = VersionTabla(
+    "cursos",
+    ttl=float(os.getenv("CACHE_CURSOS_TTL", "300")),
+    maxAge=int(os.getenv("CACHE_HTTP_MAX_AGE", "0"))
+)
+
+# Cache de estudiantes por cedula con indice secundario por email
+cacheEstudiantes = CacheLRU(
+    tamanoMaximo=int(os.getenv("CACHE_ESTUDIANTES_TAMANO", "10000")),
+    ttl=float(os.getenv("CACHE_ESTUDIANTES_TTL", "300")),
+    claveSecundaria=lambda estudiante: estudiante.email
+)
+
+
+def obtenerCurso(session: SessionDep, codigo: str) -> Optional[Curso]:
+
+    """
+    Obtener un curso por código, consultando primero la caché.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        codigo (str): Código del curso en mayúsculas.
+
+    Returns:
+        Optional[Curso]: Copia del curso no asociada a la sesión, o `None` si no existe.
+    """
+
+    cursoCache = cacheCursos.obtener(codigo)
+    if cursoCache is not None:
+        return cursoCache
+
+    generacion = cacheCursos.generacion
+    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
+    if not cursoDB:
+        return None
+
+    curso = Curso.model_validate(cursoDB.model_dump())
+    cacheCursos.guardar(codigo, curso, generacion)
+    return curso
+
+
+
+def guardarEstudiante(estudianteDB: Estudiante, generacion: int) -> Estudiante:
+
+    """
+    Guardar en la caché una copia desacoplada de un estudiante leído de la base de datos.
+    """
+
+    estudiante = Estudiante.model_validate(estudianteDB.model_dump())
+    cacheEstudiantes.guardar(estudiante.cedula, estudiante, generacion)
+    return estudiante
+
+
+def obtenerEstudiante(session: SessionDep, cedula: str) -> Optional[Estudiante]:
+
+    """
+    Obtener un estudiante por cédula, consultando primero la caché.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        cedula (str): Cédula del estudiante.
+
+    Returns:
+        Optional[Estudiante]: Copia del estudiante no asociada a la sesión, o `None` si no existe.
+    """
+
+    estudianteCache = cacheEstudiantes.obtener(cedula)
+    if estudianteCache is not None:
+        return estudianteCache
+
+    generacion = cacheEstudiantes.generacion
+    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
+    if not estudianteDB:
+        return None
+    return guardarEstudiante(estudianteDB, generacion)
+
+
+def obtenerEstudiantePorEmail(session: SessionDep, email: str) -> Optional[Estudiante]:
+
+    """
+    Obtener un estudiante por email usando el índice secundario de la caché.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        email (str): Email del estudiante en minúsculas.
+
+    Returns:
+        Optional[Estudiante]: Copia del estudiante no asociada a la sesión, o `None` si no existe.
+    """
+
+    estudianteCache = cacheEstudiantes.obtenerPorIndice(email)
+    if estudianteCache is not None:
+        return estudianteCache
+
+    generacion = cacheEstudiantes.generacion
+    estudianteDB = session.exec(select(Estudiante).where(Estudiante.email == email)).first()
+    if not estudianteDB:
+        return None
+    return guardarEstudiante(estudianteDB, generacion)
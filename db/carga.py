@@ -0,0 +1,51 @@
+"""
+Módulo: carga
+-------------
+Validación de la carga académica de un estudiante: cruces de horario y máximo
+de créditos.
+
+Cada valor de `HorarioCurso` ocupa un bit de la máscara de horarios, así un cruce
+es `horarios & bit != 0` y el máximo de créditos es una suma.
+
+Mientras un estudiante solo pueda tener un curso activo, quien pasa esa regla no
+tiene carga y los endpoints validan con `conflictoCarga(0, 0, ...)` sin consultar
+nada más. Una carga precalculada por estudiante solo compensa cuando esa regla
+se relaje; mantenerla antes agregaría una escritura a cada cambio de matrícula.
+"""
+
+import os
+from typing import Optional
+from ..utils.enum import CreditosCurso, HorarioCurso
+
+# Maximo de creditos que puede sumar un estudiante en sus matriculas activas
+MAX_CREDITOS = int(os.getenv("MAX_CREDITOS", "20"))
+
+# Bit de la mascara de horarios que corresponde a cada horario
+BITS_HORARIO = {horario: 1 << posicion for posicion, horario in enumerate(HorarioCurso)}
+
+
+def conflictoCarga(
+    horarios: int,
+    creditos: int,
+    horario: HorarioCurso,
+    creditosNuevos: CreditosCurso
+    ) -> Optional[str]:
+
+    """
+    Validar si un curso cabe en la carga académica de un estudiante.
+
+    Args:
+        horarios (int): Máscara de horarios ocupados por el estudiante.
+        creditos (int): Créditos de sus matrículas activas.
+        horario (HorarioCurso): Horario del curso a matricular.
+        creditosNuevos (CreditosCurso): Créditos del curso a matricular.
+
+    Returns:
+        Optional[str]: Mensaje del conflicto, o `None` si el curso cabe.
+    """
+
+    if horarios & BITS_HORARIO[horario]:
+        return "El horario del curso se cruza con otro curso del estudiante"
+    if creditos + int(creditosNuevos.value) > MAX_CREDITOS:
+        return f"El estudiante no puede superar {MAX_CREDITOS} creditos"
+    return None
@@ -0,0 +1,132 @@
+"""
+Módulo: conteos
+---------------
+Mantenimiento de los contadores de matrículas por curso (`CursoConteo`).
+
+Cada cambio de estado de una matrícula ajusta los contadores con un
+`UPDATE ... SET columna = columna + n` dentro de la misma transacción del
+cambio, por lo que los contadores nunca quedan desfasados de la tabla
+`Matricula` y las actualizaciones concurrentes no se pisan.
+
+Cuando una matrícula pasa a MATRICULADO el mismo `UPDATE` reserva el cupo: solo
+se aplica si `matriculados + n` no supera el `cupo` del curso. Como la condición
+y el incremento son una sola sentencia, no hay sobrecupo aunque miles de
+peticiones lleguen a la vez al mismo curso.
+"""
+
+from typing import Optional
+from sqlmodel import select, insert, update, func, case, or_
+from .db import SessionDep
+from ..models.curso import Curso, CursoConteo
+from ..models.matricula import Matricula
+from ..utils.enum import EstadoMatricula
+
+# Columna del contador que corresponde a cada estado de matricula
+COLUMNAS_CONTEO = {
+    EstadoMatricula.MATRICULADO: "matriculados",
+    EstadoMatricula.FINALIZADO: "finalizados",
+    EstadoMatricula.DESMATRICULADO: "desmatriculados",
+}
+
+
+def ajustarConteo(
+    session: SessionDep,
+    codigo: str,
+    anterior: Optional[EstadoMatricula],
+    nuevo: Optional[EstadoMatricula],
+    cantidad: int = 1
+    ) -> bool:
+
+    """
+    Registrar en los contadores de un curso el cambio de estado de matrículas.
+
+    Si el estado nuevo es MATRICULADO, la actualización solo se aplica cuando el
+    curso tiene cupo para las `cantidad` matrículas.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        codigo (str): Código del curso.
+        anterior (Optional[EstadoMatricula]): Estado anterior (`None` si la matrícula es nueva).
+        nuevo (Optional[EstadoMatricula]): Estado nuevo (`None` si la matrícula se elimina).
+        cantidad (int): Cantidad de matrículas que cambian.
+
+    Returns:
+        bool: `False` si el curso no tenía cupo suficiente y no se cambió nada.
+    """
+
+    if anterior == nuevo or cantidad == 0:
+        return True
+
+    valores = {}
+    if anterior is not None:
+        columna = COLUMNAS_CONTEO[anterior]
+        valores[columna] = getattr(CursoConteo, columna) - cantidad
+    if nuevo is not None:
+        columna = COLUMNAS_CONTEO[nuevo]
+        valores[columna] = getattr(CursoConteo, columna) + cantidad
+
+    consulta = update(CursoConteo).where(CursoConteo.codigo == codigo).values(**valores)
+    if nuevo == EstadoMatricula.MATRICULADO:
+        cupo = select(Curso.cupo).where(Curso.codigo == codigo).scalar_subquery()
+        consulta = consulta.where(or_(cupo.is_(None), CursoConteo.matriculados + cantidad <= cupo))
+
+    resultado = session.exec(consulta.execution_options(synchronize_session=False))
+    return resultado.rowcount > 0
+
+
+def descontarMatriculas(session: SessionDep, condicion):
+
+    """
+    Descontar de los contadores las matrículas que se van a eliminar.
+
+    Resta con una sola sentencia, para cada curso afectado, las matrículas que
+    cumplen `condicion` agrupadas por estado. Debe ejecutarse antes del `DELETE`.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        condicion: Condición sobre `Matricula` de las filas a eliminar.
+    """
+
+    def eliminadas(estado: EstadoMatricula):
+        return select(func.count(Matricula.id)).where(
+            condicion,
+            Matricula.codigo == CursoConteo.codigo,
+            Matricula.matriculado == estado
+        ).scalar_subquery()
+
+    session.exec(
+        update(CursoConteo)
+            .where(CursoConteo.codigo.in_(select(Matricula.codigo).where(condicion)))
+            .values({
+                getattr(CursoConteo, columna): getattr(CursoConteo, columna) - eliminadas(estado)
+                for estado, columna in COLUMNAS_CONTEO.items()
+            })
+            .execution_options(synchronize_session=False)
+    )
+
+
+def sincronizarConteos(session: SessionDep):
+
+    """
+    Crear los contadores que falten, calculándolos desde la tabla `Matricula`.
+
+    Se ejecuta al iniciar la aplicación para las bases de datos creadas antes de
+    que existieran los contadores.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+    """
+
+    def contar(estado: EstadoMatricula):
+        return func.count(case((Matricula.matriculado == estado, Matricula.id)))
+
+    session.exec(
+        insert(CursoConteo).from_select(
+            ["codigo", *COLUMNAS_CONTEO.values()],
+            select(Curso.codigo, *(contar(estado) for estado in COLUMNAS_CONTEO))
+                .outerjoin(Matricula, Matricula.codigo == Curso.codigo)
+                .where(Curso.codigo.not_in(select(CursoConteo.codigo)))
+                .group_by(Curso.codigo)
+        )
+    )
+    session.commit()
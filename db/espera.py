@@ -0,0 +1,116 @@
+"""
+Módulo: espera
+--------------
+Promoción de la lista de espera (`ListaEspera`) de los cursos con cupo.
+
+Cuando se liberan cupos se matricula a los primeros estudiantes de la cola del
+curso. Las cabezas se leen por el índice `(codigo, id)`, así cada promoción no
+depende del largo de la lista, y se procesan por lotes: una consulta para sus
+matrículas, un `DELETE`, un `UPDATE`, un `INSERT` masivo y el ajuste de los
+contadores. Los estudiantes que ya no pueden matricularse (activos en otro curso,
+que ya finalizaron el curso o a los que no les cabe en su carga académica) se
+retiran de la cola sin ocupar cupo.
+"""
+
+from datetime import datetime as dt
+from sqlmodel import select, insert, update, delete, or_
+from .db import SessionDep
+from .conteos import ajustarConteo
+from .carga import conflictoCarga
+from ..models.curso import Curso, CursoConteo
+from ..models.matricula import Matricula, ListaEspera
+from ..utils.enum import EstadoMatricula
+
+# Cantidad maxima de estudiantes de la cola que se promueven por consulta
+TAMANO_LOTE_PROMOCION = 500
+
+
+def promoverListaEspera(session: SessionDep, codigo: str) -> list[str]:
+    """
+    Matricular a los primeros estudiantes de la lista de espera de un curso hasta
+    ocupar sus cupos libres.
+
+    Se ejecuta en la transacción que liberó los cupos. Primero se bloquea la fila
+    de contadores del curso (`SELECT ... FOR UPDATE` en PostgreSQL; en SQLite la
+    transacción ya tiene el bloqueo de escritura), así dos peticiones que liberan
+    cupos del mismo curso promueven una después de la otra y nunca al mismo
+    estudiante ni por encima del cupo.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        codigo (str): Código del curso con cupos liberados.
+
+    Returns:
+        list[str]: Cédulas de los estudiantes matriculados, en orden de la cola.
+    """
+
+    # Bloquear los contadores del curso y calcular sus cupos libres
+    curso = session.exec(
+        select(Curso.cupo, Curso.horario, Curso.creditos, CursoConteo.matriculados)
+            .join(CursoConteo, CursoConteo.codigo == Curso.codigo)
+            .where(Curso.codigo == codigo)
+            .with_for_update(of=CursoConteo)
+        ).first()
+    if curso is None or curso.cupo is None:
+        return []
+    libres = curso.cupo - curso.matriculados
+    # Quien no tiene un curso activo solo suma la carga de este curso
+    cabeEnCarga = conflictoCarga(0, 0, curso.horario, curso.creditos) is None
+
+    promovidos = []
+    while len(promovidos) < libres:
+        # Primeros estudiantes de la cola del curso
+        cabezas = session.exec(
+            select(ListaEspera.id, ListaEspera.cedula)
+                .where(ListaEspera.codigo == codigo)
+                .order_by(ListaEspera.id)
+                .limit(min(libres - len(promovidos), TAMANO_LOTE_PROMOCION))
+            ).all()
+        if not cabezas:
+            break
+
+        # Matriculas de esos estudiantes en el curso o activas en cualquier curso
+        cedulas = [cabeza.cedula for cabeza in cabezas]
+        matriculas = session.exec(
+            select(Matricula.cedula, Matricula.codigo, Matricula.matriculado).where(
+                Matricula.cedula.in_(cedulas),
+                or_(Matricula.codigo == codigo, Matricula.matriculado == EstadoMatricula.MATRICULADO)
+            )
+        ).all()
+        activos = {matricula.cedula for matricula in matriculas if matricula.matriculado == EstadoMatricula.MATRICULADO}
+        estadoEnCurso = {matricula.cedula: matricula.matriculado for matricula in matriculas if matricula.codigo == codigo}
+
+        # Separar a quienes se matriculan de quienes ya no pueden hacerlo
+        nuevas, reactivadas, lote = [], [], []
+        for cedula in cedulas:
+            if cedula in activos or estadoEnCurso.get(cedula) == EstadoMatricula.FINALIZADO or not cabeEnCarga:
+                continue
+            if estadoEnCurso.get(cedula) == EstadoMatricula.DESMATRICULADO:
+                reactivadas.append(cedula)
+            else:
+                nuevas.append(cedula)
+            lote.append(cedula)
+
+        # Sacar de la cola a todo el lote y matricular a los elegibles
+        session.exec(delete(ListaEspera).where(ListaEspera.id.in_([cabeza.id for cabeza in cabezas])))
+        if reactivadas:
+            session.exec(
+                update(Matricula)
+                    .where(Matricula.codigo == codigo, Matricula.cedula.in_(reactivadas))
+                    .values(matriculado=EstadoMatricula.MATRICULADO)
+                    .execution_options(synchronize_session=False)
+            )
+            ajustarConteo(session, codigo, EstadoMatricula.DESMATRICULADO, EstadoMatricula.MATRICULADO, len(reactivadas))
+        if nuevas:
+            fecha = dt.now()
+            session.exec(
+                insert(Matricula),
+                params=[
+                    {"codigo": codigo, "cedula": cedula, "matriculado": EstadoMatricula.MATRICULADO, "fecha": fecha}
+                    for cedula in nuevas
+                ]
+            )
+            ajustarConteo(session, codigo, None, EstadoMatricula.MATRICULADO, len(nuevas))
+        promovidos.extend(lote)
+
+    return promovidos
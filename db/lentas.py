@@ -0,0 +1,169 @@
+"""
+Módulo: lentas
+--------------
+Registro opcional de las consultas SQL lentas.
+
+Se activa con `CONSULTAS_LENTAS_MS`: cada sentencia que tarde al menos esos
+milisegundos se guarda con:
+
+* el SQL y sus parámetros (de un `executemany` solo la primera fila y la
+  cantidad),
+* la función que la originó, buscando en la pila el *endpoint* del router (por
+  ejemplo `curso_router.eliminarCurso`) o, si no hay, la primera función de la
+  aplicación,
+* el plan de `EXPLAIN QUERY PLAN` en SQLite, que muestra si la consulta recorre
+  una tabla completa (`SCAN`) o usa un índice (`SEARCH ... USING INDEX`).
+
+Las últimas `CONSULTAS_LENTAS_TAMANO` consultas quedan en memoria (búfer
+circular) y se consultan en `/admin/consultas-lentas`; además cada una se
+escribe en el *logger* `universidad.consultasLentas`, al que se le puede
+agregar un archivo rotativo. Sin `CONSULTAS_LENTAS_MS` no se registra ningún
+evento en el motor y no hay costo por consulta.
+"""
+
+import logging
+import os
+import sys
+import threading
+from collections import deque
+from datetime import datetime as dt
+from time import perf_counter
+from sqlalchemy import event
+
+UMBRAL_CONSULTA_LENTA = float(os.getenv("CONSULTAS_LENTAS_MS", "0")) / 1000
+TAMANO_CONSULTAS_LENTAS = int(os.getenv("CONSULTAS_LENTAS_TAMANO", "100"))
+
+# Largo maximo del texto de los parametros guardados
+LARGO_PARAMETROS = 1000
+
+logger = logging.getLogger("universidad.consultasLentas")
+
+# Paquete de la aplicacion, para reconocer sus funciones en la pila
+PAQUETE = __name__.rsplit(".", 2)[0]
+
+
+class RegistroConsultasLentas:
+    """
+    Búfer circular con las últimas consultas lentas.
+
+    Attributes:
+        umbral (float): Duración mínima en segundos para registrar una consulta.
+    """
+
+    def __init__(self, umbral: float, tamano: int):
+        self.umbral = umbral
+        self._consultas = deque(maxlen=tamano)
+        self._lock = threading.Lock()
+
+    def agregar(self, consulta: dict):
+        """
+        Guardar una consulta lenta, descartando la más antigua si está lleno.
+        """
+        with self._lock:
+            self._consultas.append(consulta)
+
+    def listar(self) -> list[dict]:
+        """
+        Obtener las consultas guardadas, de la más reciente a la más antigua.
+        """
+        with self._lock:
+            return list(reversed(self._consultas))
+
+    def limpiar(self):
+        """
+        Vaciar el búfer.
+        """
+        with self._lock:
+            self._consultas.clear()
+
+
+registroConsultasLentas = RegistroConsultasLentas(UMBRAL_CONSULTA_LENTA, TAMANO_CONSULTAS_LENTAS)
+
+
+def funcionOrigen() -> str:
+    """
+    Buscar en la pila la función del router (o de la aplicación) que hizo la consulta.
+    """
+    primera = None
+    marco = sys._getframe(2)
+    while marco is not None:
+        modulo = marco.f_globals.get("__name__", "")
+        if modulo.startswith(f"{PAQUETE}.") and modulo != __name__:
+            nombre = f"{modulo.rsplit('.', 1)[-1]}.{marco.f_code.co_name}"
+            if f"{PAQUETE}.routers." in modulo:
+                return nombre
+            primera = primera or nombre
+        marco = marco.f_back
+    return primera or "desconocido"
+
+
+def textoParametros(parametros, executemany: bool) -> str:
+    """
+    Representar los parámetros de la sentencia, recortados a `LARGO_PARAMETROS`.
+    """
+    if executemany and parametros:
+        texto = f"{len(parametros)} filas, primera: {parametros[0]!r}"
+    else:
+        texto = repr(parametros)
+    return texto if len(texto) <= LARGO_PARAMETROS else texto[:LARGO_PARAMETROS] + "..."
+
+
+def planSQLite(cursor, sentencia: str, parametros, executemany: bool):
+    """
+    Obtener el plan de `EXPLAIN QUERY PLAN` de una sentencia en SQLite.
+
+    Se usa un cursor nuevo de la misma conexión DBAPI, así no se disparan los
+    eventos del motor ni se consumen las filas de la consulta original.
+    """
+    if executemany:
+        parametros = parametros[0] if parametros else ()
+    try:
+        explicacion = cursor.connection.cursor()
+        try:
+            filas = explicacion.execute(f"EXPLAIN QUERY PLAN {sentencia}", parametros).fetchall()
+        finally:
+            explicacion.close()
+    except Exception:
+        return None
+
+    # Indentar cada paso segun su profundidad en el arbol del plan
+    profundidad = {0: -1}
+    plan = []
+    for idPaso, padre, _, detalle in filas:
+        profundidad[idPaso] = profundidad.get(padre, -1) + 1
+        plan.append("  " * profundidad[idPaso] + detalle)
+    return plan
+
+
+def registrarConsultasLentas(engine, registro: RegistroConsultasLentas = registroConsultasLentas):
+    """
+    Registrar en el motor los eventos que guardan las consultas lentas, si el
+    registro está activo.
+    """
+    if registro.umbral <= 0:
+        return
+    esSQLite = engine.dialect.name == "sqlite"
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def iniciarConsulta(conexion, cursor, sentencia, parametros, contexto, executemany):
+        conexion.info["inicioConsulta"] = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def terminarConsulta(conexion, cursor, sentencia, parametros, contexto, executemany):
+        duracion = perf_counter() - conexion.info.pop("inicioConsulta", perf_counter())
+        if duracion < registro.umbral:
+            return
+
+        consulta = {
+            "fecha": dt.now().isoformat(),
+            "duracionMs": round(duracion * 1000, 3),
+            "origen": funcionOrigen(),
+            "sql": sentencia,
+            "parametros": textoParametros(parametros, executemany),
+            "plan": planSQLite(cursor, sentencia, parametros, executemany) if esSQLite else None
+        }
+        registro.agregar(consulta)
+        logger.warning(
+            "Consulta lenta (%.1f ms) en %s: %s | parametros: %s | plan: %s",
+            consulta["duracionMs"], consulta["origen"], sentencia, consulta["parametros"], consulta["plan"]
+        )
@@ -1,20 +1,36 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from .db.db import createAllTables
+from .utils.compresion import MiddlewareCompresion
+from .utils.metricas import MiddlewareMetricas, registroMetricas, TIPO_CONTENIDO_PROMETHEUS
 from .routers import (
     curso_router,
     estudiante_router,
-    matricula_router
+    matricula_router,
+    admin_router
 )
 
 # Crear la instancia de FastAPI
 app = FastAPI(lifespan=createAllTables, title="Gestor de Universidad", version="0.0.1")
 
+# Comprimir las respuestas grandes (gzip o brotli segun el cliente)
+app.add_middleware(MiddlewareCompresion)
+
+# Medir latencia y consultas SQL por ruta (incluye el tiempo de compresion)
+app.add_middleware(MiddlewareMetricas)
+
 # Incluir los routers en la app
 app.include_router(curso_router.router)
 app.include_router(estudiante_router.router)
 app.include_router(matricula_router.router)
+app.include_router(admin_router.router)
 
 # Ruta de inicio
 @app.get("/")
 async def inicio():
-    return {"mensaje" : "Bienvenido al gestor de universidad"}
\ No newline at end of file
+    return {"mensaje" : "Bienvenido al gestor de universidad"}
+
+# Metricas en formato Prometheus
+@app.get("/metrics", include_in_schema=False)
+def metricas():
+    return PlainTextResponse(registroMetricas.exportar(), media_type=TIPO_CONTENIDO_PROMETHEUS)
\ No newline at end of file
@@ -1,9 +1,10 @@
 from .curso import Curso, CursoUpdate, CursoDelete
 from .estudiante import Estudiante, EstudianteUpdate, EstudianteDelete
-from .matricula import Matricula, MatriculaUpdate, MatriculaDelete
+from .matricula import Matricula, MatriculaUpdate, MatriculaDelete, MatriculaPar, MatriculaLote, ListaEspera
 
 __all__ = [
     "Curso", "CursoUpdate", "CursoDelete",
     "Estudiante", "EstudianteUpdate", "EstudianteDelete",
-    "Matricula", "MatriculaUpdate", "MatriculaDelete",
+    "Matricula", "MatriculaUpdate", "MatriculaDelete", "MatriculaPar", "MatriculaLote",
+    "ListaEspera",
 ]
\ No newline at end of file
@@ -8,6 +8,7 @@ los modelos auxiliares para operaciones de actualización y eliminación.
 """
 
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from datetime import datetime as dt
 from typing import Optional
 from ..utils.enum import CreditosCurso, HorarioCurso
@@ -24,11 +25,14 @@ class CursoBase(SQLModel):
         nombre (Optional[str]): Nombre completo del curso.
         creditos (CreditosCurso): Cantidad de créditos académicos del curso.
         horario (HorarioCurso): Horario asignado al curso.
+        cupo (Optional[int]): Cantidad máxima de estudiantes matriculados a la vez
+            (sin límite si es `None`).
     """
     codigo: Optional[str] = Field(default=None, unique=True, min_length=7, max_length=7)
-    nombre: Optional[str] = Field(default=None)
-    creditos: CreditosCurso = Field(default=CreditosCurso.DOS)
-    horario: HorarioCurso = Field(default=HorarioCurso.SIETE_A_NUEVE)
+    nombre: Optional[str] = Field(default=None, index=True)
+    creditos: CreditosCurso = Field(default=CreditosCurso.DOS, index=True)
+    horario: HorarioCurso = Field(default=HorarioCurso.SIETE_A_NUEVE, index=True)
+    cupo: Optional[int] = Field(default=None, ge=1)
 
 
 class Curso(CursoBase, table=True):
@@ -38,6 +42,10 @@ class Curso(CursoBase, table=True):
     Representa un curso académico con su respectiva información y relación 
     con las matrículas registradas.
 
+    En PostgreSQL declara además un índice `text_pattern_ops` sobre `nombre`
+    para los filtros por prefijo (`LIKE 'prefijo%'`), que el índice normal no
+    atiende cuando la intercalación de la base de datos no es `C`.
+
     Attributes:
         id (Optional[int]): Identificador único del curso.
         matriculas (list[Matricula]): Lista de matrículas asociadas al curso.
@@ -47,6 +55,10 @@ class Curso(CursoBase, table=True):
         back_populates="curso", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
     )
 
+    __table_args__ = (
+        Index("ix_curso_nombre_patron", "nombre", postgresql_ops={"nombre": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+    )
+
 
 class CursoUpdate(CursoBase):
     """
@@ -62,6 +74,26 @@ class CursoDelete(CursoBase):
     pass
 
 
+class CursoConteo(SQLModel, table=True):
+    """
+    Contadores precalculados de matrículas por estado de un curso.
+
+    Se actualizan en la misma transacción de cada cambio de estado de una
+    matrícula, así consultar cuántos estudiantes tiene un curso es una lectura
+    por llave primaria en lugar de contar sus matrículas.
+
+    Attributes:
+        codigo (str): Código del curso.
+        matriculados (int): Matrículas activas (MATRICULADO).
+        finalizados (int): Matrículas FINALIZADO.
+        desmatriculados (int): Matrículas DESMATRICULADO.
+    """
+    codigo: str = Field(primary_key=True, foreign_key="curso.codigo", ondelete="CASCADE")
+    matriculados: int = Field(default=0)
+    finalizados: int = Field(default=0)
+    desmatriculados: int = Field(default=0)
+
+
 class CursoHistorico(SQLModel, table=True):
     """
     Registro histórico de los cursos eliminados.
@@ -8,6 +8,7 @@ Incluye el modelo principal `Estudiante`, su versión histórica
 """
 
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index
 from datetime import datetime as dt
 from typing import Optional
 from ..utils.enum import Semestre
@@ -26,9 +27,9 @@ class EstudianteBase(SQLModel):
         semestre (Semestre): Nivel académico actual del estudiante.
     """
     cedula: Optional[str] = Field(default=None, unique=True, min_length=7, max_length=10)
-    nombre: Optional[str] = Field(default=None)
+    nombre: Optional[str] = Field(default=None, index=True)
     email: Optional[str] = Field(default=None, unique=True)
-    semestre: Semestre = Field(default=Semestre.PRIMERO)
+    semestre: Semestre = Field(default=Semestre.PRIMERO, index=True)
 
 
 class Estudiante(EstudianteBase, table=True):
@@ -38,6 +39,9 @@ class Estudiante(EstudianteBase, table=True):
     Representa a un estudiante inscrito en la institución, con su información
     personal y relación con las matrículas activas.
 
+    En PostgreSQL tiene también el índice `ix_estudiante_nombre_patron`
+    (`text_pattern_ops`) para filtrar por prefijo del nombre.
+
     Attributes:
         id (Optional[int]): Identificador único del estudiante.
         matriculas (list[Matricula]): Lista de matrículas asociadas al estudiante.
@@ -47,6 +51,10 @@ class Estudiante(EstudianteBase, table=True):
         back_populates="estudiante", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
     )
 
+    __table_args__ = (
+        Index("ix_estudiante_nombre_patron", "nombre", postgresql_ops={"nombre": "text_pattern_ops"}).ddl_if(dialect="postgresql"),
+    )
+
 
 class EstudianteUpdate(EstudianteBase):
     """
@@ -4,11 +4,13 @@ Módulo: matricula
 Define los modelos asociados al proceso de matrícula entre estudiantes y cursos.
 
 Incluye el modelo principal `Matricula`, su versión histórica 
-(`MatriculaHistorica`) y los modelos auxiliares para actualización y eliminación.
+(`MatriculaHistorica`), la lista de espera de los cursos sin cupo (`ListaEspera`)
+y los modelos auxiliares para actualización y eliminación.
 """
 
 from datetime import datetime as dt
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from typing import Optional
 from ..utils.enum import EstadoMatricula
 
@@ -34,6 +36,12 @@ class Matricula(MatriculaBase, table=True):
 
     Representa la relación entre un estudiante y un curso específico.
 
+    Declara índices compuestos para los filtros de los endpoints de matrícula:
+    `(cedula, matriculado)`, `(codigo, cedula)` y `(codigo, matriculado)`, además
+    de un índice único parcial sobre `cedula` para las matrículas activas, que
+    garantiza en la base de datos que un estudiante solo esté MATRICULADO en un
+    curso a la vez.
+
     Attributes:
         id (Optional[int]): Identificador único de la matrícula.
         codigo (Optional[str]): Código del curso asociado.
@@ -47,6 +55,17 @@ class Matricula(MatriculaBase, table=True):
     cedula: Optional[str] = Field(foreign_key="estudiante.cedula", ondelete="CASCADE")
     estudiante: Optional["Estudiante"] = Relationship(back_populates="matriculas")
 
+    __table_args__ = (
+        Index("ix_matricula_cedula_matriculado", "cedula", "matriculado"),
+        Index("ix_matricula_codigo_cedula", "codigo", "cedula"),
+        Index("ix_matricula_codigo_matriculado", "codigo", "matriculado"),
+        Index(
+            "ux_matricula_cedula_activa", "cedula", unique=True,
+            sqlite_where=text("matriculado = 'MATRICULADO'"),
+            postgresql_where=text("matriculado = 'MATRICULADO'")
+        ),
+    )
+
 
 class MatriculaUpdate(MatriculaBase):
     """
@@ -62,6 +81,35 @@ class MatriculaDelete(MatriculaBase):
     pass
 
 
+class MatriculaPar(SQLModel):
+    """
+    Par curso-estudiante a matricular dentro de una matrícula masiva.
+
+    Attributes:
+        codigo (str): Código del curso.
+        cedula (str): Cédula del estudiante.
+    """
+    codigo: str
+    cedula: str
+
+
+class MatriculaLote(SQLModel):
+    """
+    Modelo de entrada para matricular muchos estudiantes a la vez.
+
+    Se puede enviar un `codigo` de curso con una lista de `cedulas`, una lista de
+    `pares` curso-estudiante, o ambos.
+
+    Attributes:
+        codigo (Optional[str]): Código del curso para las cédulas de `cedulas`.
+        cedulas (list[str]): Cédulas a matricular en el curso `codigo`.
+        pares (list[MatriculaPar]): Pares curso-estudiante a matricular.
+    """
+    codigo: Optional[str] = None
+    cedulas: list[str] = []
+    pares: list[MatriculaPar] = []
+
+
 class MatriculaHistorica(SQLModel, table=True):
     """
     Registro histórico de las matrículas eliminadas.
@@ -85,6 +133,32 @@ class MatriculaHistorica(SQLModel, table=True):
     razonEliminado: Optional[str] = None
 
 
+class ListaEspera(SQLModel, table=True):
+    """
+    Estudiante en la lista de espera de un curso sin cupos disponibles.
+
+    El `id` autoincremental es la posición en la cola (FIFO): el siguiente
+    estudiante de un curso es el de menor `id`, que se obtiene con el índice
+    `(codigo, id)` sin recorrer la lista.
+
+    Attributes:
+        id (Optional[int]): Identificador y posición en la cola.
+        codigo (str): Código del curso.
+        cedula (str): Cédula del estudiante en espera.
+        fecha (datetime): Fecha en la que el estudiante entró a la lista.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    codigo: str = Field(foreign_key="curso.codigo", ondelete="CASCADE")
+    cedula: str = Field(foreign_key="estudiante.cedula", ondelete="CASCADE")
+    fecha: dt = Field(default_factory=dt.now)
+
+    __table_args__ = (
+        Index("ix_listaespera_codigo_id", "codigo", "id"),
+        Index("ix_listaespera_cedula", "cedula"),
+        Index("ux_listaespera_codigo_cedula", "codigo", "cedula", unique=True),
+    )
+
+
 # Importaciones diferidas para evitar referencias circulares
 from .curso import Curso
 from .estudiante import Estudiante
\ No newline at end of file
@@ -1,9 +1,11 @@
 from . import curso_router
 from . import estudiante_router
 from . import matricula_router
+from . import admin_router
 
 __all__ = [
     "curso_router",
     "estudiante_router",
-    "matricula_router"
+    "matricula_router",
+    "admin_router"
 ]
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Módulo: admin_router
+--------------------
+Endpoints de administración para diagnosticar el rendimiento de la aplicación.
+
+Las consultas guardadas pueden incluir datos de los estudiantes en sus
+parámetros, así que los *endpoints* solo responden si se define la variable de
+entorno `ADMIN_TOKEN`, y las peticiones deben enviar ese valor en la cabecera
+`X-Admin-Token`. Sin `ADMIN_TOKEN` responden 404, como si no existieran.
+"""
+
+import os
+import secrets
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Header, Depends
+from ..db.lentas import registroConsultasLentas
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+def validarAdmin(adminToken: Optional[str] = Header(default=None, alias="X-Admin-Token")):
+
+    """
+    Validar la cabecera `X-Admin-Token` contra `ADMIN_TOKEN`.
+
+    Raises:
+        HTTPException: 404 si `ADMIN_TOKEN` no está definido, 403 si el token no
+            coincide.
+    """
+
+    # Sin token configurado la administracion queda deshabilitada
+    if not ADMIN_TOKEN:
+        raise HTTPException(404, "Not Found")
+
+    if not secrets.compare_digest(adminToken or "", ADMIN_TOKEN):
+        raise HTTPException(403, "Token de administracion invalido")
+
+
+router = APIRouter(prefix="/admin", tags=["Administracion"], dependencies=[Depends(validarAdmin)])
+
+
+# READ - Consultas lentas registradas
+@router.get("/consultas-lentas")
+def consultasLentas():
+
+    """
+    Obtener las últimas consultas SQL lentas, de la más reciente a la más antigua.
+
+    Cada consulta incluye la fecha, la duración, la función que la originó, el
+    SQL, sus parámetros y el plan de ejecución (solo en SQLite). El registro se
+    activa con la variable de entorno `CONSULTAS_LENTAS_MS`.
+
+    Returns:
+        dict: Umbral en milisegundos (0 si el registro está inactivo) y consultas.
+    """
+
+    return {
+        "umbralMs": registroConsultasLentas.umbral * 1000,
+        "consultas": registroConsultasLentas.listar()
+    }
+
+
+
+# DELETE - Vaciar el registro de consultas lentas
+@router.delete("/consultas-lentas")
+def limpiarConsultasLentas():
+
+    """
+    Vaciar el registro de consultas lentas.
+
+    Returns:
+        dict: Mensaje de confirmación.
+    """
+
+    registroConsultasLentas.limpiar()
+    return {"Mensaje": "Registro de consultas lentas vaciado"}
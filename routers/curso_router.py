@@ -7,24 +7,45 @@ Incluye operaciones para crear, consultar, actualizar y eliminar cursos, así co
 la consulta de estudiantes matriculados en un curso específico.
 """
 
-from fastapi import APIRouter, HTTPException, Form
-from ..db.db import SessionDep
-from sqlmodel import select
-from ..models.curso import Curso, CursoHistorico
-from ..models.matricula import Matricula, MatriculaHistorica
+from fastapi import APIRouter, HTTPException, Form, Query, Header, Response
+from ..db.db import SessionDep, engine
+from ..db.cache import cacheCursos, versionCursos, obtenerCurso
+from ..db.busqueda import indiceCursos, buscarCursos
+from sqlmodel import select, insert, update, delete, literal
+from collections import Counter, defaultdict
+from datetime import datetime as dt
+from typing import Optional
+from ..models.curso import Curso, CursoHistorico, CursoConteo
+from ..models.matricula import Matricula, MatriculaHistorica, ListaEspera
 from ..models.estudiante import Estudiante
 from ..utils.enum import CreditosCurso, HorarioCurso, EstadoMatricula
+from ..utils.paginacion import consultaPorLlave, paginaPorLlave, respuestaNDJSON, CABECERA_TOTAL
+from ..utils.serializacion import columnasRespuesta, RespuestaFilas
+from ..utils.versiones import respuestaCondicional
+from ..utils.horarios import grafoConflictos, optimizarHorarios, costoAsignacion
+from ..utils.filtros import filtroValores, filtroPrefijo, ordenEnum, patronOrden, consultaFiltrada
 
 router = APIRouter(prefix="/curso", tags=["Cursos"])
 
+# Columnas por las que se pueden ordenar los cursos filtrados
+ORDEN_CURSOS = {
+    "id": Curso.id,
+    "codigo": Curso.codigo,
+    "nombre": Curso.nombre,
+    "creditos": ordenEnum(Curso.creditos, CreditosCurso),
+    "horario": ordenEnum(Curso.horario, HorarioCurso),
+    "cupo": Curso.cupo
+}
+
 # CREATE - Crear curso
 @router.post("/crear", response_model=Curso, status_code=201)
-async def crearCurso(
+def crearCurso(
     session: SessionDep,
     codigo: str = Form(...),
     nombre: str = Form(...),
     creditos: CreditosCurso = Form(...),
-    horario: HorarioCurso = Form(...)
+    horario: HorarioCurso = Form(...),
+    cupo: Optional[int] = Form(None)
     ):
 
     """
@@ -39,19 +60,20 @@ async def crearCurso(
         nombre (str): Nombre completo del curso.
         creditos (CreditosCurso): Número de créditos académicos.
         horario (HorarioCurso): Horario asignado al curso.
+        cupo (Optional[int]): Cantidad máxima de estudiantes matriculados (opcional).
 
     Returns:
         Curso: El curso creado.
 
     Raises:
-        HTTPException: 400 si el código ya existe o no tiene 7 caracteres.
+        HTTPException: 400 si el código ya existe, no tiene 7 caracteres o el cupo no es válido.
     """
     
     # Convertir el codigo a mayuscula
     codigo = codigo.upper()
 
     # Validar si el curso ya existe
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
+    cursoDB = obtenerCurso(session, codigo)
     if cursoDB:
         raise HTTPException(400, "Ya hay un curso registrado con ese codigo")
 
@@ -62,16 +84,25 @@ async def crearCurso(
     if not len(codigo) == 7:
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
 
+    # Validar que el cupo sea positivo
+    if cupo is not None and cupo < 1:
+        raise HTTPException(400, "El cupo debe ser mayor a cero")
+
     # Si no existe, lo crea
     nuevoCurso = Curso(
         codigo=codigo,
         nombre=nombre,
         creditos=creditos,
-        horario=horario
+        horario=horario,
+        cupo=cupo
     )
-    # Insertar el curso a la DB
+    # Insertar el curso y sus contadores de matriculas a la DB
     session.add(nuevoCurso)
+    session.add(CursoConteo(codigo=codigo))
     session.commit() # Guardar los cambios
+    cacheCursos.invalidar(codigo)
+    versionCursos.incrementar()
+    indiceCursos.agregar(codigo, nombre)
     session.refresh(nuevoCurso)
 
     return nuevoCurso # Devuelve el objeto curso
@@ -80,13 +111,31 @@ async def crearCurso(
 
 # READ - Obtener todos los cursos que hay
 @router.get("/todos", response_model=list[Curso])
-async def listaCursos(session: SessionDep):
+def listaCursos(
+    session: SessionDep,
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    after: Optional[int] = None,
+    ndjson: bool = False,
+    ifNoneMatch: Optional[str] = Header(default=None, alias="If-None-Match"),
+    ifModifiedSince: Optional[str] = Header(default=None, alias="If-Modified-Since")
+    ):
 
     """
     Obtener todos los cursos registrados.
 
+    Permite paginar por llave con `limit` y `after`, o transmitir como NDJSON.
+    Responde `304` sin consultar la base de datos si el cliente ya tiene la
+    versión actual del catálogo (`If-None-Match` o `If-Modified-Since`).
+
     Args:
         session (SessionDep): Sesión de base de datos.
+        response (Response): Respuesta donde se publica el siguiente cursor.
+        limit (Optional[int]): Tamaño de página para paginar por `id`.
+        after (Optional[int]): Cursor (último `id` recibido) de la página anterior.
+        ndjson (bool): Transmitir el listado como NDJSON en lugar de un arreglo.
+        ifNoneMatch (Optional[str]): `ETag` que el cliente ya tiene.
+        ifModifiedSince (Optional[str]): Fecha de la versión que el cliente ya tiene.
 
     Returns:
         list[Curso]: Lista de todos los cursos.
@@ -95,18 +144,29 @@ async def listaCursos(session: SessionDep):
         HTTPException: 404 si no hay cursos registrados.
     """
 
-    listaCursos = session.exec(select(Curso)).all()
+    # Si el cliente ya tiene la version actual del catalogo
+    noModificado = respuestaCondicional(versionCursos, response, ifNoneMatch, ifModifiedSince)
+    if noModificado:
+        return noModificado
+
+    # Transmitir los cursos como NDJSON
+    if ndjson:
+        consulta = consultaPorLlave(Curso, after, limit, columnasRespuesta(Curso))
+        return respuestaNDJSON(session, consulta, Curso, headers=response.headers)
+
+    # Consultar solo las columnas y codificarlas sin validar cada fila
+    listaCursos = paginaPorLlave(session, Curso, response, limit, after, columnasRespuesta(Curso))
     # Si no hay cursos
-    if len(listaCursos) == 0:
+    if len(listaCursos) == 0 and after is None:
         raise HTTPException(404, "No hay cursos")
     
-    return listaCursos
+    return RespuestaFilas(listaCursos, Curso, headers=response.headers)
 
 
 
 # READ - Obtener el curso filtrado por codigo
 @router.get("/codigo/{codigo}", response_model=Curso)
-async def cursosPorCodigo(codigo: str, session: SessionDep):
+def cursosPorCodigo(codigo: str, session: SessionDep):
 
     """
     Obtener un curso por su código.
@@ -130,7 +190,7 @@ async def cursosPorCodigo(codigo: str, session: SessionDep):
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
 
     # Validar si existe el codigo
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
+    cursoDB = obtenerCurso(session, codigo)
     # Si no existe el curso con ese codigo
     if not cursoDB:
         raise HTTPException(404, "No existe ese curso")
@@ -141,7 +201,7 @@ async def cursosPorCodigo(codigo: str, session: SessionDep):
 
 # READ - Obtener el curso filtrado por nombre
 @router.get("/nombre/{nombre}", response_model=Curso)
-async def cursosPorNombre(nombre: str, session: SessionDep):
+def cursosPorNombre(nombre: str, session: SessionDep):
 
     """
     Obtener un curso por su nombre exacto.
@@ -169,9 +229,95 @@ async def cursosPorNombre(nombre: str, session: SessionDep):
     return cursoDB
 
 
+# READ - Buscar cursos por nombre
+@router.get("/buscar", response_model=list[Curso])
+def buscarCursosPorNombre(
+    session: SessionDep,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0)
+    ):
+
+    """
+    Buscar cursos por nombre, sin importar mayúsculas ni tildes.
+
+    Encuentra nombres que empiezan por las palabras buscadas (`calc` encuentra `CÁLCULO I`) y
+    nombres parecidos aunque tengan errores de escritura. Los resultados van del
+    más al menos parecido y la cabecera `X-Total-Resultados` trae el total de
+    coincidencias para paginar con `limit` y `offset`.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        response (Response): Respuesta, para la cabecera con el total.
+        q (str): Texto a buscar.
+        limit (int): Cantidad máxima de resultados.
+        offset (int): Resultados a omitir.
+
+    Returns:
+        list[Curso]: Cursos encontrados.
+    """
+
+    total, cursos = buscarCursos(session, q, limit, offset)
+    response.headers[CABECERA_TOTAL] = str(total)
+    return cursos
+
+
+
+# READ - Filtrar cursos por cualquier combinacion de campos
+@router.get("/filtrar", response_model=list[Curso])
+def filtrarCursos(
+    session: SessionDep,
+    codigo: Optional[list[str]] = Query(default=None),
+    nombre: Optional[str] = Query(default=None, min_length=1),
+    creditos: Optional[list[CreditosCurso]] = Query(default=None),
+    horario: Optional[list[HorarioCurso]] = Query(default=None),
+    orden: str = Query(default="id", pattern=patronOrden(ORDEN_CURSOS)),
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0)
+    ):
+
+    """
+    Filtrar cursos combinando cualquiera de sus campos en una sola consulta.
+
+    Los filtros se unen con `AND`; los que aceptan lista (`codigo`, `creditos` y
+    `horario`) se pueden repetir para aceptar varios valores, por ejemplo
+    `?creditos=3&creditos=4&horario=SIETE_A_NUEVE`. `nombre` busca los cursos
+    cuyo nombre empieza por el texto.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        codigo (Optional[list[str]]): Códigos de curso.
+        nombre (Optional[str]): Inicio del nombre del curso.
+        creditos (Optional[list[CreditosCurso]]): Cantidades de créditos.
+        horario (Optional[list[HorarioCurso]]): Horarios.
+        orden (str): Campo para ordenar, con `-` al inicio para orden descendente.
+        limit (int): Cantidad máxima de cursos.
+        offset (int): Cursos a omitir.
+
+    Returns:
+        list[Curso]: Cursos que cumplen todos los filtros (vacía si no hay).
+    """
+
+    condiciones = [
+        filtroValores(Curso.codigo, [valor.upper() for valor in codigo or []]),
+        filtroPrefijo(Curso.nombre, nombre.upper() if nombre else None, engine.dialect.name),
+        filtroValores(Curso.creditos, creditos),
+        filtroValores(Curso.horario, horario)
+    ]
+    return session.exec(consultaFiltrada(Curso, condiciones, ORDEN_CURSOS, orden, limit, offset)).all()
+
+
+
 # READ - Obtener lista de cursos filtrados por creditos
 @router.get("/creditos/{creditos}", response_model=list[Curso])
-async def cursosPorCreditos(session: SessionDep, creditos: CreditosCurso):
+def cursosPorCreditos(
+    session: SessionDep,
+    response: Response,
+    creditos: CreditosCurso,
+    ifNoneMatch: Optional[str] = Header(default=None, alias="If-None-Match"),
+    ifModifiedSince: Optional[str] = Header(default=None, alias="If-Modified-Since")
+    ):
 
     """
     Obtener cursos filtrados por cantidad de créditos.
@@ -179,6 +325,9 @@ async def cursosPorCreditos(session: SessionDep, creditos: CreditosCurso):
     Args:
         creditos (CreditosCurso): Cantidad de créditos a filtrar.
         session (SessionDep): Sesión de base de datos.
+        response (Response): Respuesta donde se publican las cabeceras de caché.
+        ifNoneMatch (Optional[str]): `ETag` que el cliente ya tiene.
+        ifModifiedSince (Optional[str]): Fecha de la versión que el cliente ya tiene.
 
     Returns:
         list[Curso]: Cursos que tienen la cantidad de créditos especificada.
@@ -187,6 +336,11 @@ async def cursosPorCreditos(session: SessionDep, creditos: CreditosCurso):
         HTTPException: 404 si no hay cursos con esa cantidad de créditos.
     """
 
+    # Si el cliente ya tiene la version actual del catalogo
+    noModificado = respuestaCondicional(versionCursos, response, ifNoneMatch, ifModifiedSince)
+    if noModificado:
+        return noModificado
+
     listaCursos = session.exec(select(Curso).where(Curso.creditos == creditos)).all()
     # Si no hay cursos con esos creditos
     if len(listaCursos) == 0:
@@ -198,7 +352,13 @@ async def cursosPorCreditos(session: SessionDep, creditos: CreditosCurso):
 
 # READ - Obtener lista de cursos filtrados por horario
 @router.get("/horario/{horario}", response_model=list[Curso])
-async def cursosPorCreditos(session: SessionDep, horario: HorarioCurso):
+def cursosPorCreditos(
+    session: SessionDep,
+    response: Response,
+    horario: HorarioCurso,
+    ifNoneMatch: Optional[str] = Header(default=None, alias="If-None-Match"),
+    ifModifiedSince: Optional[str] = Header(default=None, alias="If-Modified-Since")
+    ):
 
     """
     Obtener cursos filtrados por horario.
@@ -206,6 +366,9 @@ async def cursosPorCreditos(session: SessionDep, horario: HorarioCurso):
     Args:
         horario (HorarioCurso): Horario a filtrar.
         session (SessionDep): Sesión de base de datos.
+        response (Response): Respuesta donde se publican las cabeceras de caché.
+        ifNoneMatch (Optional[str]): `ETag` que el cliente ya tiene.
+        ifModifiedSince (Optional[str]): Fecha de la versión que el cliente ya tiene.
 
     Returns:
         list[Curso]: Cursos que tienen el horario especificado.
@@ -214,6 +377,11 @@ async def cursosPorCreditos(session: SessionDep, horario: HorarioCurso):
         HTTPException: 404 si no hay cursos en ese horario.
     """
 
+    # Si el cliente ya tiene la version actual del catalogo
+    noModificado = respuestaCondicional(versionCursos, response, ifNoneMatch, ifModifiedSince)
+    if noModificado:
+        return noModificado
+
     listaCursos = session.exec(select(Curso).where(Curso.horario == horario)).all()
     # Si no hay cursos con esos creditos
     if len(listaCursos) == 0:
@@ -223,9 +391,64 @@ async def cursosPorCreditos(session: SessionDep, horario: HorarioCurso):
 
 
 
+# READ - Contadores de matriculas de todos los cursos
+@router.get("/estadisticas", response_model=list[CursoConteo])
+def estadisticasCursos(session: SessionDep):
+
+    """
+    Obtener los contadores de matrículas por estado de todos los cursos.
+
+    Los contadores se mantienen en cada cambio de estado de una matrícula, así
+    que no se recorren las matrículas de cada curso.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+
+    Returns:
+        list[CursoConteo]: Matriculados, finalizados y desmatriculados por curso.
+    """
+
+    return session.exec(select(CursoConteo)).all()
+
+
+
+# READ - Contadores de matriculas de un curso
+@router.get("/{codigo}/estadisticas", response_model=CursoConteo)
+def estadisticasCurso(codigo: str, session: SessionDep):
+
+    """
+    Obtener los contadores de matrículas por estado de un curso.
+
+    Args:
+        codigo (str): Código del curso.
+        session (SessionDep): Sesión de base de datos.
+
+    Returns:
+        CursoConteo: Matriculados, finalizados y desmatriculados del curso.
+
+    Raises:
+        HTTPException: 404 si el curso no existe.
+    """
+
+    # Convertir el codigo a mayuscula
+    codigo = codigo.upper()
+
+    # Validar que el codigo sea valido
+    if not len(codigo) == 7:
+        raise HTTPException(400, "El codigo debe tener 7 caracteres")
+
+    conteoDB = session.get(CursoConteo, codigo)
+    # Si no existe el curso
+    if not conteoDB:
+        raise HTTPException(404, "El curso no existe")
+
+    return conteoDB
+
+
+
 # READ - Estudiantes matriculados en un curso
 @router.get("/{codigo}/estudiantes", response_model=list[Estudiante])
-async def estudiantesPorCurso(codigo: str, session: SessionDep):
+def estudiantesPorCurso(codigo: str, session: SessionDep):
 
     """
     Obtener todos los estudiantes matriculados en un curso.
@@ -249,7 +472,7 @@ async def estudiantesPorCurso(codigo: str, session: SessionDep):
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
 
     # Validar si el codigo existe
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
+    cursoDB = obtenerCurso(session, codigo)
     # Si no existe el curso
     if not cursoDB:
         raise HTTPException(404, "El curso no existe")
@@ -273,7 +496,7 @@ async def estudiantesPorCurso(codigo: str, session: SessionDep):
 
 # READ - Obtener un curso filtrado por creditos y codigo
 @router.get("/{creditos}/{codigo}", response_model=Curso)
-async def cursoPorCreditosYcodigo(creditos: CreditosCurso, codigo: str, session: SessionDep):
+def cursoPorCreditosYcodigo(creditos: CreditosCurso, codigo: str, session: SessionDep):
 
     """
     Obtener un curso específico por créditos y código.
@@ -297,11 +520,12 @@ async def cursoPorCreditosYcodigo(creditos: CreditosCurso, codigo: str, session:
     if not len(codigo) == 7:
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
 
-    cursoDB = session.exec(select(Curso).where(Curso.creditos == creditos or Curso.codigo == codigo)).first()
-    # Si no existe un estudiante con ese email
+    # El codigo es unico: se busca por codigo y despues se validan los creditos
+    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
+    # Si no existe un curso con ese codigo
     if not cursoDB:
-        raise HTTPException(404, f"Curso no encontrado")
-    # Si el estudiante no esta en el semestre ingresado
+        raise HTTPException(404, "Curso no encontrado")
+    # Si el curso no tiene los creditos ingresados
     if cursoDB.creditos != creditos:
         raise HTTPException(404, f"Curso con codigo {codigo} no tiene {creditos.value} creditos")
     
@@ -309,9 +533,24 @@ async def cursoPorCreditosYcodigo(creditos: CreditosCurso, codigo: str, session:
 
 
 
+# READ - Estadisticas de la cache de cursos
+@router.get("/cache")
+def estadisticasCacheCursos():
+
+    """
+    Obtener los contadores de la caché de cursos por código.
+
+    Returns:
+        dict: Tamaño, aciertos, fallos, desalojos y expiraciones de la caché.
+    """
+
+    return cacheCursos.estadisticas()
+
+
+
 # UPDATE - Actualizar el horario de un curso
 @router.patch("/{codigo}/actualizar", response_model=Curso)
-async def actualizarHorarioCurso(session: SessionDep, codigo: str, horario: HorarioCurso = Form(...)):
+def actualizarHorarioCurso(session: SessionDep, codigo: str, horario: HorarioCurso = Form(...)):
 
     """
     Actualizar el horario de un curso.
@@ -350,20 +589,96 @@ async def actualizarHorarioCurso(session: SessionDep, codigo: str, horario: Hora
     #Insertar curso actualizado en la DB
     session.add(cursoDB)
     session.commit() # Guardar los cambios
+    cacheCursos.invalidar(codigo)
+    versionCursos.incrementar()
     session.refresh(cursoDB)
     
     return cursoDB
 
 
 
+# UPDATE - Reasignar los horarios de todo el catalogo
+@router.post("/optimizar-horarios")
+def optimizarHorariosCursos(
+    session: SessionDep,
+    aplicar: bool = False,
+    pesoBalance: float = Query(default=1.0, ge=0)
+    ):
+
+    """
+    Calcular (y opcionalmente aplicar) una asignación de horarios para todos los
+    cursos que minimice los cruces de los estudiantes y balancee las franjas.
+
+    Un cruce es un estudiante que quiere dos cursos en la misma franja: los que
+    tiene matriculados y los que espera en una lista de espera. Sin `aplicar`
+    solo se devuelve el plan; con `aplicar=true` los horarios se guardan con una
+    sola actualización masiva.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        aplicar (bool): Guardar la nueva asignación.
+        pesoBalance (float): Peso del balance de cursos por franja frente a un cruce.
+
+    Returns:
+        dict: Cruces antes y después, cursos por horario y cursos que cambian.
+
+    Raises:
+        HTTPException: 404 si no hay cursos.
+    """
+
+    # Catalogo con su horario actual
+    cursos = session.exec(select(Curso.id, Curso.codigo, Curso.horario)).all()
+    if not cursos:
+        raise HTTPException(404, "No hay cursos")
+    actual = {codigo: horario for _, codigo, horario in cursos}
+
+    # Cursos que quiere cada estudiante: matriculados y en lista de espera
+    demandas = defaultdict(set)
+    for cedula, codigo in session.exec(
+        select(Matricula.cedula, Matricula.codigo).where(Matricula.matriculado == EstadoMatricula.MATRICULADO)
+    ).all():
+        demandas[cedula].add(codigo)
+    for cedula, codigo in session.exec(select(ListaEspera.cedula, ListaEspera.codigo)).all():
+        demandas[cedula].add(codigo)
+
+    # Optimizar sobre el grafo de conflictos
+    franjas = list(HorarioCurso)
+    grafo = grafoConflictos(demandas.values())
+    nueva = optimizarHorarios(actual, grafo, franjas, pesoBalance)
+    cambios = [
+        {"codigo": codigo, "horarioAnterior": actual[codigo], "horario": horario}
+        for codigo, horario in nueva.items()
+        if horario != actual[codigo]
+    ]
+
+    # Guardar todos los cambios en una sola transaccion
+    if aplicar and cambios:
+        ids = {codigo: cursoID for cursoID, codigo, _ in cursos}
+        session.exec(update(Curso), params=[{"id": ids[cambio["codigo"]], "horario": cambio["horario"]} for cambio in cambios])
+        session.commit() # Guardar los cambios
+        cacheCursos.limpiar()
+        versionCursos.incrementar()
+
+    return {
+        "aplicado": aplicar and bool(cambios),
+        "conflictosAntes": costoAsignacion(actual, grafo, franjas)[0],
+        "conflictosDespues": costoAsignacion(nueva, grafo, franjas)[0],
+        "cursosPorHorario": dict(Counter(horario.value for horario in nueva.values())),
+        "cambios": cambios
+    }
+
+
+
 # DELETE - Eliminar un curso
 @router.delete("/{codigo}/eliminar")
-async def eliminarCurso(codigo: str, session: SessionDep):
+def eliminarCurso(codigo: str, session: SessionDep):
 
     """
     Eliminar un curso y mover su información al histórico.
 
-    También guarda en el histórico las matrículas asociadas.
+    También guarda en el histórico las matrículas asociadas. El archivado se hace
+    con un `INSERT ... SELECT` y un `DELETE` masivo dentro de la misma transacción
+    que elimina el curso, así no queda un histórico parcial si algo falla.
 
     Args:
         codigo (str): Código del curso a eliminar.
@@ -390,17 +705,21 @@ async def eliminarCurso(codigo: str, session: SessionDep):
         raise HTTPException(404, "Estudiante no encontrado")
     
     # Guardar matrículas relacionadas en el histórico antes de borrar
-    matriculasDB = session.exec(select(Matricula).where(Matricula.codigo == codigo)).all()
-    for matricula in matriculasDB:
-        matriculaHistorica = MatriculaHistorica(
-            codigo=matricula.codigo,
-            cedula=matricula.cedula,
-            matriculado=matricula.matriculado,
-            razonEliminado="Curso eliminado"
+    session.exec(
+        insert(MatriculaHistorica).from_select(
+            ["codigo", "cedula", "matriculado", "fechaEliminado", "razonEliminado"],
+            select(
+                Matricula.codigo,
+                Matricula.cedula,
+                Matricula.matriculado,
+                literal(dt.now()),
+                literal("Curso eliminado")
+            ).where(Matricula.codigo == codigo)
         )
-        # Insertar las matriculas del curso al historico
-        session.add(matriculaHistorica)
-    session.commit() # Guardar los cambios
+    )
+    # Eliminar las matriculas y la lista de espera del curso en una sola sentencia cada una
+    session.exec(delete(Matricula).where(Matricula.codigo == codigo))
+    session.exec(delete(ListaEspera).where(ListaEspera.codigo == codigo))
     
     # Copiar a curso historico
     cursoHistorico = CursoHistorico(
@@ -411,8 +730,12 @@ async def eliminarCurso(codigo: str, session: SessionDep):
     )
     session.add(cursoHistorico)
     
-    # Eliminar el curso de la DB
-    session.delete(cursoDB)
+    # Eliminar el curso y sus contadores de la DB
+    session.exec(delete(CursoConteo).where(CursoConteo.codigo == codigo))
+    session.exec(delete(Curso).where(Curso.id == cursoDB.id))
     session.commit() # Guardar los cambios
+    cacheCursos.invalidar(codigo)
+    versionCursos.incrementar()
+    indiceCursos.eliminar(codigo)
 
     return {"Mensaje": "Curso eliminado correctamente"}
\ No newline at end of file
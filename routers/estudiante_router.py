@@ -7,20 +7,53 @@ Permite crear, consultar, actualizar y eliminar estudiantes, así como consultar
 los cursos en los que están matriculados y filtrar por diversos criterios.
 """
 
-from fastapi import APIRouter, HTTPException, Form
-from ..db.db import SessionDep
-from sqlmodel import select
+import codecs
+import csv
+import io
+import json
+from fastapi import APIRouter, HTTPException, Form, Query, Response, UploadFile, File
+from ..db.db import SessionDep, engine
+from ..db.cache import cacheEstudiantes, obtenerEstudiante, obtenerEstudiantePorEmail
+from ..db.conteos import descontarMatriculas
+from ..db.espera import promoverListaEspera
+from ..db.busqueda import indiceEstudiantes, buscarEstudiantes
+from .matricula_router import transaccionMatricula
+from sqlmodel import select, insert, delete, case, literal
+from datetime import datetime as dt
+from typing import Optional
 from ..models.estudiante import Estudiante, EstudianteHistorico
-from ..models.matricula import Matricula, MatriculaHistorica
+from ..models.matricula import Matricula, MatriculaHistorica, ListaEspera
 from ..models.curso import Curso
 from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from ..utils.enum import Semestre, EstadoMatricula
+from ..utils.paginacion import consultaPorLlave, paginaPorLlave, respuestaNDJSON, CABECERA_TOTAL
+from ..utils.serializacion import columnasRespuesta, RespuestaFilas
+from ..utils.lotes import fragmentar
+from ..utils.filtros import filtroValores, filtroPrefijo, ordenEnum, patronOrden, consultaFiltrada
 
 router = APIRouter(prefix="/estudiante", tags=["Estudiantes"])
 
+# Cantidad de filas que se validan e insertan por transaccion en la importacion
+TAMANO_LOTE_IMPORTACION = 1000
+# Veces que se reintenta un lote cuando otra peticion registra alguna de sus filas
+REINTENTOS_IMPORTACION = 3
+# Bytes que se leen por vez al verificar la codificacion del archivo importado
+TAMANO_BLOQUE_LECTURA = 64 * 1024
+
+# Columnas por las que se pueden ordenar los estudiantes filtrados
+ORDEN_ESTUDIANTES = {
+    "id": Estudiante.id,
+    "cedula": Estudiante.cedula,
+    "nombre": Estudiante.nombre,
+    "email": Estudiante.email,
+    "semestre": ordenEnum(Estudiante.semestre, Semestre)
+}
+CAMPOS_ESTUDIANTE = ("cedula", "nombre", "email", "semestre")
+
 # CREATE - Crear estudiante
 @router.post("/crear", response_model=Estudiante, status_code=201)
-async def crearEstudiante(
+def crearEstudiante(
     session: SessionDep,
     cedula: str = Form(...),
     nombre: str = Form(...),
@@ -49,7 +82,7 @@ async def crearEstudiante(
     """
 
     # Validar si el estudiante ya existe
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
+    estudianteDB = obtenerEstudiante(session, cedula)
     if estudianteDB:
         raise HTTPException(400, "Ya hay un estudiante registrado con esa CC")
     
@@ -81,21 +114,253 @@ async def crearEstudiante(
     # Insertar el estudiante a la DB
     session.add(nuevoEstudiante)
     session.commit() # Guardar los cambios
+    cacheEstudiantes.invalidar(cedula)
+    indiceEstudiantes.agregar(cedula, nombre)
     session.refresh(nuevoEstudiante)
 
     return nuevoEstudiante # Devuelve el objeto estudiante
 
 
 
+# Verificar que el archivo importado sea UTF-8 antes de guardar alguna fila
+def validarCodificacion(archivo: UploadFile):
+
+    """
+    Decodificar el archivo por bloques para rechazarlo si no es UTF-8.
+
+    Se hace antes de importar para que un byte inválido al final del archivo no
+    deje guardados los lotes anteriores. El archivo vuelve a quedar al inicio.
+
+    Args:
+        archivo (UploadFile): Archivo recibido.
+
+    Raises:
+        HTTPException: 400 si el archivo no está codificado en UTF-8.
+    """
+
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        while bloque := archivo.file.read(TAMANO_BLOQUE_LECTURA):
+            decodificador.decode(bloque)
+        decodificador.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise HTTPException(400, "El archivo debe estar codificado en UTF-8")
+    finally:
+        archivo.file.seek(0)
+
+
+
+# Leer las filas de un archivo CSV o NDJSON sin cargarlo completo en memoria
+def leerFilasImportacion(archivo: UploadFile):
+
+    """
+    Recorrer las filas de un archivo de importación de estudiantes.
+
+    El formato se detecta por la extensión (`.ndjson`/`.jsonl`) o por el tipo de
+    contenido; en cualquier otro caso se interpreta como CSV con encabezados.
+
+    Args:
+        archivo (UploadFile): Archivo recibido.
+
+    Yields:
+        tuple[int, Optional[dict]]: Número de fila y sus datos, o `None` si la fila
+            no se pudo interpretar.
+    """
+
+    texto = io.TextIOWrapper(archivo.file, encoding="utf-8-sig")
+    nombreArchivo = (archivo.filename or "").lower()
+    esNDJSON = nombreArchivo.endswith((".ndjson", ".jsonl")) or archivo.content_type in (
+        "application/x-ndjson", "application/jsonl"
+    )
+
+    if not esNDJSON:
+        # La fila 1 del CSV son los encabezados
+        for numero, fila in enumerate(csv.DictReader(texto), start=2):
+            yield numero, fila
+        return
+
+    for numero, linea in enumerate(texto, start=1):
+        if not linea.strip():
+            continue
+        try:
+            fila = json.loads(linea)
+        except json.JSONDecodeError:
+            fila = None
+        yield numero, fila if isinstance(fila, dict) else None
+
+
+
+# Validar los datos de un estudiante sin consultar la base de datos
+def errorDatosEstudiante(fila: Optional[dict]):
+
+    """
+    Aplicar a una fila de importación las reglas de formato de `crearEstudiante`.
+
+    Args:
+        fila (Optional[dict]): Datos de la fila.
+
+    Returns:
+        Optional[str]: Mensaje de error, o `None` si la fila es válida.
+    """
+
+    if fila is None:
+        return "La fila no tiene un formato valido"
+
+    faltantes = [campo for campo in CAMPOS_ESTUDIANTE if not str(fila.get(campo) or "").strip()]
+    if faltantes:
+        return f"Faltan campos: {', '.join(faltantes)}"
+
+    # Validar que el correo sea @ucatolica.edu.co
+    if "@ucatolica.edu.co" not in fila["email"]:
+        return "El email debe tener dominio ucatolica.edu.co"
+
+    # Validar que la cedula sea numerica
+    if not fila["cedula"].isdigit():
+        return "La cedula debe ser numerica"
+
+    # Validar que la CC sea valida
+    if not 7 <= len(fila["cedula"]) <= 10:
+        return "La cedula debe tener entre 7 y 10 numeros"
+
+    # Validar que el semestre exista
+    if fila["semestre"] not in {semestre.value for semestre in Semestre}:
+        return "El semestre no es valido"
+
+    return None
+
+
+
+# CREATE - Importar estudiantes desde un archivo CSV o NDJSON
+@router.post("/importar", status_code=201)
+def importarEstudiantes(session: SessionDep, archivo: UploadFile = File(...)):
+
+    """
+    Importar estudiantes de forma masiva desde un archivo CSV o NDJSON.
+
+    El archivo se procesa en lotes de `TAMANO_LOTE_IMPORTACION` filas: cada lote
+    se valida con las mismas reglas de `crearEstudiante`, la unicidad de cédula y
+    email se verifica con una sola consulta por lote, y las filas válidas se
+    insertan con un `executemany` y un commit por lote. Si otra petición registra
+    la misma cédula o email mientras se importa, el lote se revierte, se vuelve a
+    consultar qué cédulas y emails existen y se reintenta sin las filas en
+    conflicto, que se reportan con el error de cédula o email repetido. Tras
+    `REINTENTOS_IMPORTACION` conflictos seguidos las filas restantes del lote se
+    reportan como no guardadas.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        archivo (UploadFile): Archivo con las columnas cedula, nombre, email y semestre.
+
+    Returns:
+        dict: Cantidad de estudiantes importados y errores por fila.
+
+    Raises:
+        HTTPException: 400 si el archivo no está codificado en UTF-8.
+    """
+
+    validarCodificacion(archivo)
+
+    importados = 0
+    errores = []
+    # Cedulas y emails vistos en el archivo para detectar duplicados internos
+    cedulasVistas = set()
+    emailsVistos = set()
+
+    for lote in fragmentar(leerFilasImportacion(archivo), TAMANO_LOTE_IMPORTACION):
+        validas = []
+        for numero, fila in lote:
+            if fila is not None:
+                # Normalizar igual que crearEstudiante
+                fila = {campo: str(fila.get(campo) or "").strip() for campo in CAMPOS_ESTUDIANTE}
+                fila["nombre"] = fila["nombre"].upper()
+                fila["email"] = fila["email"].lower()
+
+            error = errorDatosEstudiante(fila)
+            if error:
+                errores.append({"fila": numero, "error": error})
+                continue
+            validas.append((numero, fila))
+
+        for _ in range(REINTENTOS_IMPORTACION + 1):
+            # Buscar en una sola consulta las cedulas y emails del lote que ya existen
+            existentes = session.exec(
+                select(Estudiante.cedula, Estudiante.email).where(
+                    or_(
+                        Estudiante.cedula.in_([fila["cedula"] for _, fila in validas]),
+                        Estudiante.email.in_([fila["email"] for _, fila in validas])
+                    )
+                )
+            ).all() if validas else []
+            cedulasVistas.update(cedula for cedula, _ in existentes)
+            emailsVistos.update(email for _, email in existentes)
+
+            nuevos = []
+            numerosNuevos = []
+            for numero, fila in validas:
+                if fila["cedula"] in cedulasVistas:
+                    errores.append({"fila": numero, "error": "Ya hay un estudiante registrado con esa CC"})
+                    continue
+                if fila["email"] in emailsVistos:
+                    errores.append({"fila": numero, "error": "Ya hay un estudiante registrado con ese email"})
+                    continue
+                cedulasVistas.add(fila["cedula"])
+                emailsVistos.add(fila["email"])
+                nuevos.append({**fila, "semestre": Semestre(fila["semestre"])})
+                numerosNuevos.append(numero)
+
+            if not nuevos:
+                break
+
+            # Insertar el lote en una sola transaccion
+            try:
+                session.exec(insert(Estudiante), params=nuevos)
+                session.commit() # Guardar los cambios
+            except IntegrityError:
+                # Otra peticion registro alguna cedula o email del lote: las filas revertidas
+                # no quedaron guardadas y se vuelven a validar contra la base de datos
+                session.rollback()
+                cedulasVistas.difference_update(fila["cedula"] for fila in nuevos)
+                emailsVistos.difference_update(fila["email"] for fila in nuevos)
+                validas = list(zip(numerosNuevos, nuevos))
+                continue
+
+            importados += len(nuevos)
+            for fila in nuevos:
+                indiceEstudiantes.agregar(fila["cedula"], fila["nombre"])
+            break
+        else:
+            # Los conflictos se repitieron en todos los intentos
+            errores.extend(
+                {"fila": numero, "error": "El lote no se guardo: la CC o el email ya estan registrados"}
+                for numero, _ in validas
+            )
+
+    errores.sort(key=lambda error: error["fila"])
+    return {"importados": importados, "errores": errores}
+
+
+
 # READ - Obtener todos los estudiantes que hay
 @router.get("/todos", response_model=list[Estudiante])
-async def listaEstudiantes(session: SessionDep):
+def listaEstudiantes(
+    session: SessionDep,
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    after: Optional[int] = None,
+    ndjson: bool = False
+    ):
 
     """
     Obtener todos los estudiantes registrados.
 
+    Permite paginar por llave con `limit` y `after`, o transmitir como NDJSON.
+
     Args:
         session (SessionDep): Sesión de base de datos.
+        response (Response): Respuesta donde se publica el siguiente cursor.
+        limit (Optional[int]): Tamaño de página para paginar por `id`.
+        after (Optional[int]): Cursor (último `id` recibido) de la página anterior.
+        ndjson (bool): Transmitir el listado como NDJSON en lugar de un arreglo.
 
     Returns:
         list[Estudiante]: Lista de todos los estudiantes.
@@ -104,17 +369,23 @@ async def listaEstudiantes(session: SessionDep):
         HTTPException: 404 si no hay estudiantes.
     """
 
-    listaEstudiantes = session.exec(select(Estudiante)).all()
+    # Transmitir los estudiantes como NDJSON
+    if ndjson:
+        consulta = consultaPorLlave(Estudiante, after, limit, columnasRespuesta(Estudiante))
+        return respuestaNDJSON(session, consulta, Estudiante)
+
+    # Consultar solo las columnas y codificarlas sin validar cada fila
+    listaEstudiantes = paginaPorLlave(session, Estudiante, response, limit, after, columnasRespuesta(Estudiante))
     # Si no hay estudiantes
-    if len(listaEstudiantes) == 0:
+    if len(listaEstudiantes) == 0 and after is None:
         raise HTTPException(404, "No hay estudiantes")
     
-    return listaEstudiantes
+    return RespuestaFilas(listaEstudiantes, Estudiante, headers=response.headers)
 
 
 # READ - Obtener el estudiante filtrado por cedula
 @router.get("/cedula/{cedula}", response_model=Estudiante)
-async def estudiantePorCedula(cedula: str, session: SessionDep):
+def estudiantePorCedula(cedula: str, session: SessionDep):
 
     """
     Obtener un estudiante por su cédula.
@@ -139,7 +410,7 @@ async def estudiantePorCedula(cedula: str, session: SessionDep):
         raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
 
     # Verificar que el estudiante exista
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
+    estudianteDB = obtenerEstudiante(session, cedula)
     # Si no existe el estudiante
     if not estudianteDB:
         raise HTTPException(404, "Estudiante no encontrado")
@@ -150,7 +421,7 @@ async def estudiantePorCedula(cedula: str, session: SessionDep):
 
 # READ - Obtener el estudiante filtrado por email
 @router.get("/email/{email}", response_model=Estudiante)
-async def estudiantePorCedula(email: str, session: SessionDep):
+def estudiantePorCedula(email: str, session: SessionDep):
 
     """
     Obtener un estudiante por su email.
@@ -174,7 +445,7 @@ async def estudiantePorCedula(email: str, session: SessionDep):
         raise HTTPException(400, "El email debe tener dominio ucatolica.edu.co")
 
     # Validar si existe el email
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.email == email)).first()
+    estudianteDB = obtenerEstudiantePorEmail(session, email)
     # Si no existe el estudiante con ese email
     if not estudianteDB:
         raise HTTPException(404, "Estudiante no encontrado")
@@ -185,7 +456,7 @@ async def estudiantePorCedula(email: str, session: SessionDep):
 
 # READ - Obtener lista de estudiantes filtrados por semestre
 @router.get("/semestre/{semestre}", response_model=list[Estudiante])
-async def estudiantesPorSemestre(semestre: Semestre, session: SessionDep):
+def estudiantesPorSemestre(semestre: Semestre, session: SessionDep):
 
     """
     Obtener estudiantes filtrados por semestre.
@@ -212,7 +483,7 @@ async def estudiantesPorSemestre(semestre: Semestre, session: SessionDep):
 
 # READ - Obtener el curso filtrado por nombre
 @router.get("/nombre/{nombre}", response_model=Estudiante)
-async def estudiantesPorNombre(nombre: str, session: SessionDep):
+def estudiantesPorNombre(nombre: str, session: SessionDep):
 
     """
     Obtener un estudiante por su nombre exacto.
@@ -241,9 +512,89 @@ async def estudiantesPorNombre(nombre: str, session: SessionDep):
 
 
 
+# READ - Buscar estudiantes por nombre
+@router.get("/buscar", response_model=list[Estudiante])
+def buscarEstudiantesPorNombre(
+    session: SessionDep,
+    response: Response,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0)
+    ):
+
+    """
+    Buscar estudiantes por nombre, sin importar mayúsculas ni tildes.
+
+    Encuentra nombres que empiezan por las palabras buscadas (`jose ro` encuentra `JOSÉ RODRÍGUEZ`) y
+    nombres parecidos aunque tengan errores de escritura. Los resultados van del
+    más al menos parecido y la cabecera `X-Total-Resultados` trae el total de
+    coincidencias para paginar con `limit` y `offset`.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        response (Response): Respuesta, para la cabecera con el total.
+        q (str): Texto a buscar.
+        limit (int): Cantidad máxima de resultados.
+        offset (int): Resultados a omitir.
+
+    Returns:
+        list[Estudiante]: Estudiantes encontrados.
+    """
+
+    total, estudiantes = buscarEstudiantes(session, q, limit, offset)
+    response.headers[CABECERA_TOTAL] = str(total)
+    return estudiantes
+
+
+
+# READ - Filtrar estudiantes por cualquier combinacion de campos
+@router.get("/filtrar", response_model=list[Estudiante])
+def filtrarEstudiantes(
+    session: SessionDep,
+    cedula: Optional[list[str]] = Query(default=None),
+    nombre: Optional[str] = Query(default=None, min_length=1),
+    email: Optional[list[str]] = Query(default=None),
+    semestre: Optional[list[Semestre]] = Query(default=None),
+    orden: str = Query(default="id", pattern=patronOrden(ORDEN_ESTUDIANTES)),
+    limit: int = Query(default=100, ge=1, le=1000),
+    offset: int = Query(default=0, ge=0)
+    ):
+
+    """
+    Filtrar estudiantes combinando cualquiera de sus campos en una sola consulta.
+
+    Los filtros se unen con `AND`; los que aceptan lista (`cedula`, `email` y
+    `semestre`) se pueden repetir para aceptar varios valores, por ejemplo
+    `?semestre=1&semestre=2`. `nombre` busca los estudiantes cuyo nombre empieza
+    por el texto.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        cedula (Optional[list[str]]): Cédulas.
+        nombre (Optional[str]): Inicio del nombre del estudiante.
+        email (Optional[list[str]]): Emails.
+        semestre (Optional[list[Semestre]]): Semestres.
+        orden (str): Campo para ordenar, con `-` al inicio para orden descendente.
+        limit (int): Cantidad máxima de estudiantes.
+        offset (int): Estudiantes a omitir.
+
+    Returns:
+        list[Estudiante]: Estudiantes que cumplen todos los filtros (vacía si no hay).
+    """
+
+    condiciones = [
+        filtroValores(Estudiante.cedula, cedula),
+        filtroPrefijo(Estudiante.nombre, nombre.upper() if nombre else None, engine.dialect.name),
+        filtroValores(Estudiante.email, [valor.lower() for valor in email or []]),
+        filtroValores(Estudiante.semestre, semestre)
+    ]
+    return session.exec(consultaFiltrada(Estudiante, condiciones, ORDEN_ESTUDIANTES, orden, limit, offset)).all()
+
+
+
 # READ - Cursos de un estudiante
 @router.get("/{cedula}/mis-cursos", response_model=list[Curso])
-async def misCursos(cedula: str, session: SessionDep):
+def misCursos(cedula: str, session: SessionDep):
 
     """
     Obtener todos los cursos en los que está matriculado un estudiante.
@@ -268,7 +619,7 @@ async def misCursos(cedula: str, session: SessionDep):
         raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
     
     # Verificar que el estudiante exista
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
+    estudianteDB = obtenerEstudiante(session, cedula)
     # Si no existe el estudiante
     if not estudianteDB:
         raise HTTPException(404, "Estudiante no encontrado")
@@ -293,7 +644,7 @@ async def misCursos(cedula: str, session: SessionDep):
 
 # READ - Obtener un estudiante filtrado por semestre y email
 @router.get("/{semestre}/{email}", response_model=Estudiante)
-async def estudiantePorSemestreYemail(semestre: Semestre, email: str, session: SessionDep):
+def estudiantePorSemestreYemail(semestre: Semestre, email: str, session: SessionDep):
 
     """
     Obtener un estudiante por semestre y email.
@@ -317,10 +668,11 @@ async def estudiantePorSemestreYemail(semestre: Semestre, email: str, session: S
     if "@ucatolica.edu.co" not in email:
         raise HTTPException(400, "El email debe tener dominio ucatolica.edu.co")
 
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.semestre == semestre or Estudiante.email == email)).first()
+    # El email es unico: se busca por email y despues se valida el semestre
+    estudianteDB = session.exec(select(Estudiante).where(Estudiante.email == email)).first()
     # Si no existe un estudiante con ese email
     if not estudianteDB:
-        raise HTTPException(404, f"Estudiante no encontrado")
+        raise HTTPException(404, "Estudiante no encontrado")
     # Si el estudiante no esta en el semestre ingresado
     if estudianteDB.semestre != semestre:
         raise HTTPException(404, f"Estudiante con email {email} no esta en el semestre {semestre.value}")
@@ -329,9 +681,24 @@ async def estudiantePorSemestreYemail(semestre: Semestre, email: str, session: S
 
 
 
+# READ - Estadisticas de la cache de estudiantes
+@router.get("/cache")
+def estadisticasCacheEstudiantes():
+
+    """
+    Obtener los contadores de la caché de estudiantes por cédula y email.
+
+    Returns:
+        dict: Tamaño, aciertos, fallos, desalojos y expiraciones de la caché.
+    """
+
+    return cacheEstudiantes.estadisticas()
+
+
+
 # UPDATE - Actualizar el semestre de un estudiante
 @router.patch("/{cedula}/actualizar", response_model=Estudiante)
-async def actualizarJornadaCurso(session: SessionDep, cedula: str, semestre: Semestre = Form(...)):
+def actualizarJornadaCurso(session: SessionDep, cedula: str, semestre: Semestre = Form(...)):
 
     """
     Actualizar el semestre de un estudiante.
@@ -367,6 +734,7 @@ async def actualizarJornadaCurso(session: SessionDep, cedula: str, semestre: Sem
     #Insertar curso actualizado en la DB
     session.add(estudianteDB)
     session.commit() # Guardar los cambios
+    cacheEstudiantes.invalidar(cedula)
     session.refresh(estudianteDB)
     
     return estudianteDB
@@ -375,12 +743,15 @@ async def actualizarJornadaCurso(session: SessionDep, cedula: str, semestre: Sem
 
 # DELETE - Eliminar un estudiante
 @router.delete("/{cedula}/eliminar")
-async def eliminarEstudiante(cedula: str, session: SessionDep):
+def eliminarEstudiante(cedula: str, session: SessionDep):
 
     """
     Eliminar un estudiante y mover su información al histórico.
 
     También guarda en el histórico las matrículas asociadas con razón de eliminación.
+    El archivado se hace con un `INSERT ... SELECT` y un `DELETE` masivo dentro de
+    la misma transacción que elimina al estudiante. Si el estudiante ocupaba un
+    cupo, se asigna al primero de la lista de espera del curso.
 
     Args:
         cedula (str): Cédula del estudiante a eliminar.
@@ -390,7 +761,8 @@ async def eliminarEstudiante(cedula: str, session: SessionDep):
         dict: Mensaje de confirmación.
 
     Raises:
-        HTTPException: 400 si la cédula no es válida, 404 si no existe.
+        HTTPException: 400 si la cédula no es válida o si otra petición matriculó
+            en paralelo al estudiante promovido, 404 si no existe.
     """
 
     # Validar que la cedula sea numerica
@@ -407,38 +779,58 @@ async def eliminarEstudiante(cedula: str, session: SessionDep):
     if not estudianteDB:
         raise HTTPException(404, "Estudiante no encontrado")
     
-    # Guardar matrículas relacionadas en el histórico antes de borrar
-    matriculasDB = session.exec(select(Matricula).where(Matricula.cedula == cedula)).all()
-    for matricula in matriculasDB:
-        # Determinar razón de eliminación según estado de la matricula
-        if matricula.matriculado == EstadoMatricula.FINALIZADO:
-            razon = "Estudiante eliminado - curso finalizado"
-        elif matricula.matriculado == EstadoMatricula.DESMATRICULADO:
-            razon = "Estudiante eliminado - curso desmatriculado"
-        elif matricula.matriculado == EstadoMatricula.MATRICULADO:
-            razon = "Estudiante eliminado - curso en progreso"
-
-        matriculaHistorica = MatriculaHistorica(
-            codigo=matricula.codigo,
-            cedula=matricula.cedula,
-            matriculado=matricula.matriculado,
-            razonEliminado=razon
-        )
-        # Insertar las matriculas del curso al historico
-        session.add(matriculaHistorica)
-    session.commit() # Guardar los cambios
-    
-    # Copiar a estudiante historico
-    estudianteHistorico = EstudianteHistorico(
-        cedula=estudianteDB.cedula,
-        nombre=estudianteDB.nombre,
-        email=estudianteDB.email,
-        semestre=estudianteDB.semestre
+    # Determinar razón de eliminación según estado de la matricula
+    razon = case(
+        (Matricula.matriculado == EstadoMatricula.FINALIZADO, "Estudiante eliminado - curso finalizado"),
+        (Matricula.matriculado == EstadoMatricula.DESMATRICULADO, "Estudiante eliminado - curso desmatriculado"),
+        (Matricula.matriculado == EstadoMatricula.MATRICULADO, "Estudiante eliminado - curso en progreso")
     )
-    session.add(estudianteHistorico)
-    
-    # Eliminar el estudiante de la DB
-    session.delete(estudianteDB)
-    session.commit() # Guardar los cambios
+
+    # Archivar, eliminar y ceder el cupo en una transaccion; si otra peticion matriculo
+    # en paralelo al promovido, el indice de matricula activa unica la revierte
+    with transaccionMatricula(session, "Otra peticion matriculo al siguiente estudiante de la lista de espera. Intente de nuevo"):
+        # Guardar matrículas relacionadas en el histórico antes de borrar
+        session.exec(
+            insert(MatriculaHistorica).from_select(
+                ["codigo", "cedula", "matriculado", "fechaEliminado", "razonEliminado"],
+                select(
+                    Matricula.codigo,
+                    Matricula.cedula,
+                    Matricula.matriculado,
+                    literal(dt.now()),
+                    razon
+                ).where(Matricula.cedula == cedula)
+            )
+        )
+        # Curso en el que el estudiante ocupa un cupo
+        cursoActivo = session.exec(
+            select(Matricula.codigo).where(
+                Matricula.cedula == cedula,
+                Matricula.matriculado == EstadoMatricula.MATRICULADO
+            )
+        ).first()
+
+        # Descontar las matriculas de los contadores de cada curso y eliminarlas
+        descontarMatriculas(session, Matricula.cedula == cedula)
+        session.exec(delete(Matricula).where(Matricula.cedula == cedula))
+        session.exec(delete(ListaEspera).where(ListaEspera.cedula == cedula))
+
+        # Ceder el cupo liberado al primero de la lista de espera del curso
+        if cursoActivo is not None:
+            promoverListaEspera(session, cursoActivo)
+
+        # Copiar a estudiante historico
+        estudianteHistorico = EstudianteHistorico(
+            cedula=estudianteDB.cedula,
+            nombre=estudianteDB.nombre,
+            email=estudianteDB.email,
+            semestre=estudianteDB.semestre
+        )
+        session.add(estudianteHistorico)
+
+        # Eliminar el estudiante de la DB
+        session.exec(delete(Estudiante).where(Estudiante.id == estudianteDB.id))
+    cacheEstudiantes.invalidar(cedula)
+    indiceEstudiantes.eliminar(cedula)
 
     return {"Mensaje": "Estudiante eliminado correctamente"}
\ No newline at end of file
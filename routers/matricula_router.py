@@ -3,25 +3,206 @@ Módulo: matricula_router
 ------------------------
 Endpoints relacionados con la gestión de matrículas en el sistema académico.
 
-Incluye operaciones para matricular, desmatricular, finalizar cursos, rematricular
-y consultar las matrículas activas por estudiante o curso.
+Incluye operaciones para matricular, desmatricular, finalizar cursos, rematricular,
+consultar las matrículas activas por estudiante o curso y manejar la lista de
+espera de los cursos sin cupos.
 """
 
-from fastapi import APIRouter, HTTPException, Form
+from fastapi import APIRouter, HTTPException, Form, Query, Response
 from ..db.db import SessionDep
-from sqlmodel import select
-from sqlalchemy import or_
-from ..models.matricula import Matricula
+from ..db.cache import obtenerCurso, obtenerEstudiante
+from ..db.conteos import ajustarConteo
+from ..db.espera import promoverListaEspera
+from ..db.carga import conflictoCarga
+from sqlmodel import select, insert, update, delete
+from datetime import datetime as dt
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+from sqlalchemy import or_, exists
+from sqlalchemy.exc import IntegrityError
+from ..models.matricula import Matricula, MatriculaLote, ListaEspera
 from ..models.estudiante import Estudiante
-from ..models.curso import Curso
+from ..models.curso import Curso, CursoConteo
 from ..utils.enum import EstadoMatricula
+from ..utils.paginacion import consultaPorLlave, paginaPorLlave, respuestaNDJSON
+from ..utils.serializacion import columnasRespuesta, RespuestaFilas
+from ..utils.lotes import fragmentar
+from ..utils.idempotencia import LlaveIdempotencia, respuestaIdempotente, guardarRespuestaIdempotente
 
 router = APIRouter(prefix="/matricula", tags=["Matriculas"])
 
+# Cantidad maxima de valores por consulta IN en las operaciones masivas
+TAMANO_LOTE_CONSULTA = 500
+
+# Curso y estudiante que se incluyen en cada matricula con `expandir`
+RELACIONES_MATRICULA = {"curso": Curso, "estudiante": Estudiante}
+origenExpandido = (
+    Matricula.__table__
+        .outerjoin(Curso.__table__, Curso.codigo == Matricula.codigo)
+        .outerjoin(Estudiante.__table__, Estudiante.cedula == Matricula.cedula)
+)
+
+
+# Matriculas con su curso y estudiante en un solo SELECT
+def consultaExpandida(*condiciones):
+
+    """
+    Construir la consulta de matrículas con las columnas de su curso y estudiante.
+
+    Se unen las tres tablas en la misma consulta, así una lista de matrículas
+    expandidas cuesta un solo SELECT sin importar cuántas filas tenga.
+
+    Args:
+        *condiciones: Condiciones del `WHERE` sobre `Matricula`.
+
+    Returns:
+        Select: Consulta de tuplas para `RespuestaFilas` con `RELACIONES_MATRICULA`.
+    """
+
+    return (
+        select(*columnasRespuesta(Matricula, RELACIONES_MATRICULA))
+            .select_from(origenExpandido)
+            .where(*condiciones)
+            .order_by(Matricula.id)
+    )
+
+# Consulta consolidada para validar las reglas de matricula
+def validacionMatricula(session: SessionDep, codigo: str, cedula: str):
+
+    """
+    Obtener en una sola consulta los datos que necesitan las reglas de matrícula.
+
+    Reemplaza las consultas separadas de curso, estudiante, matrícula existente,
+    matrícula activa en otro curso y datos del curso por un único SELECT con
+    subconsultas.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        codigo (str): Código del curso.
+        cedula (str): Cédula del estudiante.
+
+    Returns:
+        Row: Fila con `cursoExiste`, `estudianteExiste`, `matriculaID` y `estado`
+            (matrícula del estudiante en el curso), `matriculaActivaID` (matrícula
+            MATRICULADO en el curso), `activoEnOtroCurso`, y `horario` y `creditos`
+            del curso.
+    """
+
+    # Todas las subconsultas toman la matrícula más reciente, así `matriculaID` y
+    # `estado` describen la misma fila aunque haya varias en el historial
+    matriculaEnCurso = select(Matricula.id, Matricula.matriculado).where(
+        Matricula.codigo == codigo,
+        Matricula.cedula == cedula
+    ).order_by(Matricula.id.desc())
+    consulta = select(
+        exists().where(Curso.codigo == codigo).label("cursoExiste"),
+        exists().where(Estudiante.cedula == cedula).label("estudianteExiste"),
+        matriculaEnCurso.with_only_columns(Matricula.id).limit(1).scalar_subquery().label("matriculaID"),
+        matriculaEnCurso.with_only_columns(Matricula.matriculado).limit(1).scalar_subquery().label("estado"),
+        matriculaEnCurso.with_only_columns(Matricula.id).where(
+            Matricula.matriculado == EstadoMatricula.MATRICULADO
+        ).limit(1).scalar_subquery().label("matriculaActivaID"),
+        exists().where(
+            Matricula.cedula == cedula,
+            Matricula.matriculado == EstadoMatricula.MATRICULADO,
+            Matricula.codigo != codigo
+        ).label("activoEnOtroCurso"),
+        select(Curso.horario).where(Curso.codigo == codigo).scalar_subquery().label("horario"),
+        select(Curso.creditos).where(Curso.codigo == codigo).scalar_subquery().label("creditos")
+    )
+    return session.exec(consulta).one()
+
+
+# Validar que el curso quepa en la carga academica del estudiante
+def validarCarga(validacion):
+
+    """
+    Validar cruces de horario y el máximo de créditos del curso a matricular.
+
+    Mientras un estudiante solo pueda tener un curso activo, el que pasa la
+    validación de `activoEnOtroCurso` no tiene carga y basta con validar el curso.
+
+    Args:
+        validacion (Row): Resultado de `validacionMatricula`.
+
+    Raises:
+        HTTPException: 400 si el horario se cruza o se supera el máximo de créditos.
+    """
+
+    conflicto = conflictoCarga(0, 0, validacion.horario, validacion.creditos)
+    if conflicto:
+        raise HTTPException(400, conflicto)
+
+
+
+# Transaccion que puede activar una matricula
+@contextmanager
+def transaccionMatricula(
+    session: SessionDep,
+    mensaje: str = "El estudiante no puede estar registrado en mas de un curso a la vez"
+    ):
+
+    """
+    Ejecutar las escrituras del bloque y hacer commit, traduciendo la violación de
+    la regla de matrícula activa única.
+
+    El índice único parcial `ux_matricula_cedula_activa` impide en la base de datos
+    que un estudiante quede MATRICULADO en dos cursos, aunque dos peticiones
+    simultáneas pasen la validación previa. Si una escritura del bloque o el commit
+    viola el índice se revierte la transacción y se responde con el mismo error 400
+    de la validación.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        mensaje (str): Mensaje del error 400.
+
+    Raises:
+        HTTPException: 400 si el estudiante ya quedó matriculado en otro curso.
+    """
+
+    try:
+        yield
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(400, mensaje)
+
+
+
+# Reservar cupos de un curso para matriculas que pasan a MATRICULADO
+def reservarCupo(
+    session: SessionDep,
+    codigo: str,
+    anterior: Optional[EstadoMatricula],
+    cantidad: int = 1,
+    mensaje: str = "El curso no tiene cupos disponibles"
+    ):
+
+    """
+    Ocupar cupos del curso actualizando sus contadores de forma condicional.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        codigo (str): Código del curso.
+        anterior (Optional[EstadoMatricula]): Estado anterior de las matrículas.
+        cantidad (int): Cantidad de cupos a ocupar.
+        mensaje (str): Mensaje del error 400.
+
+    Raises:
+        HTTPException: 400 si el curso no tiene cupo suficiente.
+    """
+
+    if not ajustarConteo(session, codigo, anterior, EstadoMatricula.MATRICULADO, cantidad):
+        raise HTTPException(400, mensaje)
+
+
+
 # CREATE - Crear matricula
 @router.post("/matricular-estudiante", response_model=Matricula, status_code=201)
-async def matricularEstudiante(
+def matricularEstudiante(
     session: SessionDep,
+    idempotencyKey: LlaveIdempotencia,
     codigo: str = Form(...),
     cedula: str = Form(...)
     ):
@@ -32,8 +213,13 @@ async def matricularEstudiante(
     Valida que el estudiante no esté ya matriculado en otro curso activo,
     y que no esté matriculado en el mismo curso con estado MATRICULADO.
 
+    Si se envía la cabecera `Idempotency-Key`, un reintento con la misma llave
+    devuelve la respuesta del primer intento, o 409 si el primer intento todavía
+    se está procesando.
+
     Args:
         session (SessionDep): Sesión de base de datos.
+        idempotencyKey (Optional[str]): Llave de idempotencia del cliente.
         codigo (str): Código del curso.
         cedula (str): Cédula del estudiante.
 
@@ -47,15 +233,21 @@ async def matricularEstudiante(
     # Convertir el codigo a mayuscula
     codigo = codigo.upper()
 
+    # Si es un reintento con la misma llave devolver la respuesta original
+    respuestaPrevia = respuestaIdempotente(idempotencyKey, "matricular", (codigo, cedula))
+    if respuestaPrevia:
+        return respuestaPrevia
+
     # Validar que el codigo sea valido
     if not len(codigo) == 7:
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
     
+    # Consultar de una vez los datos que necesitan las validaciones
+    validacion = validacionMatricula(session, codigo, cedula)
+
     # Verificar que el curso exista
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
-    # Si no existe el curso
-    if not cursoDB:
-        raise HTTPException(404, f"Curso no encontrado")
+    if not validacion.cursoExiste:
+        raise HTTPException(404, "Curso no encontrado")
 
     # Validar que la cedula sea numerica
     if not cedula.isdigit():
@@ -66,36 +258,32 @@ async def matricularEstudiante(
         raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
     
     # Verificar que el estudiante exista
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
-    # Si no existe el estudiante
-    if not estudianteDB:
+    if not validacion.estudianteExiste:
         raise HTTPException(404, "Estudiante no encontrado")
     
-    # Validar si el matricula ya existe
-    matriculaDB = session.exec(select(Matricula).where(Matricula.codigo == codigo, Matricula.cedula == cedula)).first()
     # Validar si el estudiante ya esta con estado MATRICULADO en ese curso
-    if matriculaDB and matriculaDB.matriculado == EstadoMatricula.MATRICULADO:
+    if validacion.estado == EstadoMatricula.MATRICULADO:
         raise HTTPException(400, "El estudiante ya esta matriculado en ese curso")
     
-    if matriculaDB and matriculaDB.matriculado == EstadoMatricula.FINALIZADO:
+    if validacion.estado == EstadoMatricula.FINALIZADO:
         raise HTTPException(400, "El estudiante ya estuvo matriculado en ese curso")
     
-    # Verificar si el estudiante ya esta matriculado en otro curso (esta activo)
-    matriculadoEnOtroCurso = session.exec(select(Matricula).where(
-        Matricula.cedula == cedula,
-        Matricula.matriculado == EstadoMatricula.MATRICULADO,
-        Matricula.codigo != codigo)
-        ).first()
     # Si ya esta matriculado en otro curso
-    if matriculadoEnOtroCurso:
+    if validacion.activoEnOtroCurso:
         raise HTTPException(400, "El estudiante no puede estar registrado en mas de un curso a la vez")
+
+    # Validar cruces de horario y maximo de creditos
+    validarCarga(validacion)
     
     # Si ya existia pero estaba desmatriculado lo reactiva
-    if matriculaDB and matriculaDB.matriculado == EstadoMatricula.DESMATRICULADO:
-        matriculaDB.matriculado = EstadoMatricula.MATRICULADO
-        session.add(matriculaDB)
-        session.commit()
+    if validacion.estado == EstadoMatricula.DESMATRICULADO:
+        matriculaDB = session.get(Matricula, validacion.matriculaID)
+        with transaccionMatricula(session): # Guardar los cambios
+            reservarCupo(session, codigo, EstadoMatricula.DESMATRICULADO)
+            matriculaDB.matriculado = EstadoMatricula.MATRICULADO
+            session.add(matriculaDB)
         session.refresh(matriculaDB)
+        guardarRespuestaIdempotente(idempotencyKey, "matricular", (codigo, cedula), 201, matriculaDB)
         return matriculaDB
     
     # Si no esta matriculado, lo crea
@@ -104,44 +292,220 @@ async def matricularEstudiante(
         cedula=cedula,
         matriculado=EstadoMatricula.MATRICULADO
     )
-    # Insertar el matricula a la DB
-    session.add(nuevaMatricula)
-    session.commit() # Guardar los cambios
+    # Ocupar un cupo e insertar el matricula a la DB
+    with transaccionMatricula(session): # Guardar los cambios
+        reservarCupo(session, codigo, None)
+        session.add(nuevaMatricula)
     session.refresh(nuevaMatricula)
+    guardarRespuestaIdempotente(idempotencyKey, "matricular", (codigo, cedula), 201, nuevaMatricula)
 
     return nuevaMatricula # Devuelve el objeto matricula
 
 
 
+# CREATE - Matricular muchos estudiantes a la vez
+@router.post("/matricular-lote")
+def matricularLote(session: SessionDep, lote: MatriculaLote):
+
+    """
+    Matricular muchos estudiantes en una sola petición.
+
+    Aplica las mismas reglas de `matricularEstudiante` a cada par curso-estudiante,
+    pero consulta todos los cursos, estudiantes y matrículas involucrados con
+    unas pocas consultas por conjuntos, valida en memoria la regla de una sola
+    matrícula activa, los cupos y la carga académica, y guarda todas las
+    matrículas aceptadas en una sola transacción.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        lote (MatriculaLote): Curso con lista de cédulas y/o lista de pares.
+
+    Returns:
+        list[dict]: Resultado por cada par, en el orden recibido, con el código
+            de estado que habría devuelto `matricularEstudiante`.
+
+    Raises:
+        HTTPException: 422 si se envían `cedulas` sin el `codigo` del curso.
+    """
+
+    # Las cedulas sin codigo no tienen curso en el cual matricularse
+    if lote.cedulas and lote.codigo is None:
+        raise HTTPException(422, "Las cedulas requieren el codigo del curso")
+
+    # Reunir los pares en el orden recibido
+    pares = [(par.codigo.upper(), par.cedula) for par in lote.pares]
+    if lote.codigo is not None:
+        pares += [(lote.codigo.upper(), cedula) for cedula in lote.cedulas]
+
+    codigos = {codigo for codigo, _ in pares if len(codigo) == 7}
+    cedulas = {cedula for _, cedula in pares if cedula.isdigit() and 7 <= len(cedula) <= 10}
+
+    # Consultar por conjuntos los cursos (con sus cupos libres), estudiantes y matriculas del lote
+    cuposLibres = {}
+    horarioCreditos = {}
+    for fragmento in fragmentar(codigos, TAMANO_LOTE_CONSULTA):
+        cursos = session.exec(
+            select(Curso.codigo, Curso.cupo, Curso.horario, Curso.creditos, CursoConteo.matriculados)
+                .outerjoin(CursoConteo, CursoConteo.codigo == Curso.codigo)
+                .where(Curso.codigo.in_(fragmento))
+            ).all()
+        for codigo, cupo, horario, creditos, matriculados in cursos:
+            cuposLibres[codigo] = None if cupo is None else cupo - (matriculados or 0)
+            horarioCreditos[codigo] = (horario, creditos)
+
+    estudiantesExistentes = set()
+    estadoPorPar = {}
+    cursoActivo = {}
+    for fragmento in fragmentar(cedulas, TAMANO_LOTE_CONSULTA):
+        estudiantesExistentes.update(session.exec(
+            select(Estudiante.cedula).where(Estudiante.cedula.in_(fragmento))
+        ).all())
+        matriculas = session.exec(
+            select(Matricula.id, Matricula.codigo, Matricula.cedula, Matricula.matriculado)
+                .where(Matricula.cedula.in_(fragmento))
+                .order_by(Matricula.id)
+            ).all()
+        for matriculaID, codigo, cedula, estado in matriculas:
+            estadoPorPar.setdefault((codigo, cedula), (matriculaID, estado))
+            if estado == EstadoMatricula.MATRICULADO:
+                cursoActivo[cedula] = codigo
+
+    # Validar cada par con las reglas de matricula
+    resultados = []
+    nuevas = []
+    reactivadas = []
+    # Matriculas activadas por curso y estado anterior, para los contadores
+    activadasPorCurso = Counter()
+    for codigo, cedula in pares:
+        matriculaID, estado = estadoPorPar.get((codigo, cedula), (None, None))
+
+        if not len(codigo) == 7:
+            error = (400, "El codigo debe tener 7 caracteres")
+        elif codigo not in cuposLibres:
+            error = (404, "Curso no encontrado")
+        elif not cedula.isdigit():
+            error = (400, "La cedula debe ser numerica")
+        elif not 7 <= len(cedula) <= 10:
+            error = (400, "La cedula debe tener entre 7 y 10 numeros")
+        elif cedula not in estudiantesExistentes:
+            error = (404, "Estudiante no encontrado")
+        elif estado == EstadoMatricula.MATRICULADO:
+            error = (400, "El estudiante ya esta matriculado en ese curso")
+        elif estado == EstadoMatricula.FINALIZADO:
+            error = (400, "El estudiante ya estuvo matriculado en ese curso")
+        elif cursoActivo.get(cedula, codigo) != codigo:
+            error = (400, "El estudiante no puede estar registrado en mas de un curso a la vez")
+        elif cuposLibres[codigo] is not None and cuposLibres[codigo] <= 0:
+            error = (400, "El curso no tiene cupos disponibles")
+        elif conflicto := conflictoCarga(0, 0, *horarioCreditos[codigo]):
+            error = (400, conflicto)
+        else:
+            error = None
+
+        if error:
+            resultados.append({"codigo": codigo, "cedula": cedula, "status": error[0], "detalle": error[1]})
+            continue
+
+        # Si ya existia pero estaba desmatriculado se reactiva, si no se crea
+        if estado == EstadoMatricula.DESMATRICULADO:
+            reactivadas.append(matriculaID)
+        else:
+            nuevas.append({
+                "codigo": codigo,
+                "cedula": cedula,
+                "fecha": dt.now(),
+                "matriculado": EstadoMatricula.MATRICULADO
+            })
+        activadasPorCurso[(codigo, estado)] += 1
+        if cuposLibres[codigo] is not None:
+            cuposLibres[codigo] -= 1
+        # Registrar el cambio para los siguientes pares del mismo lote
+        estadoPorPar[(codigo, cedula)] = (matriculaID, EstadoMatricula.MATRICULADO)
+        cursoActivo[cedula] = codigo
+        resultados.append({"codigo": codigo, "cedula": cedula, "status": 201, "detalle": "Estudiante matriculado"})
+
+    # Guardar todas las matriculas aceptadas en una sola transaccion
+    with transaccionMatricula(session, "Otra peticion matriculo a un estudiante del lote en otro curso. Intente de nuevo"):
+        for (codigo, estado), cantidad in activadasPorCurso.items():
+            reservarCupo(
+                session, codigo, estado, cantidad,
+                "Otra peticion ocupo cupos de un curso del lote. Intente de nuevo"
+            )
+        for fragmento in fragmentar(reactivadas, TAMANO_LOTE_CONSULTA):
+            session.exec(
+                update(Matricula)
+                    .where(Matricula.id.in_(fragmento))
+                    .values(matriculado=EstadoMatricula.MATRICULADO)
+            )
+        if nuevas:
+            session.exec(insert(Matricula), params=nuevas)
+
+    return resultados
+
+
+
 # READ - Obtener todos los matriculas que hay
 @router.get("/todos", response_model=list[Matricula])
-async def listaMatriculas(session: SessionDep):
+def listaMatriculas(
+    session: SessionDep,
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    after: Optional[int] = None,
+    ndjson: bool = False,
+    expandir: bool = False
+    ):
 
     """
     Obtener todas las matrículas activas (estado MATRICULADO).
 
+    Permite paginar por llave con `limit` y `after`, o transmitir como NDJSON.
+    Con `expandir` cada matrícula incluye su `curso` y su `estudiante`, leídos en
+    la misma consulta de la página.
+
     Args:
         session (SessionDep): Sesión de base de datos.
+        response (Response): Respuesta donde se publica el siguiente cursor.
+        limit (Optional[int]): Tamaño de página para paginar por `id`.
+        after (Optional[int]): Cursor (último `id` recibido) de la página anterior.
+        ndjson (bool): Transmitir el listado como NDJSON en lugar de un arreglo.
+        expandir (bool): Incluir el curso y el estudiante de cada matrícula (no
+            aplica a NDJSON).
 
     Returns:
         list[Matricula]: Matrículas activas.
     """
 
-    listaMatriculas = session.exec(select(Matricula)).all()
-    return listaMatriculas
+    # Transmitir las matriculas como NDJSON
+    if ndjson:
+        consulta = consultaPorLlave(Matricula, after, limit, columnasRespuesta(Matricula))
+        return respuestaNDJSON(session, consulta, Matricula)
+
+    # Incluir el curso y el estudiante de cada matricula con un join
+    if expandir:
+        columnas = columnasRespuesta(Matricula, RELACIONES_MATRICULA)
+        listaMatriculas = paginaPorLlave(session, Matricula, response, limit, after, columnas, origenExpandido)
+        return RespuestaFilas(listaMatriculas, Matricula, headers=response.headers, relacionados=RELACIONES_MATRICULA)
+
+    # Consultar solo las columnas y codificarlas sin validar cada fila
+    listaMatriculas = paginaPorLlave(session, Matricula, response, limit, after, columnasRespuesta(Matricula))
+    return RespuestaFilas(listaMatriculas, Matricula, headers=response.headers)
 
 
 
 # READ - Obtener un estudiante y sus cursos
 @router.get("/estudiante/{cedula}", response_model=list[Matricula])
-async def cursosDeEstudiante(cedula: str, session: SessionDep):
+def cursosDeEstudiante(cedula: str, session: SessionDep, expandir: bool = False):
 
     """
     Obtener todas las matrículas de un estudiante.
 
+    Con `expandir` cada matrícula incluye su `curso` y su `estudiante`, leídos en
+    una sola consulta.
+
     Args:
         cedula (str): Cédula del estudiante.
         session (SessionDep): Sesión de base de datos.
+        expandir (bool): Incluir el curso y el estudiante de cada matrícula.
 
     Returns:
         list[Matricula]: Matrículas del estudiante.
@@ -159,7 +523,7 @@ async def cursosDeEstudiante(cedula: str, session: SessionDep):
         raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
 
     # Validar si ya existe el estudiante
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
+    estudianteDB = obtenerEstudiante(session, cedula)
     # Si no existe la matricula
     if not estudianteDB:
         raise HTTPException(404, "Estudiante no encontrado")
@@ -175,6 +539,13 @@ async def cursosDeEstudiante(cedula: str, session: SessionDep):
     if not estudianteDB:
         raise HTTPException(404, "Estudiante sin matriculas activas")
 
+    # Incluir el curso y el estudiante de cada matricula con un join
+    if expandir:
+        matriculaDB = session.exec(consultaExpandida(Matricula.cedula == cedula)).all()
+        if not matriculaDB:
+            raise HTTPException(404, "No tienes cursos")
+        return RespuestaFilas(matriculaDB, Matricula, relacionados=RELACIONES_MATRICULA)
+
     matriculaDB = session.exec(select(Matricula).where(Matricula.cedula == cedula)).all()
     if not matriculaDB:
         raise HTTPException(404, "No tienes cursos")
@@ -184,14 +555,18 @@ async def cursosDeEstudiante(cedula: str, session: SessionDep):
 
 # READ - Obtener un curso y sus estudiantes asociados
 @router.get("/curso/{codigo}", response_model=list[Matricula])
-async def estudiantesEnCurso(codigo: str, session: SessionDep):
+def estudiantesEnCurso(codigo: str, session: SessionDep, expandir: bool = False):
 
     """
     Obtener todas las matrículas activas de un curso.
 
+    Con `expandir` cada matrícula incluye su `curso` y su `estudiante`, leídos en
+    una sola consulta.
+
     Args:
         codigo (str): Código del curso.
         session (SessionDep): Sesión de base de datos.
+        expandir (bool): Incluir el curso y el estudiante de cada matrícula.
 
     Returns:
         list[Matricula]: Matrículas activas del curso.
@@ -208,11 +583,20 @@ async def estudiantesEnCurso(codigo: str, session: SessionDep):
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
     
     # Verificar que el curso exista
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
+    cursoDB = obtenerCurso(session, codigo)
     # Si no existe el curso
     if not cursoDB:
-        raise HTTPException(404, f"Curso no encontrado")
+        raise HTTPException(404, "Curso no encontrado")
     
+    # Incluir el curso y el estudiante de cada matricula con un join
+    if expandir:
+        matriculaDB = session.exec(
+            consultaExpandida(Matricula.codigo == codigo, Matricula.matriculado == EstadoMatricula.MATRICULADO)
+        ).all()
+        if not matriculaDB:
+            raise HTTPException(404, "No hay estudiantes en este curso")
+        return RespuestaFilas(matriculaDB, Matricula, relacionados=RELACIONES_MATRICULA)
+
     # Verificar que estudiantes estan en ese curso
     matriculaDB = session.exec(select(Matricula).where(Matricula.codigo == codigo, Matricula.matriculado == EstadoMatricula.MATRICULADO)).all()
     if not matriculaDB:
@@ -223,7 +607,7 @@ async def estudiantesEnCurso(codigo: str, session: SessionDep):
 
 # UPDATE - Actualizar matricula
 @router.patch("/{matriculaID}/actualizar", response_model=Matricula)
-async def actualizarMatricula(
+def actualizarMatricula(
     session: SessionDep,
     matriculaID: int,
     codigo: str = Form(...),
@@ -233,7 +617,8 @@ async def actualizarMatricula(
     """
     Actualizar los datos de una matrícula.
 
-    No permite modificar matrículas finalizadas.
+    No permite modificar matrículas finalizadas. Si una matrícula activa cambia
+    de curso, el cupo liberado se asigna a la lista de espera del curso anterior.
 
     Args:
         session (SessionDep): Sesión de base de datos.
@@ -245,7 +630,8 @@ async def actualizarMatricula(
         Matricula: Matrícula actualizada.
 
     Raises:
-        HTTPException: 400 si ya existe o 404 si no se encuentra o está finalizada.
+        HTTPException: 400 si ya existe o no cabe en la carga académica del
+            estudiante, 404 si no se encuentra o está finalizada.
     """
 
     # Convertir el codigo a mayuscula
@@ -255,11 +641,12 @@ async def actualizarMatricula(
     if not len(codigo) == 7:
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
     
+    # Consultar de una vez los datos que necesitan las validaciones
+    validacion = validacionMatricula(session, codigo, cedula)
+
     # Verificar que el curso exista
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
-    # Si no existe el curso
-    if not cursoDB:
-        raise HTTPException(404, f"Curso no encontrado")
+    if not validacion.cursoExiste:
+        raise HTTPException(404, "Curso no encontrado")
 
     # Validar que la cedula sea numerica
     if not cedula.isdigit():
@@ -270,9 +657,7 @@ async def actualizarMatricula(
         raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
     
     # Verificar que el estudiante exista
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
-    # Si no existe el estudiante
-    if not estudianteDB:
+    if not validacion.estudianteExiste:
         raise HTTPException(404, "Estudiante no encontrado")
 
     # Verificar que exista la matricula
@@ -285,24 +670,33 @@ async def actualizarMatricula(
         raise HTTPException(404, "No puedes modificar esta matricula por que fue finalizada")
 
     # Verificar que no haya otra matricula con los id de estudiante y curso que ingresan
-    existeMatricula = session.exec(
-        select(Matricula).where(
-            Matricula.codigo == codigo,
-            Matricula.cedula == cedula,
-            Matricula.matriculado == EstadoMatricula.MATRICULADO
-            )
-        ).first()
-    # Si existe la matricula
-    if existeMatricula:
+    if validacion.matriculaActivaID is not None:
         raise HTTPException(400, "Ya existe esa matricula")
+
+    # Validar que el nuevo curso quepa en la carga academica si la matricula esta activa
+    if matriculaDB.matriculado == EstadoMatricula.MATRICULADO:
+        validarCarga(validacion)
     
-    # Actualizar los datos de la matricula
-    matriculaDB.codigo = codigo
-    matriculaDB.cedula = cedula
+    with transaccionMatricula(session): # Guardar los cambios
+        # Mover la matricula en los contadores (y ocupar cupo) si cambia de curso
+        codigoAnterior = matriculaDB.codigo
+        if codigoAnterior != codigo:
+            if matriculaDB.matriculado == EstadoMatricula.MATRICULADO:
+                reservarCupo(session, codigo, None)
+            else:
+                ajustarConteo(session, codigo, None, matriculaDB.matriculado)
+            ajustarConteo(session, codigoAnterior, matriculaDB.matriculado, None)
+
+        # Actualizar los datos de la matricula
+        matriculaDB.codigo = codigo
+        matriculaDB.cedula = cedula
+
+        # Insertar la matricula actualizada en la DB
+        session.add(matriculaDB)
 
-    # Insertar la matricula actualizada en la DB
-    session.add(matriculaDB)
-    session.commit() # Guardar los cambios
+        # Ceder el cupo liberado en el curso anterior a la lista de espera
+        if codigoAnterior != codigo and matriculaDB.matriculado == EstadoMatricula.MATRICULADO:
+            promoverListaEspera(session, codigoAnterior)
     session.refresh(matriculaDB)
 
     return matriculaDB
@@ -311,17 +705,25 @@ async def actualizarMatricula(
 
 # PATCH - Finalizacion de un curso por parte de un estudiante
 @router.patch("/{cedula}/finalizar", response_model=Matricula)
-async def finalizarCurso(cedula: str, codigo: str, session: SessionDep):
+def finalizarCurso(
+    cedula: str,
+    codigo: str,
+    session: SessionDep,
+    idempotencyKey: LlaveIdempotencia
+    ):
 
     """
     Finalizar un curso por parte de un estudiante.
 
-    Cambia el estado de la matrícula a FINALIZADO.
+    Cambia el estado de la matrícula a FINALIZADO y asigna el cupo liberado al
+    primero de la lista de espera del curso. Acepta la cabecera `Idempotency-Key`
+    para que los reintentos devuelvan la respuesta original.
 
     Args:
         cedula (str): Cédula del estudiante.
         codigo (str): Código del curso.
         session (SessionDep): Sesión de base de datos.
+        idempotencyKey (Optional[str]): Llave de idempotencia del cliente.
 
     Returns:
         Matricula: Matrícula finalizada.
@@ -333,15 +735,21 @@ async def finalizarCurso(cedula: str, codigo: str, session: SessionDep):
     # Convertir el codigo a mayuscula
     codigo = codigo.upper()
 
+    # Si es un reintento con la misma llave devolver la respuesta original
+    respuestaPrevia = respuestaIdempotente(idempotencyKey, "finalizar", (codigo, cedula))
+    if respuestaPrevia:
+        return respuestaPrevia
+
     # Validar que el codigo sea valido
     if not len(codigo) == 7:
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
     
+    # Consultar de una vez los datos que necesitan las validaciones
+    validacion = validacionMatricula(session, codigo, cedula)
+
     # Verificar que el curso exista
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
-    # Si no existe el curso
-    if not cursoDB:
-        raise HTTPException(404, f"Curso no encontrado")
+    if not validacion.cursoExiste:
+        raise HTTPException(404, "Curso no encontrado")
 
     # Validar que la cedula sea numerica
     if not cedula.isdigit():
@@ -352,32 +760,25 @@ async def finalizarCurso(cedula: str, codigo: str, session: SessionDep):
         raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
     
     # Verificar que el estudiante exista
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
-    # Si no existe el estudiante
-    if not estudianteDB:
+    if not validacion.estudianteExiste:
         raise HTTPException(404, "Estudiante no encontrado")
 
-    # Validar si ya existe una matricula
-    matriculaDB = session.exec(
-        select(Matricula).where(
-            Matricula.codigo == codigo,
-            Matricula.cedula == cedula,
-            Matricula.matriculado == EstadoMatricula.MATRICULADO
-            )
-        ).first()
-    
-    # Si no existe la matricula
-    if not matriculaDB:
+    # Validar si ya existe una matricula activa
+    if validacion.matriculaActivaID is None:
         raise HTTPException(404, "Matricula no encontrada")
+    matriculaDB = session.get(Matricula, validacion.matriculaActivaID)
     
-    # Finalizar el curso si esta matriculado
-    if matriculaDB.matriculado == EstadoMatricula.MATRICULADO:
-        matriculaDB.matriculado = EstadoMatricula.FINALIZADO
-    
-    # Insertar la matricula actualizada a la DB
-    session.add(matriculaDB)
-    session.commit() # Guardar los cambios
+    with transaccionMatricula(session, "Otra peticion matriculo al siguiente estudiante de la lista de espera. Intente de nuevo"):
+        # Finalizar el curso si esta matriculado y ceder el cupo a la lista de espera
+        if matriculaDB.matriculado == EstadoMatricula.MATRICULADO:
+            matriculaDB.matriculado = EstadoMatricula.FINALIZADO
+            ajustarConteo(session, codigo, EstadoMatricula.MATRICULADO, EstadoMatricula.FINALIZADO)
+            promoverListaEspera(session, codigo)
+
+        # Insertar la matricula actualizada a la DB
+        session.add(matriculaDB)
     session.refresh(matriculaDB)
+    guardarRespuestaIdempotente(idempotencyKey, "finalizar", (codigo, cedula), 200, matriculaDB)
 
     return matriculaDB
 
@@ -385,17 +786,24 @@ async def finalizarCurso(cedula: str, codigo: str, session: SessionDep):
 
 # PATCH - Volver a matricular a un estudiante en un curso
 @router.patch("/{cedula}/rematricular", response_model=Matricula)
-async def rematricularEstudiante(cedula: str, codigo: str, session: SessionDep):
+def rematricularEstudiante(
+    cedula: str,
+    codigo: str,
+    session: SessionDep,
+    idempotencyKey: LlaveIdempotencia
+    ):
 
     """
     Rematricular a un estudiante en un curso previamente desmatriculado.
 
-    Valida que no esté activo en otro curso ni haya finalizado el mismo.
+    Valida que no esté activo en otro curso ni haya finalizado el mismo. Acepta la
+    cabecera `Idempotency-Key` para que los reintentos devuelvan la respuesta original.
 
     Args:
         cedula (str): Cédula del estudiante.
         codigo (str): Código del curso.
         session (SessionDep): Sesión de base de datos.
+        idempotencyKey (Optional[str]): Llave de idempotencia del cliente.
 
     Returns:
         Matricula: Matrícula reactivada.
@@ -407,15 +815,21 @@ async def rematricularEstudiante(cedula: str, codigo: str, session: SessionDep):
     # Convertir el codigo a mayuscula
     codigo = codigo.upper()
 
+    # Si es un reintento con la misma llave devolver la respuesta original
+    respuestaPrevia = respuestaIdempotente(idempotencyKey, "rematricular", (codigo, cedula))
+    if respuestaPrevia:
+        return respuestaPrevia
+
     # Validar que el codigo sea valido
     if not len(codigo) == 7:
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
     
+    # Consultar de una vez los datos que necesitan las validaciones
+    validacion = validacionMatricula(session, codigo, cedula)
+
     # Verificar que el curso exista
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
-    # Si no existe el curso
-    if not cursoDB:
-        raise HTTPException(404, f"Curso no encontrado")
+    if not validacion.cursoExiste:
+        raise HTTPException(404, "Curso no encontrado")
 
     # Validar que la cedula sea numerica
     if not cedula.isdigit():
@@ -426,41 +840,37 @@ async def rematricularEstudiante(cedula: str, codigo: str, session: SessionDep):
         raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
     
     # Verificar que el estudiante exista
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
-    # Si no existe el estudiante
-    if not estudianteDB:
+    if not validacion.estudianteExiste:
         raise HTTPException(404, "Estudiante no encontrado")
 
     # Validar si ya existe una matricula
-    matriculaDB = session.exec(select(Matricula).where(Matricula.codigo == codigo, Matricula.cedula == cedula)).first()
-    # Si no existe la matricula
-    if not matriculaDB:
+    if validacion.matriculaID is None:
         raise HTTPException(404, "Matricula no encontrada")
     
-    # Verificar si el estudiante ya esta matriculado en otro curso (esta activo)
-    matriculadoEnOtroCurso = session.exec(select(Matricula).where(
-        Matricula.cedula == cedula,
-        Matricula.matriculado == EstadoMatricula.MATRICULADO,
-        Matricula.codigo != codigo)
-        ).first()
     # Si ya esta matriculado en otro curso
-    if matriculadoEnOtroCurso:
+    if validacion.activoEnOtroCurso:
         raise HTTPException(400, "El estudiante no puede estar registrado en mas de un curso a la vez")
     
     # Validar si el estudiante ya habia sido matriculado en ese curso
-    if matriculaDB.matriculado == EstadoMatricula.MATRICULADO:
+    if validacion.estado == EstadoMatricula.MATRICULADO:
         raise HTTPException(400, "El estudiante ya esta matriculado en ese curso")
     
     # Validar si el estudiante ya finalizo el cuso
-    if matriculaDB.matriculado == EstadoMatricula.FINALIZADO:
+    if validacion.estado == EstadoMatricula.FINALIZADO:
         raise HTTPException(400, "El estudiante ya hizo este curso. No puede repetirlo")
+
+    # Validar cruces de horario y maximo de creditos
+    validarCarga(validacion)
     
     # Rematricular al estudiante si estaba desmatriculado
-    matriculaDB.matriculado = EstadoMatricula.MATRICULADO
-    # Insertar la matricula actualizada a la DB
-    session.add(matriculaDB)
-    session.commit() # Guardar los cambios
+    matriculaDB = session.get(Matricula, validacion.matriculaID)
+    with transaccionMatricula(session): # Guardar los cambios
+        reservarCupo(session, codigo, EstadoMatricula.DESMATRICULADO)
+        matriculaDB.matriculado = EstadoMatricula.MATRICULADO
+        # Insertar la matricula actualizada a la DB
+        session.add(matriculaDB)
     session.refresh(matriculaDB)
+    guardarRespuestaIdempotente(idempotencyKey, "rematricular", (codigo, cedula), 200, matriculaDB)
 
     return matriculaDB
 
@@ -468,12 +878,13 @@ async def rematricularEstudiante(cedula: str, codigo: str, session: SessionDep):
 
 # DELETE - Desmatricular a un estudiante de un curso
 @router.delete("/{cedula}/desmatricular", response_model=Matricula)
-async def desmatricularEstudiante(cedula: str, codigo: str, session: SessionDep):
+def desmatricularEstudiante(cedula: str, codigo: str, session: SessionDep):
 
     """
     Desmatricular a un estudiante de un curso.
 
-    Cambia el estado de la matrícula a DESMATRICULADO.
+    Cambia el estado de la matrícula a DESMATRICULADO y asigna el cupo liberado
+    al primero de la lista de espera del curso.
 
     Args:
         cedula (str): Cédula del estudiante.
@@ -494,11 +905,12 @@ async def desmatricularEstudiante(cedula: str, codigo: str, session: SessionDep)
     if not len(codigo) == 7:
         raise HTTPException(400, "El codigo debe tener 7 caracteres")
     
+    # Consultar de una vez los datos que necesitan las validaciones
+    validacion = validacionMatricula(session, codigo, cedula)
+
     # Verificar que el curso exista
-    cursoDB = session.exec(select(Curso).where(Curso.codigo == codigo)).first()
-    # Si no existe el curso
-    if not cursoDB:
-        raise HTTPException(404, f"Curso no encontrado")
+    if not validacion.cursoExiste:
+        raise HTTPException(404, "Curso no encontrado")
 
     # Validar que la cedula sea numerica
     if not cedula.isdigit():
@@ -509,28 +921,181 @@ async def desmatricularEstudiante(cedula: str, codigo: str, session: SessionDep)
         raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
     
     # Verificar que el estudiante exista
-    estudianteDB = session.exec(select(Estudiante).where(Estudiante.cedula == cedula)).first()
-    # Si no existe el estudiante
-    if not estudianteDB:
+    if not validacion.estudianteExiste:
         raise HTTPException(404, "Estudiante no encontrado")
 
-    # Validar si ya existe una matricula
-    matriculaDB = session.exec(
-        select(Matricula).where(
-            Matricula.codigo == codigo,
-            Matricula.cedula == cedula,
-            Matricula.matriculado == EstadoMatricula.MATRICULADO
-            )
-        ).first()
-    # Si no existe la matricula
-    if not matriculaDB:
+    # Validar si ya existe una matricula activa
+    if validacion.matriculaActivaID is None:
         raise HTTPException(404, "Matricula no encontrada")
+    matriculaDB = session.get(Matricula, validacion.matriculaActivaID)
     
-    # Desmatricular al estudiante si no se habia hecho antes
-    matriculaDB.matriculado = EstadoMatricula.DESMATRICULADO
-    # Insertar la matricula actualizada a la DB
-    session.add(matriculaDB)
-    session.commit() # Guardar los cambios
+    with transaccionMatricula(session, "Otra peticion matriculo al siguiente estudiante de la lista de espera. Intente de nuevo"):
+        # Desmatricular al estudiante si no se habia hecho antes
+        matriculaDB.matriculado = EstadoMatricula.DESMATRICULADO
+        ajustarConteo(session, codigo, EstadoMatricula.MATRICULADO, EstadoMatricula.DESMATRICULADO)
+        # Insertar la matricula actualizada a la DB
+        session.add(matriculaDB)
+        # Ceder el cupo liberado al primero de la lista de espera
+        promoverListaEspera(session, codigo)
     session.refresh(matriculaDB)
 
-    return matriculaDB
\ No newline at end of file
+    return matriculaDB
+
+
+# CREATE - Inscribir a un estudiante en la lista de espera de un curso
+@router.post("/lista-espera", response_model=ListaEspera, status_code=201)
+def inscribirListaEspera(
+    session: SessionDep,
+    codigo: str = Form(...),
+    cedula: str = Form(...)
+    ):
+
+    """
+    Inscribir a un estudiante en la lista de espera de un curso sin cupos.
+
+    El estudiante se matricula automáticamente, en orden de llegada, cuando se
+    libera un cupo del curso.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        codigo (str): Código del curso.
+        cedula (str): Cédula del estudiante.
+
+    Returns:
+        ListaEspera: La inscripción en la lista de espera.
+
+    Raises:
+        HTTPException: 400 si el curso tiene cupos o el estudiante no puede
+            matricularse en él, 404 si el curso o el estudiante no existen.
+    """
+
+    # Convertir el codigo a mayuscula
+    codigo = codigo.upper()
+
+    # Validar que el codigo sea valido
+    if not len(codigo) == 7:
+        raise HTTPException(400, "El codigo debe tener 7 caracteres")
+
+    # Consultar de una vez los datos que necesitan las validaciones
+    validacion = validacionMatricula(session, codigo, cedula)
+
+    # Verificar que el curso exista
+    if not validacion.cursoExiste:
+        raise HTTPException(404, "Curso no encontrado")
+
+    # Validar que la cedula sea numerica
+    if not cedula.isdigit():
+        raise HTTPException(400, "La cedula debe ser numerica")
+
+    # Validar que la CC sea valida
+    if not 7 <= len(cedula) <= 10:
+        raise HTTPException(400, "La cedula debe tener entre 7 y 10 numeros")
+
+    # Verificar que el estudiante exista
+    if not validacion.estudianteExiste:
+        raise HTTPException(404, "Estudiante no encontrado")
+
+    # Validar si el estudiante ya esta con estado MATRICULADO en ese curso
+    if validacion.estado == EstadoMatricula.MATRICULADO:
+        raise HTTPException(400, "El estudiante ya esta matriculado en ese curso")
+
+    if validacion.estado == EstadoMatricula.FINALIZADO:
+        raise HTTPException(400, "El estudiante ya estuvo matriculado en ese curso")
+
+    # Si ya esta matriculado en otro curso
+    if validacion.activoEnOtroCurso:
+        raise HTTPException(400, "El estudiante no puede estar registrado en mas de un curso a la vez")
+
+    # Solo se espera por cursos sin cupos disponibles
+    cupo, matriculados = session.exec(
+        select(Curso.cupo, CursoConteo.matriculados)
+            .outerjoin(CursoConteo, CursoConteo.codigo == Curso.codigo)
+            .where(Curso.codigo == codigo)
+        ).one()
+    if cupo is None or (matriculados or 0) < cupo:
+        raise HTTPException(400, "El curso tiene cupos disponibles, matricule al estudiante")
+
+    # Validar que no este ya en la lista de espera del curso
+    enEspera = session.exec(
+        select(ListaEspera.id).where(ListaEspera.codigo == codigo, ListaEspera.cedula == cedula)
+    ).first()
+    if enEspera is not None:
+        raise HTTPException(400, "El estudiante ya esta en la lista de espera del curso")
+
+    # Insertar al final de la lista de espera
+    nuevaEspera = ListaEspera(codigo=codigo, cedula=cedula)
+    session.add(nuevaEspera)
+    try:
+        session.commit() # Guardar los cambios
+    except IntegrityError:
+        session.rollback()
+        raise HTTPException(400, "El estudiante ya esta en la lista de espera del curso")
+    session.refresh(nuevaEspera)
+
+    return nuevaEspera
+
+
+
+# READ - Lista de espera de un curso
+@router.get("/lista-espera/{codigo}", response_model=list[ListaEspera])
+def listaEsperaCurso(codigo: str, session: SessionDep):
+
+    """
+    Obtener la lista de espera de un curso en orden de llegada.
+
+    Args:
+        codigo (str): Código del curso.
+        session (SessionDep): Sesión de base de datos.
+
+    Returns:
+        list[ListaEspera]: Estudiantes en espera; el primero es el siguiente en
+            ser matriculado.
+
+    Raises:
+        HTTPException: 404 si el curso no existe.
+    """
+
+    # Convertir el codigo a mayuscula
+    codigo = codigo.upper()
+
+    # Verificar que el curso exista
+    if not obtenerCurso(session, codigo):
+        raise HTTPException(404, "Curso no encontrado")
+
+    return session.exec(
+        select(ListaEspera).where(ListaEspera.codigo == codigo).order_by(ListaEspera.id)
+    ).all()
+
+
+
+# DELETE - Retirar a un estudiante de la lista de espera de un curso
+@router.delete("/lista-espera/{cedula}")
+def retirarListaEspera(cedula: str, codigo: str, session: SessionDep):
+
+    """
+    Retirar a un estudiante de la lista de espera de un curso.
+
+    Args:
+        cedula (str): Cédula del estudiante.
+        codigo (str): Código del curso.
+        session (SessionDep): Sesión de base de datos.
+
+    Returns:
+        dict: Mensaje de confirmación.
+
+    Raises:
+        HTTPException: 404 si el estudiante no está en la lista de espera.
+    """
+
+    # Convertir el codigo a mayuscula
+    codigo = codigo.upper()
+
+    # Eliminar la inscripcion de la lista de espera
+    resultado = session.exec(
+        delete(ListaEspera).where(ListaEspera.codigo == codigo, ListaEspera.cedula == cedula)
+    )
+    if resultado.rowcount == 0:
+        raise HTTPException(404, "El estudiante no esta en la lista de espera del curso")
+    session.commit() # Guardar los cambios
+
+    return {"Mensaje": "Estudiante retirado de la lista de espera"}
@@ -0,0 +1,33 @@
+"""
+Pruebas del acceso a los *endpoints* de administración.
+"""
+
+import pytest
+
+from conftest import modulo
+
+adminRouter = modulo("routers.admin_router")
+
+
+@pytest.mark.parametrize("cabeceras", [{}, {"X-Admin-Token": ""}, {"X-Admin-Token": "cualquiera"}])
+def test_sin_admin_token_los_endpoints_no_existen(cliente, monkeypatch, cabeceras):
+    monkeypatch.setattr(adminRouter, "ADMIN_TOKEN", None)
+
+    assert cliente.get("/admin/consultas-lentas", headers=cabeceras).status_code == 404
+    assert cliente.delete("/admin/consultas-lentas", headers=cabeceras).status_code == 404
+
+
+@pytest.mark.parametrize("cabeceras", [{}, {"X-Admin-Token": ""}, {"X-Admin-Token": "otro"}])
+def test_token_invalido_responde_403(cliente, monkeypatch, cabeceras):
+    monkeypatch.setattr(adminRouter, "ADMIN_TOKEN", "secreto")
+
+    assert cliente.get("/admin/consultas-lentas", headers=cabeceras).status_code == 403
+
+
+def test_token_valido(cliente, monkeypatch):
+    monkeypatch.setattr(adminRouter, "ADMIN_TOKEN", "secreto")
+
+    respuesta = cliente.get("/admin/consultas-lentas", headers={"X-Admin-Token": "secreto"})
+
+    assert respuesta.status_code == 200
+    assert set(respuesta.json()) == {"umbralMs", "consultas"}
@@ -0,0 +1,154 @@
+"""
+Pruebas de la búsqueda por nombre con el índice en memoria. Los cambios hechos
+directamente en la tabla simulan escrituras de otro proceso, que no pasan por
+los *endpoints* de este.
+"""
+
+import pytest
+from sqlalchemy import event
+from sqlmodel import select
+
+from conftest import modulo, crearCurso, contarSentencias
+
+Curso = modulo("models.curso").Curso
+CreditosCurso = modulo("utils.enum").CreditosCurso
+HorarioCurso = modulo("utils.enum").HorarioCurso
+busqueda = modulo("db.busqueda")
+
+
+@pytest.fixture(autouse=True)
+def sincronizarSiempre(monkeypatch):
+    # Las pruebas de otros procesos esperan que cada busqueda vea sus cambios
+    monkeypatch.setattr(busqueda, "BUSQUEDA_INTERVALO", 0)
+
+
+def buscar(cliente, consulta: str) -> tuple[int, list[str]]:
+    respuesta = cliente.get("/curso/buscar", params=dict(q=consulta))
+    assert respuesta.status_code == 200, respuesta.text
+    return int(respuesta.headers["X-Total-Resultados"]), [curso["codigo"] for curso in respuesta.json()]
+
+
+def cursoDeOtroProceso(session, codigo: str, nombre: str, id: int = None):
+    session.add(Curso(id=id, codigo=codigo, nombre=nombre, creditos=CreditosCurso.DOS, horario=HorarioCurso.ONCE_A_UNA))
+    session.commit()
+
+
+def eliminarDeOtroProceso(session, codigo: str) -> int:
+    curso = session.exec(select(Curso).where(Curso.codigo == codigo)).one()
+    id = curso.id
+    session.delete(curso)
+    session.commit()
+    return id
+
+
+def test_busqueda_por_prefijo_y_parecido(cliente):
+    crearCurso(cliente, "CAL0001", nombre="calculo integral")
+    crearCurso(cliente, "FIS0001", nombre="fisica")
+
+    assert buscar(cliente, "calc") == (1, ["CAL0001"])
+    assert buscar(cliente, "integarl") == (1, ["CAL0001"])
+    assert buscar(cliente, "quimica") == (0, [])
+
+
+def test_indice_ve_cursos_creados_por_otro_proceso(cliente, session):
+    crearCurso(cliente, "CAL0001", nombre="calculo")
+    assert buscar(cliente, "calculo") == (1, ["CAL0001"])
+
+    cursoDeOtroProceso(session, "CAL0002", "CALCULO VECTORIAL")
+
+    assert buscar(cliente, "calculo") == (2, ["CAL0001", "CAL0002"])
+
+
+def test_indice_y_total_excluyen_cursos_eliminados_por_otro_proceso(cliente, session):
+    for numero in range(5):
+        crearCurso(cliente, f"CAL000{numero}", nombre="calculo")
+    assert buscar(cliente, "calculo")[0] == 5
+
+    eliminarDeOtroProceso(session, "CAL0001")
+    eliminarDeOtroProceso(session, "CAL0003")
+
+    total, codigos = buscar(cliente, "calculo")
+    assert total == 3
+    assert codigos == ["CAL0000", "CAL0002", "CAL0004"]
+
+
+def test_ttl_compara_todas_las_claves(cliente, session, monkeypatch):
+    crearCurso(cliente, "CAL0001", nombre="calculo")
+    crearCurso(cliente, "CAL0002", nombre="calculo")
+    assert buscar(cliente, "calculo")[0] == 2
+
+    # Otro proceso elimina el ultimo curso y crea otro que reutiliza su id:
+    # la cantidad y el mayor id de la tabla no cambian
+    id = eliminarDeOtroProceso(session, "CAL0002")
+    cursoDeOtroProceso(session, "ALG0001", "ALGEBRA", id=id)
+
+    # La pagina sigue siendo correcta, sin contar el curso eliminado
+    assert buscar(cliente, "calculo") == (1, ["CAL0001"])
+
+    monkeypatch.setattr(busqueda, "BUSQUEDA_TTL", 0)
+    assert buscar(cliente, "algebra") == (1, ["ALG0001"])
+
+
+def test_sincronizacion_limitada_por_intervalo(cliente, session, engine, monkeypatch):
+    crearCurso(cliente, "CAL0001", nombre="calculo")
+    assert buscar(cliente, "calculo") == (1, ["CAL0001"])
+    monkeypatch.setattr(busqueda, "BUSQUEDA_INTERVALO", 60)
+    cursoDeOtroProceso(session, "CAL0002", "CALCULO VECTORIAL")
+
+    # Dentro del intervalo solo se leen los registros de la pagina
+    with contarSentencias(engine) as sentencias:
+        assert buscar(cliente, "calculo") == (1, ["CAL0001"])
+    assert len(sentencias) == 1, sentencias
+
+    # Los cursos creados en este proceso se ven sin esperar el intervalo
+    crearCurso(cliente, "CAL0003", nombre="calculo")
+    assert buscar(cliente, "calculo")[1] == ["CAL0001", "CAL0003"]
+
+    # Al vencer el intervalo se ven los cambios de otros procesos
+    monkeypatch.setattr(busqueda, "BUSQUEDA_INTERVALO", 0)
+    assert sorted(buscar(cliente, "calculo")[1]) == ["CAL0001", "CAL0002", "CAL0003"]
+
+
+def escrituraDuranteLaCarga(engine, cargasInterrumpidas: int):
+    """
+    Simular que otra petición de este proceso escribe mientras se lee la tabla
+    completa, durante las primeras `cargasInterrumpidas` cargas del índice.
+    """
+    cargas = []
+
+    def escribir(conexion, cursor, sql, parametros, contexto, executemany):
+        if sql.lstrip().startswith("SELECT") and "FROM curso" in sql and "WHERE" not in sql:
+            cargas.append(sql)
+            if len(cargas) <= cargasInterrumpidas:
+                busqueda.indiceCursos.agregar("OTRO000", "otro curso")
+
+    event.listen(engine, "before_cursor_execute", escribir)
+    return cargas, lambda: event.remove(engine, "before_cursor_execute", escribir)
+
+
+def test_carga_interrumpida_se_reintenta(cliente, engine):
+    crearCurso(cliente, "CAL0001", nombre="calculo")
+    cargas, quitar = escrituraDuranteLaCarga(engine, 1)
+    try:
+        assert buscar(cliente, "calculo") == (1, ["CAL0001"])
+    finally:
+        quitar()
+
+    assert len(cargas) == 2
+    assert busqueda.indiceCursos.cargado
+
+
+def test_carga_siempre_interrumpida_responde_desde_la_tabla(cliente, engine):
+    crearCurso(cliente, "CAL0001", nombre="calculo")
+    crearCurso(cliente, "CAL0002", nombre="calculo vectorial")
+    cargas, quitar = escrituraDuranteLaCarga(engine, busqueda.REINTENTOS_CARGA)
+    try:
+        assert buscar(cliente, "calculo") == (2, ["CAL0001", "CAL0002"])
+    finally:
+        quitar()
+
+    assert len(cargas) == busqueda.REINTENTOS_CARGA
+    assert not busqueda.indiceCursos.cargado
+    # Sin escrituras la siguiente busqueda carga el indice
+    assert buscar(cliente, "calculo")[0] == 2
+    assert busqueda.indiceCursos.cargado
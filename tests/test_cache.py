@@ -0,0 +1,98 @@
+"""
+Pruebas de la invalidación de las cachés de cursos y estudiantes: después de
+actualizar, eliminar o volver a registrar un registro, las lecturas por código,
+cédula o email no devuelven la copia anterior.
+"""
+
+from types import SimpleNamespace
+
+from conftest import modulo, crearCurso, crearEstudiante, contarSentencias
+
+CacheLRU = modulo("utils.cache").CacheLRU
+
+
+def test_curso_se_lee_de_la_cache(cliente, engine):
+    crearCurso(cliente, "ABC1234")
+    cliente.get("/curso/codigo/ABC1234")
+
+    with contarSentencias(engine) as sentencias:
+        respuesta = cliente.get("/curso/codigo/ABC1234")
+
+    assert respuesta.status_code == 200
+    assert sentencias == []
+
+
+def test_actualizar_curso_invalida_la_cache(cliente):
+    crearCurso(cliente, "ABC1234", horario="SIETE_A_NUEVE")
+    assert cliente.get("/curso/codigo/ABC1234").json()["horario"] == "SIETE_A_NUEVE"
+
+    cliente.patch("/curso/ABC1234/actualizar", data={"horario": "DOS_A_CUATRO"})
+
+    assert cliente.get("/curso/codigo/ABC1234").json()["horario"] == "DOS_A_CUATRO"
+
+
+def test_eliminar_curso_invalida_la_cache(cliente):
+    crearCurso(cliente, "ABC1234")
+    assert cliente.get("/curso/codigo/ABC1234").status_code == 200
+
+    cliente.delete("/curso/ABC1234/eliminar")
+
+    assert cliente.get("/curso/codigo/ABC1234").status_code == 404
+
+
+def test_actualizar_estudiante_invalida_cedula_y_email(cliente):
+    crearEstudiante(cliente, "1234567", semestre="1")
+    cliente.get("/estudiante/cedula/1234567")
+    cliente.get("/estudiante/email/e1234567@ucatolica.edu.co")
+
+    cliente.patch("/estudiante/1234567/actualizar", data={"semestre": "5"})
+
+    assert cliente.get("/estudiante/cedula/1234567").json()["semestre"] == "5"
+    assert cliente.get("/estudiante/email/e1234567@ucatolica.edu.co").json()["semestre"] == "5"
+
+
+def test_eliminar_estudiante_invalida_cedula_y_email(cliente):
+    crearEstudiante(cliente, "1234567")
+    cliente.get("/estudiante/cedula/1234567")
+    cliente.get("/estudiante/email/e1234567@ucatolica.edu.co")
+
+    cliente.delete("/estudiante/1234567/eliminar")
+
+    assert cliente.get("/estudiante/cedula/1234567").status_code == 404
+    assert cliente.get("/estudiante/email/e1234567@ucatolica.edu.co").status_code == 404
+
+
+def test_registrar_de_nuevo_con_otro_email(cliente):
+    crearEstudiante(cliente, "1234567")
+    cliente.get("/estudiante/email/e1234567@ucatolica.edu.co")
+    cliente.delete("/estudiante/1234567/eliminar")
+
+    # La misma cedula vuelve con otro email: el email anterior ya no apunta a ella
+    cliente.post("/estudiante/crear", data=dict(
+        cedula="1234567", nombre="ana", email="nuevo@ucatolica.edu.co", semestre="1"
+    ))
+
+    assert cliente.get("/estudiante/cedula/1234567").json()["email"] == "nuevo@ucatolica.edu.co"
+    assert cliente.get("/estudiante/email/nuevo@ucatolica.edu.co").json()["cedula"] == "1234567"
+    assert cliente.get("/estudiante/email/e1234567@ucatolica.edu.co").status_code == 404
+
+
+def test_indice_secundario_sigue_el_cambio_de_llave():
+    cacheLRU = CacheLRU(tamanoMaximo=10, ttl=60, claveSecundaria=lambda valor: valor.email)
+    cacheLRU.guardar("1234567", SimpleNamespace(email="antes@ucatolica.edu.co"))
+
+    cacheLRU.guardar("1234567", SimpleNamespace(email="despues@ucatolica.edu.co"))
+
+    assert cacheLRU.obtenerPorIndice("antes@ucatolica.edu.co") is None
+    assert cacheLRU.obtenerPorIndice("despues@ucatolica.edu.co").email == "despues@ucatolica.edu.co"
+
+
+def test_lectura_anterior_a_la_invalidacion_no_se_guarda():
+    cacheLRU = CacheLRU(tamanoMaximo=10, ttl=60)
+    # Una peticion lee de la base de datos mientras otra actualiza e invalida
+    generacion = cacheLRU.generacion
+    cacheLRU.invalidar("ABC1234")
+
+    cacheLRU.guardar("ABC1234", "valor viejo", generacion)
+
+    assert cacheLRU.obtener("ABC1234") is None
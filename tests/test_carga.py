@@ -0,0 +1,62 @@
+"""
+Pruebas unitarias de la validación de carga académica (`conflictoCarga`).
+"""
+
+import pytest
+
+from conftest import modulo
+
+carga = modulo("db.carga")
+HorarioCurso = modulo("utils.enum").HorarioCurso
+CreditosCurso = modulo("utils.enum").CreditosCurso
+
+
+def mascara(*horarios) -> int:
+    resultado = 0
+    for horario in horarios:
+        resultado |= carga.BITS_HORARIO[horario]
+    return resultado
+
+
+def test_cada_horario_tiene_un_bit_distinto():
+    bits = list(carga.BITS_HORARIO.values())
+
+    assert len(bits) == len(HorarioCurso)
+    assert all(bit & (bit - 1) == 0 for bit in bits)
+    assert mascara(*HorarioCurso) == (1 << len(HorarioCurso)) - 1
+
+
+def test_sin_carga_el_curso_cabe():
+    assert carga.conflictoCarga(0, 0, HorarioCurso.SIETE_A_NUEVE, CreditosCurso.CUATRO) is None
+
+
+def test_horario_ocupado_se_cruza():
+    horarios = mascara(HorarioCurso.SIETE_A_NUEVE, HorarioCurso.DOS_A_CUATRO)
+
+    assert carga.conflictoCarga(horarios, 6, HorarioCurso.DOS_A_CUATRO, CreditosCurso.UNO) == (
+        "El horario del curso se cruza con otro curso del estudiante"
+    )
+    assert carga.conflictoCarga(horarios, 6, HorarioCurso.NUEVE_A_ONCE, CreditosCurso.UNO) is None
+
+
+@pytest.mark.parametrize("creditos, creditosNuevos, conflicto", [
+    (0, CreditosCurso.CUATRO, False),
+    (carga.MAX_CREDITOS - 4, CreditosCurso.CUATRO, False),
+    (carga.MAX_CREDITOS - 3, CreditosCurso.CUATRO, True),
+    (carga.MAX_CREDITOS, CreditosCurso.UNO, True),
+])
+def test_maximo_de_creditos(creditos, creditosNuevos, conflicto):
+    resultado = carga.conflictoCarga(0, creditos, HorarioCurso.ONCE_A_UNA, creditosNuevos)
+
+    if conflicto:
+        assert resultado == f"El estudiante no puede superar {carga.MAX_CREDITOS} creditos"
+    else:
+        assert resultado is None
+
+
+def test_cruce_de_horario_se_reporta_antes_que_los_creditos():
+    horarios = mascara(HorarioCurso.SEIS_A_OCHO)
+
+    assert carga.conflictoCarga(horarios, carga.MAX_CREDITOS, HorarioCurso.SEIS_A_OCHO, CreditosCurso.UNO) == (
+        "El horario del curso se cruza con otro curso del estudiante"
+    )
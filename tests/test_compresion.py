@@ -0,0 +1,107 @@
+"""
+Pruebas del middleware de compresión: el umbral de tamaño, la elección entre
+gzip y brotli según `Accept-Encoding`, la cabecera `Vary` y la compresión por
+partes de las respuestas NDJSON.
+"""
+
+import gzip
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+
+from conftest import modulo, crearCurso, crearEstudiante
+
+compresion = modulo("utils.compresion")
+
+MINIMO = 100
+
+
+@pytest.fixture
+def clienteMinimo():
+    """
+    Aplicación mínima que responde `n` bytes en `/bytes/{n}`, con un umbral de
+    `MINIMO` bytes.
+    """
+    app = FastAPI()
+
+    @app.get("/bytes/{n}")
+    def responderBytes(n: int):
+        return PlainTextResponse("x" * n, headers={"Vary": "Origin"})
+
+    app.add_middleware(compresion.MiddlewareCompresion, algoritmos=["br", "gzip"], minimo=MINIMO)
+    with TestClient(app) as cliente:
+        yield cliente
+
+
+@pytest.mark.parametrize("tamano, comprimida", [(MINIMO - 1, False), (MINIMO, True), (MINIMO * 10, True)])
+def test_umbral_de_compresion(clienteMinimo, tamano, comprimida):
+    respuesta = clienteMinimo.get(f"/bytes/{tamano}", headers={"Accept-Encoding": "gzip"})
+
+    assert respuesta.text == "x" * tamano
+    assert respuesta.headers.get("Content-Encoding") == ("gzip" if comprimida else None)
+    vary = [valor.strip() for valor in respuesta.headers["Vary"].split(",")]
+    # Vary conserva los valores de la aplicacion y solo agrega Accept-Encoding al comprimir
+    assert vary == (["Origin", "Accept-Encoding"] if comprimida else ["Origin"])
+    if comprimida:
+        assert int(respuesta.headers["Content-Length"]) < tamano
+
+
+def test_sin_accept_encoding_no_se_comprime(clienteMinimo):
+    respuesta = clienteMinimo.get(f"/bytes/{MINIMO * 10}", headers={"Accept-Encoding": "identity"})
+
+    assert "Content-Encoding" not in respuesta.headers
+    assert respuesta.headers["Content-Length"] == str(MINIMO * 10)
+
+
+@pytest.mark.parametrize("acceptEncoding, esperada", [
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("deflate", None),
+])
+def test_eleccion_de_la_codificacion(acceptEncoding, esperada):
+    pytest.importorskip("brotli")
+
+    assert compresion.elegirCodificacion(acceptEncoding, ["br", "gzip"]) == esperada
+
+
+def test_brotli_en_la_aplicacion(clienteMinimo):
+    pytest.importorskip("brotli")
+
+    respuesta = clienteMinimo.get(f"/bytes/{MINIMO * 10}", headers={"Accept-Encoding": "br"})
+
+    assert respuesta.headers["Content-Encoding"] == "br"
+    assert respuesta.text == "x" * MINIMO * 10
+
+
+def test_ndjson_se_comprime_por_partes(cliente, monkeypatch):
+    paginacion = modulo("utils.paginacion")
+    monkeypatch.setattr(paginacion, "TAMANO_LOTE_NDJSON", 2)
+    ids = [crearEstudiante(cliente, str(1000000 + numero))["id"] for numero in range(5)]
+
+    # Con streaming no se conoce el tamano total: se comprime aunque sea pequeno
+    with cliente.stream(
+        "GET", "/estudiante/todos", params={"ndjson": True}, headers={"Accept-Encoding": "gzip"}
+    ) as respuesta:
+        comprimido = b"".join(respuesta.iter_raw())
+
+    assert respuesta.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in respuesta.headers["Vary"]
+    assert "Content-Length" not in respuesta.headers
+    lineas = gzip.decompress(comprimido).decode("utf-8").splitlines()
+    assert [json.loads(linea)["id"] for linea in lineas] == ids
+
+
+def test_respuesta_304_no_se_comprime(cliente):
+    for numero in range(20):
+        crearCurso(cliente, f"CUR{numero:04d}", nombre=f"curso numero {numero}")
+    etag = cliente.get("/curso/todos", headers={"Accept-Encoding": "gzip"}).headers["ETag"]
+
+    respuesta = cliente.get("/curso/todos", headers={"If-None-Match": etag, "Accept-Encoding": "gzip"})
+
+    assert respuesta.status_code == 304
+    assert "Content-Encoding" not in respuesta.headers
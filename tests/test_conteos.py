@@ -0,0 +1,110 @@
+"""
+Pruebas de los contadores precalculados de matrículas por curso
+(`CursoConteo`): después de cada transición deben coincidir con un conteo
+directo de la tabla `Matricula`.
+"""
+
+from sqlmodel import select, func, delete
+
+from conftest import modulo, crearCurso, crearEstudiante
+
+CursoConteo = modulo("models.curso").CursoConteo
+Matricula = modulo("models.matricula").Matricula
+EstadoMatricula = modulo("utils.enum").EstadoMatricula
+sincronizarConteos = modulo("db.conteos").sincronizarConteos
+
+CODIGOS = ["ABC1234", "XYZ9876"]
+
+
+def conteosPrecalculados(session) -> dict:
+    session.expire_all()
+    return {
+        conteo.codigo: (conteo.matriculados, conteo.finalizados, conteo.desmatriculados)
+        for conteo in session.exec(select(CursoConteo)).all()
+    }
+
+
+def conteosDeLaTabla(session) -> dict:
+    filas = session.exec(
+        select(Matricula.codigo, Matricula.matriculado, func.count()).group_by(Matricula.codigo, Matricula.matriculado)
+    ).all()
+    conteos = {codigo: [0, 0, 0] for codigo in CODIGOS}
+    orden = [EstadoMatricula.MATRICULADO, EstadoMatricula.FINALIZADO, EstadoMatricula.DESMATRICULADO]
+    for codigo, estado, cantidad in filas:
+        conteos[codigo][orden.index(estado)] = cantidad
+    return {codigo: tuple(valores) for codigo, valores in conteos.items()}
+
+
+def verificar(session, esperados: dict):
+    assert conteosPrecalculados(session) == conteosDeLaTabla(session) == esperados
+
+
+def test_contadores_siguen_cada_transicion(cliente, session):
+    for codigo in CODIGOS:
+        crearCurso(cliente, codigo)
+    for cedula in ("1000001", "1000002", "1000003", "1000004"):
+        crearEstudiante(cliente, cedula)
+    verificar(session, {"ABC1234": (0, 0, 0), "XYZ9876": (0, 0, 0)})
+
+    cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1000001"))
+    cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1000002"))
+    verificar(session, {"ABC1234": (2, 0, 0), "XYZ9876": (0, 0, 0)})
+
+    cliente.patch("/matricula/1000001/finalizar", params={"codigo": "ABC1234"})
+    verificar(session, {"ABC1234": (1, 1, 0), "XYZ9876": (0, 0, 0)})
+
+    cliente.delete("/matricula/1000002/desmatricular", params={"codigo": "ABC1234"})
+    verificar(session, {"ABC1234": (0, 1, 1), "XYZ9876": (0, 0, 0)})
+
+    cliente.patch("/matricula/1000002/rematricular", params={"codigo": "ABC1234"})
+    verificar(session, {"ABC1234": (1, 1, 0), "XYZ9876": (0, 0, 0)})
+
+    # El lote mezcla matriculas nuevas, una rechazada y una en otro curso
+    cliente.delete("/matricula/1000002/desmatricular", params={"codigo": "ABC1234"})
+    respuesta = cliente.post("/matricula/matricular-lote", json={"pares": [
+        {"codigo": "XYZ9876", "cedula": "1000003"},
+        {"codigo": "XYZ9876", "cedula": "1000004"},
+        {"codigo": "XYZ9876", "cedula": "1000004"},
+        {"codigo": "XYZ9876", "cedula": "1000002"},
+    ]})
+    assert [resultado["status"] for resultado in respuesta.json()] == [201, 201, 400, 201]
+    verificar(session, {"ABC1234": (0, 1, 1), "XYZ9876": (3, 0, 0)})
+
+    # Las transiciones rechazadas no cambian los contadores
+    assert cliente.patch("/matricula/1000001/finalizar", params={"codigo": "ABC1234"}).status_code == 404
+    assert cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1000003")).status_code == 400
+    verificar(session, {"ABC1234": (0, 1, 1), "XYZ9876": (3, 0, 0)})
+
+    # Eliminar un estudiante descuenta todas sus matriculas
+    cliente.delete("/estudiante/1000002/eliminar")
+    verificar(session, {"ABC1234": (0, 1, 0), "XYZ9876": (2, 0, 0)})
+
+
+def test_estadisticas_del_curso(cliente):
+    crearCurso(cliente, "ABC1234")
+    crearEstudiante(cliente, "1000001")
+    cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1000001"))
+
+    respuesta = cliente.get("/curso/ABC1234/estadisticas")
+
+    assert respuesta.status_code == 200
+    cuerpo = respuesta.json()
+    assert (cuerpo["matriculados"], cuerpo["finalizados"], cuerpo["desmatriculados"]) == (1, 0, 0)
+
+
+def test_sincronizar_reconstruye_los_contadores_faltantes(cliente, session):
+    for codigo in CODIGOS:
+        crearCurso(cliente, codigo)
+    crearEstudiante(cliente, "1000001")
+    crearEstudiante(cliente, "1000002")
+    cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1000001"))
+    cliente.post("/matricula/matricular-estudiante", data=dict(codigo="XYZ9876", cedula="1000002"))
+    cliente.patch("/matricula/1000002/finalizar", params={"codigo": "XYZ9876"})
+    esperados = conteosPrecalculados(session)
+
+    # Una base creada antes de los contadores no tiene filas en CursoConteo
+    session.exec(delete(CursoConteo))
+    session.commit()
+    sincronizarConteos(session)
+
+    verificar(session, esperados)
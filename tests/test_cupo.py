@@ -0,0 +1,102 @@
+"""
+Pruebas del cupo de los cursos con peticiones simultáneas: un curso lleno
+rechaza todas las matrículas, la reactivación y los lotes reservan cupo con la
+misma condición y el contador nunca supera el cupo.
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+from sqlmodel import select
+
+from conftest import modulo, crearCurso
+from test_matricula_concurrencia import importarEstudiantes, matricularEnParalelo, matriculados
+
+Curso = modulo("models.curso").Curso
+CursoConteo = modulo("models.curso").CursoConteo
+
+HILOS = 32
+
+
+def enParalelo(funcion, argumentos: list) -> list:
+    """
+    Ejecutar `funcion` con cada argumento a la vez y devolver las respuestas.
+    """
+    inicio = Event()
+
+    def ejecutar(argumento):
+        inicio.wait()
+        return funcion(argumento)
+
+    with ThreadPoolExecutor(max_workers=HILOS) as ejecutor:
+        respuestas = ejecutor.map(ejecutar, argumentos)
+        inicio.set()
+        return list(respuestas)
+
+
+def conteo(session, codigo: str) -> int:
+    session.expire_all()
+    return session.get(CursoConteo, codigo).matriculados
+
+
+def test_curso_lleno_rechaza_todas_las_matriculas(cliente, session):
+    crearCurso(cliente, "ABC1234", cupo="3")
+    cedulas = [str(1000000 + numero) for numero in range(53)]
+    importarEstudiantes(cliente, cedulas)
+    assert matricularEnParalelo(cliente, [("ABC1234", cedula) for cedula in cedulas[:3]]) == {201: 3}
+
+    respuestas = enParalelo(
+        lambda cedula: cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula=cedula)),
+        cedulas[3:]
+    )
+
+    assert Counter(respuesta.status_code for respuesta in respuestas) == {400: 50}
+    assert {respuesta.json()["detail"] for respuesta in respuestas} == {"El curso no tiene cupos disponibles"}
+    assert matriculados(session, codigo="ABC1234") == conteo(session, "ABC1234") == 3
+
+
+def test_rematricular_simultaneo_respeta_el_cupo(cliente, session):
+    crearCurso(cliente, "ABC1234", cupo="20")
+    cedulas = [str(1000000 + numero) for numero in range(20)]
+    importarEstudiantes(cliente, cedulas)
+    matricularEnParalelo(cliente, [("ABC1234", cedula) for cedula in cedulas])
+    for cedula in cedulas:
+        cliente.delete(f"/matricula/{cedula}/desmatricular", params={"codigo": "ABC1234"})
+    # Reducir el cupo: solo dos de las veinte matriculas desmatriculadas caben
+    session.exec(select(Curso).where(Curso.codigo == "ABC1234")).one().cupo = 2
+    session.commit()
+
+    respuestas = enParalelo(
+        lambda cedula: cliente.patch(f"/matricula/{cedula}/rematricular", params={"codigo": "ABC1234"}),
+        cedulas
+    )
+
+    assert Counter(respuesta.status_code for respuesta in respuestas) == {200: 2, 400: 18}
+    assert matriculados(session, codigo="ABC1234") == conteo(session, "ABC1234") == 2
+
+
+def test_lotes_y_matriculas_simultaneas_respetan_el_cupo(cliente, session):
+    crearCurso(cliente, "ABC1234", cupo="5")
+    cedulas = [str(1000000 + numero) for numero in range(60)]
+    importarEstudiantes(cliente, cedulas)
+
+    # Diez lotes de tres estudiantes compiten con treinta matriculas individuales
+    def enviar(peticion):
+        if isinstance(peticion, list):
+            return cliente.post("/matricula/matricular-lote", json={"codigo": "ABC1234", "cedulas": peticion})
+        return cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula=peticion))
+
+    peticiones = [cedulas[numero:numero + 3] for numero in range(0, 30, 3)] + cedulas[30:]
+    respuestas = enParalelo(enviar, peticiones)
+
+    aceptadas = sum(
+        sum(resultado["status"] == 201 for resultado in respuesta.json())
+        if respuesta.status_code == 200 and isinstance(respuesta.json(), list)
+        else respuesta.status_code == 201
+        for respuesta in respuestas
+    )
+    assert {respuesta.status_code for respuesta in respuestas} <= {200, 201, 400}
+    # Un lote sin cupo para todos sus estudiantes se rechaza completo, asi que el
+    # curso puede no llenarse, pero nunca supera el cupo
+    assert 0 < aceptadas == matriculados(session, codigo="ABC1234") == conteo(session, "ABC1234") <= 5
@@ -0,0 +1,117 @@
+"""
+Pruebas del archivado de matrículas al eliminar cursos y estudiantes: cada
+matrícula pasa al histórico con su razón y, si algo falla, no queda ni un
+histórico parcial ni un registro eliminado a medias.
+"""
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, func
+
+from conftest import modulo, crearCurso, crearEstudiante
+
+modelosMatricula = modulo("models.matricula")
+Matricula = modelosMatricula.Matricula
+MatriculaHistorica = modelosMatricula.MatriculaHistorica
+CursoHistorico = modulo("models.curso").CursoHistorico
+CursoConteo = modulo("models.curso").CursoConteo
+EstudianteHistorico = modulo("models.estudiante").EstudianteHistorico
+EstadoMatricula = modulo("utils.enum").EstadoMatricula
+
+
+def matricular(cliente, codigo: str, cedula: str):
+    respuesta = cliente.post("/matricula/matricular-estudiante", data=dict(codigo=codigo, cedula=cedula))
+    assert respuesta.status_code == 201, respuesta.text
+
+
+@pytest.fixture
+def historial(cliente):
+    """
+    Estudiante 1234567 con una matrícula en cada estado y otro estudiante activo en el curso CUR0003.
+    """
+    for numero in range(1, 4):
+        crearCurso(cliente, f"CUR000{numero}")
+    crearEstudiante(cliente, "1234567")
+    crearEstudiante(cliente, "7654321")
+    matricular(cliente, "CUR0001", "1234567")
+    cliente.patch("/matricula/1234567/finalizar", params={"codigo": "CUR0001"})
+    matricular(cliente, "CUR0002", "1234567")
+    cliente.delete("/matricula/1234567/desmatricular", params={"codigo": "CUR0002"})
+    matricular(cliente, "CUR0003", "1234567")
+    matricular(cliente, "CUR0003", "7654321")
+
+
+def historicas(session) -> set[tuple]:
+    return set(session.exec(
+        select(MatriculaHistorica.codigo, MatriculaHistorica.cedula,
+               MatriculaHistorica.matriculado, MatriculaHistorica.razonEliminado)
+    ).all())
+
+
+def cantidad(session, modelo) -> int:
+    return session.exec(select(func.count()).select_from(modelo)).one()
+
+
+def fallarAlInsertar(session, tabla: str):
+    """
+    Hacer fallar con IntegrityError la inserción en `tabla`, el último paso antes del commit.
+    """
+    session.connection().exec_driver_sql(
+        f"CREATE TRIGGER fallar_{tabla} BEFORE INSERT ON {tabla} BEGIN SELECT RAISE(ABORT, 'fallo'); END"
+    )
+    session.commit()
+
+
+def test_eliminar_estudiante_archiva_con_razon_por_estado(cliente, session, historial):
+    respuesta = cliente.delete("/estudiante/1234567/eliminar")
+
+    assert respuesta.status_code == 200
+    assert historicas(session) == {
+        ("CUR0001", "1234567", EstadoMatricula.FINALIZADO, "Estudiante eliminado - curso finalizado"),
+        ("CUR0002", "1234567", EstadoMatricula.DESMATRICULADO, "Estudiante eliminado - curso desmatriculado"),
+        ("CUR0003", "1234567", EstadoMatricula.MATRICULADO, "Estudiante eliminado - curso en progreso"),
+    }
+    assert session.exec(select(Matricula.cedula)).all() == ["7654321"]
+    assert session.exec(select(EstudianteHistorico.cedula)).all() == ["1234567"]
+    assert session.get(CursoConteo, "CUR0003").matriculados == 1
+
+
+def test_eliminar_curso_archiva_todas_sus_matriculas(cliente, session, historial):
+    respuesta = cliente.delete("/curso/CUR0003/eliminar")
+
+    assert respuesta.status_code == 200
+    assert historicas(session) == {
+        ("CUR0003", "1234567", EstadoMatricula.MATRICULADO, "Curso eliminado"),
+        ("CUR0003", "7654321", EstadoMatricula.MATRICULADO, "Curso eliminado"),
+    }
+    assert set(session.exec(select(Matricula.codigo)).all()) == {"CUR0001", "CUR0002"}
+    assert session.exec(select(CursoHistorico.codigo)).all() == ["CUR0003"]
+    assert session.get(CursoConteo, "CUR0003") is None
+
+
+def test_eliminar_estudiante_es_atomico(cliente, session, historial):
+    fallarAlInsertar(session, "estudiantehistorico")
+    matriculas = cantidad(session, Matricula)
+
+    respuesta = cliente.delete("/estudiante/1234567/eliminar")
+
+    assert respuesta.status_code == 400
+    session.expire_all()
+    assert cantidad(session, MatriculaHistorica) == 0
+    assert cantidad(session, Matricula) == matriculas
+    assert cliente.get("/estudiante/cedula/1234567").status_code == 200
+    assert session.get(CursoConteo, "CUR0003").matriculados == 2
+
+
+def test_eliminar_curso_es_atomico(cliente, session, historial):
+    fallarAlInsertar(session, "cursohistorico")
+    matriculas = cantidad(session, Matricula)
+
+    with pytest.raises(IntegrityError):
+        cliente.delete("/curso/CUR0003/eliminar")
+
+    session.expire_all()
+    assert cantidad(session, MatriculaHistorica) == 0
+    assert cantidad(session, Matricula) == matriculas
+    assert cliente.get("/curso/codigo/CUR0003").status_code == 200
+    assert session.get(CursoConteo, "CUR0003").matriculados == 2
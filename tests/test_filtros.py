@@ -0,0 +1,53 @@
+"""
+Pruebas de los filtros combinados del catálogo de cursos.
+"""
+
+import pytest
+
+from conftest import modulo, crearCurso, POSTGRES
+from test_indices_matricula import planConsulta
+
+Curso = modulo("models.curso").Curso
+Estudiante = modulo("models.estudiante").Estudiante
+filtros = modulo("utils.filtros")
+cursoRouter = modulo("routers.curso_router")
+estudianteRouter = modulo("routers.estudiante_router")
+
+
+def filtrar(cliente, **parametros) -> list[str]:
+    respuesta = cliente.get("/curso/filtrar", params=parametros)
+    assert respuesta.status_code == 200, respuesta.text
+    return [curso["codigo"] for curso in respuesta.json()]
+
+
+def test_filtro_por_prefijo_y_creditos(cliente):
+    crearCurso(cliente, "CAL0001", nombre="calculo", creditos="3")
+    crearCurso(cliente, "CAL0002", nombre="calculo vectorial", creditos="4")
+    crearCurso(cliente, "FIS0001", nombre="fisica", creditos="3")
+
+    assert filtrar(cliente, nombre="calc", orden="codigo") == ["CAL0001", "CAL0002"]
+    assert filtrar(cliente, nombre="calc", creditos="4") == ["CAL0002"]
+    assert filtrar(cliente, creditos="3", orden="-codigo") == ["FIS0001", "CAL0001"]
+
+
+def test_prefijo_escapa_comodines(cliente):
+    crearCurso(cliente, "POR0001", nombre="100% practico")
+    crearCurso(cliente, "POR0002", nombre="1000 ejercicios")
+    crearCurso(cliente, "GUI0001", nombre="a_b")
+    crearCurso(cliente, "GUI0002", nombre="axb")
+
+    assert filtrar(cliente, nombre="100%") == ["POR0001"]
+    assert filtrar(cliente, nombre="a_") == ["GUI0001"]
+
+
+@pytest.mark.skipif(POSTGRES, reason="EXPLAIN QUERY PLAN es de SQLite")
+@pytest.mark.parametrize("modelo, columnas, indice", [
+    (Curso, cursoRouter.ORDEN_CURSOS, "ix_curso_nombre"),
+    (Estudiante, estudianteRouter.ORDEN_ESTUDIANTES, "ix_estudiante_nombre"),
+])
+def test_prefijo_usa_el_indice_del_nombre(session, modelo, columnas, indice):
+    condicion = filtros.filtroPrefijo(modelo.nombre, "CAL", session.get_bind().dialect.name)
+    plan = planConsulta(session, filtros.consultaFiltrada(modelo, [condicion], columnas, "id", 50, 0))
+
+    assert f"USING INDEX {indice} (nombre>? AND nombre<?)" in plan, plan
+    assert f"SCAN {modelo.__tablename__}" not in plan, plan
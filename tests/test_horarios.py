@@ -0,0 +1,123 @@
+"""
+Pruebas del optimizador de horarios: la asignación nueva nunca cuesta más que la
+actual, y `/curso/optimizar-horarios` aplica los cambios en una sola sentencia y
+limpia la caché de cursos.
+"""
+
+import random
+
+import pytest
+
+from conftest import modulo, crearCurso, crearEstudiante, contarSentencias
+
+horarios = modulo("utils.horarios")
+HorarioCurso = modulo("utils.enum").HorarioCurso
+
+FRANJAS = list(HorarioCurso)
+
+
+def catalogoAleatorio(semilla: int, cursos: int = 60, estudiantes: int = 400):
+    """
+    Catálogo con horarios al azar y estudiantes que quieren de 1 a 4 cursos.
+    """
+    azar = random.Random(semilla)
+    codigos = [f"CUR{numero:04d}" for numero in range(cursos)]
+    actual = {codigo: azar.choice(FRANJAS) for codigo in codigos}
+    demandas = [set(azar.sample(codigos, azar.randint(1, 4))) for _ in range(estudiantes)]
+    return actual, horarios.grafoConflictos(demandas)
+
+
+@pytest.mark.parametrize("semilla", range(5))
+@pytest.mark.parametrize("pesoBalance", [0.0, 1.0, 10.0])
+def test_la_asignacion_nueva_no_cuesta_mas_que_la_actual(semilla, pesoBalance):
+    actual, grafo = catalogoAleatorio(semilla)
+
+    nueva = horarios.optimizarHorarios(actual, grafo, FRANJAS, pesoBalance)
+
+    assert set(nueva) == set(actual)
+    costoActual = horarios.costoAsignacion(actual, grafo, FRANJAS, pesoBalance)
+    costoNuevo = horarios.costoAsignacion(nueva, grafo, FRANJAS, pesoBalance)
+    assert costoNuevo[1] <= costoActual[1]
+    # Sin peso de balance el costo son solo los cruces
+    if pesoBalance == 0:
+        assert costoNuevo[0] <= costoActual[0]
+
+
+def test_sin_mejoras_se_conserva_la_asignacion_actual():
+    actual = {f"CUR{numero:04d}": franja for numero, franja in enumerate(FRANJAS)}
+    grafo = horarios.grafoConflictos([set(actual)])
+
+    assert horarios.optimizarHorarios(actual, grafo, FRANJAS) == actual
+
+
+def test_grafo_coloreable_queda_sin_cruces():
+    # Cada par de cursos comparte estudiantes y hay una franja para cada curso
+    actual = dict.fromkeys(["CUR0001", "CUR0002", "CUR0003"], HorarioCurso.SIETE_A_NUEVE)
+    grafo = horarios.grafoConflictos([set(actual)] * 3)
+
+    nueva = horarios.optimizarHorarios(actual, grafo, FRANJAS, pesoBalance=0)
+
+    assert horarios.costoAsignacion(actual, grafo, FRANJAS)[0] == 9
+    assert horarios.costoAsignacion(nueva, grafo, FRANJAS)[0] == 0
+
+
+def catalogoConCruces(cliente, codigos: list[str]):
+    """
+    Cursos llenos en la misma franja y tres estudiantes en la lista de espera de
+    todos: cada par de cursos tiene tres cruces.
+    """
+    for numero, codigo in enumerate(codigos):
+        crearCurso(cliente, codigo, cupo="1")
+        cedula = str(1000000 + numero)
+        crearEstudiante(cliente, cedula)
+        assert cliente.post("/matricula/matricular-estudiante", data=dict(codigo=codigo, cedula=cedula)).status_code == 201
+    for cedula in ("2000001", "2000002", "2000003"):
+        crearEstudiante(cliente, cedula)
+        for codigo in codigos:
+            respuesta = cliente.post("/matricula/lista-espera", data=dict(codigo=codigo, cedula=cedula))
+            assert respuesta.status_code == 201, respuesta.text
+
+
+def horarioActual(cliente, codigo: str) -> str:
+    return cliente.get(f"/curso/codigo/{codigo}").json()["horario"]
+
+
+def test_optimizar_sin_aplicar_no_cambia_los_horarios(cliente):
+    codigos = ["ABC0001", "ABC0002", "ABC0003"]
+    catalogoConCruces(cliente, codigos)
+
+    respuesta = cliente.post("/curso/optimizar-horarios")
+
+    assert respuesta.status_code == 200
+    plan = respuesta.json()
+    assert plan["aplicado"] is False
+    assert plan["conflictosAntes"] == 9
+    assert plan["conflictosDespues"] == 0
+    assert plan["cambios"]
+    assert {horarioActual(cliente, codigo) for codigo in codigos} == {"SIETE_A_NUEVE"}
+
+
+def test_optimizar_aplica_en_bloque_y_limpia_la_cache(cliente, engine):
+    codigos = ["ABC0001", "ABC0002", "ABC0003"]
+    catalogoConCruces(cliente, codigos)
+    # Dejar los cursos en la cache con su horario anterior
+    assert {horarioActual(cliente, codigo) for codigo in codigos} == {"SIETE_A_NUEVE"}
+
+    with contarSentencias(engine) as sentencias:
+        respuesta = cliente.post("/curso/optimizar-horarios", params=dict(aplicar="true"))
+
+    assert respuesta.status_code == 200
+    plan = respuesta.json()
+    assert plan["aplicado"] is True
+    assert (plan["conflictosAntes"], plan["conflictosDespues"]) == (9, 0)
+    # Todos los cambios se guardan con una sola sentencia UPDATE
+    actualizaciones = [sql for sql in sentencias if sql.lstrip().upper().startswith("UPDATE")]
+    assert len(actualizaciones) == 1, actualizaciones
+    # La cache ya devuelve los horarios nuevos
+    for cambio in plan["cambios"]:
+        assert horarioActual(cliente, cambio["codigo"]) == cambio["horario"]
+    assert len({horarioActual(cliente, codigo) for codigo in codigos}) == 3
+
+    # Una segunda pasada ya no encuentra cruces ni cambios
+    segunda = cliente.post("/curso/optimizar-horarios", params=dict(aplicar="true")).json()
+    assert (segunda["aplicado"], segunda["conflictosAntes"], segunda["cambios"]) == (False, 0, [])
@@ -0,0 +1,67 @@
+"""
+Pruebas de la cabecera `Idempotency-Key` en la matrícula.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+from conftest import modulo, crearCurso, crearEstudiante
+
+matriculaRouter = modulo("routers.matricula_router")
+
+
+def matricular(cliente, llave: str, codigo: str = "ABC1234", cedula: str = "1111111"):
+    return cliente.post(
+        "/matricula/matricular-estudiante",
+        data=dict(codigo=codigo, cedula=cedula),
+        headers={"Idempotency-Key": llave}
+    )
+
+
+def test_reintento_devuelve_la_respuesta_original(cliente):
+    crearCurso(cliente, "ABC1234")
+    crearEstudiante(cliente, "1111111")
+
+    primera = matricular(cliente, "llave-1")
+    reintento = matricular(cliente, "llave-1")
+
+    assert primera.status_code == reintento.status_code == 201
+    assert primera.json() == reintento.json()
+
+
+def test_reintento_simultaneo_recibe_409(cliente, monkeypatch):
+    crearCurso(cliente, "ABC1234")
+    crearEstudiante(cliente, "1111111")
+
+    # Detener el primer intento dentro de la transaccion hasta que llegue el reintento
+    dentroDelPrimero = Event()
+    continuar = Event()
+    reservarCupo = matriculaRouter.reservarCupo
+
+    def reservarCupoLento(*args, **kwargs):
+        dentroDelPrimero.set()
+        continuar.wait(timeout=10)
+        return reservarCupo(*args, **kwargs)
+
+    monkeypatch.setattr(matriculaRouter, "reservarCupo", reservarCupoLento)
+
+    with ThreadPoolExecutor(max_workers=1) as ejecutor:
+        primera = ejecutor.submit(matricular, cliente, "llave-1")
+        assert dentroDelPrimero.wait(timeout=10)
+        reintento = matricular(cliente, "llave-1")
+        continuar.set()
+        primera = primera.result()
+
+    assert primera.status_code == 201
+    assert reintento.status_code == 409
+    # Terminado el primer intento, el reintento devuelve su respuesta
+    assert matricular(cliente, "llave-1").json() == primera.json()
+
+
+def test_llave_se_libera_si_la_peticion_falla(cliente):
+    crearEstudiante(cliente, "1111111")
+
+    assert matricular(cliente, "llave-1").status_code == 404
+
+    crearCurso(cliente, "ABC1234")
+    assert matricular(cliente, "llave-1").status_code == 201
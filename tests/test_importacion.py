@@ -0,0 +1,95 @@
+"""
+Pruebas de la importación masiva de estudiantes.
+"""
+
+from sqlalchemy import false, or_
+
+from conftest import modulo, crearEstudiante
+
+estudianteRouter = modulo("routers.estudiante_router")
+
+
+def archivoCSV(*filas: str) -> bytes:
+    return "\n".join(("cedula,nombre,email,semestre",) + filas).encode("utf-8")
+
+
+def importar(cliente, contenido: bytes):
+    return cliente.post("/estudiante/importar", files={"archivo": ("estudiantes.csv", contenido, "text/csv")})
+
+
+def test_importar_reporta_errores_por_fila(cliente):
+    crearEstudiante(cliente, "1111111")
+
+    respuesta = importar(cliente, archivoCSV(
+        "2222222,ana,ana@ucatolica.edu.co,1",
+        "1111111,luis,luis@ucatolica.edu.co,2",
+        "333,eva,eva@ucatolica.edu.co,3",
+    ))
+
+    assert respuesta.status_code == 201
+    assert respuesta.json() == {"importados": 1, "errores": [
+        {"fila": 3, "error": "Ya hay un estudiante registrado con esa CC"},
+        {"fila": 4, "error": "La cedula debe tener entre 7 y 10 numeros"},
+    ]}
+
+
+def test_importar_reintenta_el_lote_sin_la_fila_en_conflicto(cliente, monkeypatch):
+    crearEstudiante(cliente, "1111111")
+    monkeypatch.setattr(estudianteRouter, "TAMANO_LOTE_IMPORTACION", 2)
+    # Simular que otra peticion registra la cedula 1111111 despues de la primera
+    # consulta de existentes: esa consulta no la ve, las siguientes si
+    consultas = []
+
+    def orConInsercionConcurrente(*condiciones):
+        consultas.append(condiciones)
+        return false() if len(consultas) == 2 else or_(*condiciones)
+
+    monkeypatch.setattr(estudianteRouter, "or_", orConInsercionConcurrente)
+
+    respuesta = importar(cliente, archivoCSV(
+        "2222222,ana,ana@ucatolica.edu.co,1",
+        "3333333,eva,eva@ucatolica.edu.co,1",
+        "1111111,luis,luis@ucatolica.edu.co,2",
+        "4444444,juan,juan@ucatolica.edu.co,2",
+    ))
+
+    assert respuesta.status_code == 201
+    assert respuesta.json() == {"importados": 3, "errores": [
+        {"fila": 4, "error": "Ya hay un estudiante registrado con esa CC"},
+    ]}
+    # El segundo lote se consulto de nuevo despues del conflicto
+    assert len(consultas) == 3
+    assert cliente.get("/estudiante/cedula/4444444").status_code == 200
+    assert cliente.get("/estudiante/cedula/1111111").json()["nombre"] == "ANA"
+
+
+def test_importar_reporta_el_lote_si_el_conflicto_persiste(cliente, monkeypatch):
+    crearEstudiante(cliente, "1111111")
+    monkeypatch.setattr(estudianteRouter, "TAMANO_LOTE_IMPORTACION", 2)
+    # La consulta de existentes nunca ve la cedula ya registrada
+    monkeypatch.setattr(estudianteRouter, "or_", lambda *condiciones: false())
+
+    respuesta = importar(cliente, archivoCSV(
+        "2222222,ana,ana@ucatolica.edu.co,1",
+        "3333333,eva,eva@ucatolica.edu.co,1",
+        "1111111,luis,luis@ucatolica.edu.co,2",
+        "4444444,juan,juan@ucatolica.edu.co,2",
+    ))
+
+    assert respuesta.status_code == 201
+    cuerpo = respuesta.json()
+    assert cuerpo["importados"] == 2
+    assert [error["fila"] for error in cuerpo["errores"]] == [4, 5]
+    assert cliente.get("/estudiante/cedula/3333333").status_code == 200
+    assert cliente.get("/estudiante/cedula/4444444").status_code == 404
+
+
+def test_importar_rechaza_archivo_que_no_es_utf8(cliente):
+    contenido = archivoCSV("2222222,ana,ana@ucatolica.edu.co,1") + "\n3333333,müller,m@ucatolica.edu.co,1".encode("latin-1")
+
+    respuesta = importar(cliente, contenido)
+
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"] == "El archivo debe estar codificado en UTF-8"
+    # No se guarda ninguna fila del archivo
+    assert cliente.get("/estudiante/cedula/2222222").status_code == 404
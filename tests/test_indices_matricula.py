@@ -0,0 +1,75 @@
+"""
+Pruebas de los índices de `Matricula`: las búsquedas por código, cédula y
+estado deben resolverse con un índice y no recorriendo la tabla, y el índice
+único de matrículas activas no se crea sobre datos que no lo cumplen.
+"""
+
+import pytest
+from sqlalchemy import inspect
+from sqlmodel import select
+
+from conftest import modulo, crearCurso, crearEstudiante
+
+Matricula = modulo("models.matricula").Matricula
+EstadoMatricula = modulo("utils.enum").EstadoMatricula
+
+
+def planConsulta(session, consulta) -> str:
+    """
+    Obtener el plan de SQLite (`EXPLAIN QUERY PLAN`) de una consulta de SQLModel.
+    """
+    sql = consulta.compile(dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    filas = session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return "\n".join(fila[-1] for fila in filas)
+
+
+@pytest.mark.parametrize("condiciones, indice", [
+    # Matriculas activas de un estudiante
+    ((Matricula.cedula == "1234567", Matricula.matriculado == EstadoMatricula.MATRICULADO),
+     "ix_matricula_cedula_matriculado"),
+    # Historial de un estudiante en un curso
+    ((Matricula.codigo == "ABC1234", Matricula.cedula == "1234567"),
+     "ix_matricula_codigo_cedula"),
+    # Estudiantes de un curso por estado
+    ((Matricula.codigo == "ABC1234", Matricula.matriculado == EstadoMatricula.MATRICULADO),
+     "ix_matricula_codigo_matriculado"),
+    ((Matricula.codigo == "ABC1234", Matricula.matriculado == EstadoMatricula.FINALIZADO),
+     "ix_matricula_codigo_matriculado"),
+])
+def test_busquedas_usan_indice(session, condiciones, indice):
+    plan = planConsulta(session, select(Matricula).where(*condiciones))
+
+    assert f"USING INDEX {indice}" in plan, plan
+    assert "SCAN matricula" not in plan, plan
+
+
+def test_busqueda_por_curso_usa_indice(session):
+    plan = planConsulta(session, select(Matricula).where(Matricula.codigo == "ABC1234"))
+
+    assert "USING INDEX ix_matricula_codigo_" in plan, plan
+    assert "SCAN matricula" not in plan, plan
+
+
+def test_indice_unico_en_base_existente_con_duplicadas(cliente, engine):
+    db = modulo("db.db")
+    crearCurso(cliente, "ABC1234")
+    crearCurso(cliente, "XYZ9876")
+    crearEstudiante(cliente, "1234567")
+    # Una base creada antes del indice unico puede tener dos matriculas activas por estudiante
+    with engine.begin() as conexion:
+        conexion.exec_driver_sql("DROP INDEX ux_matricula_cedula_activa")
+        for codigo in ("ABC1234", "XYZ9876"):
+            conexion.execute(Matricula.__table__.insert().values(
+                codigo=codigo, cedula="1234567", matriculado="MATRICULADO"
+            ))
+
+    with pytest.raises(RuntimeError, match=r"1 estudiantes tienen mas de una matricula MATRICULADO: 1234567 \(2\)"):
+        next(db.createAllTables(cliente.app))
+
+    # Al dejar una sola matricula activa el indice se crea al iniciar
+    with engine.begin() as conexion:
+        conexion.execute(
+            Matricula.__table__.update().where(Matricula.codigo == "XYZ9876").values(matriculado="FINALIZADO")
+        )
+    next(db.createAllTables(cliente.app))
+    assert "ux_matricula_cedula_activa" in {indice["name"] for indice in inspect(engine).get_indexes("matricula")}
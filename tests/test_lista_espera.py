@@ -0,0 +1,106 @@
+"""
+Pruebas de la lista de espera: los cupos liberados se asignan en orden de
+llegada y la promoción de una cola larga usa una cantidad acotada de consultas.
+"""
+
+from sqlmodel import select, insert
+
+from conftest import modulo, crearCurso, crearEstudiante, contarSentencias
+
+Curso = modulo("models.curso").Curso
+Matricula = modulo("models.matricula").Matricula
+ListaEspera = modulo("models.matricula").ListaEspera
+EstadoMatricula = modulo("utils.enum").EstadoMatricula
+promoverListaEspera = modulo("db.espera").promoverListaEspera
+TAMANO_LOTE_PROMOCION = modulo("db.espera").TAMANO_LOTE_PROMOCION
+estudianteRouter = modulo("routers.estudiante_router")
+
+
+def enEspera(cliente, codigo: str = "ABC1234") -> list[str]:
+    respuesta = cliente.get(f"/matricula/lista-espera/{codigo}")
+    return [inscripcion["cedula"] for inscripcion in respuesta.json()] if respuesta.status_code == 200 else []
+
+
+def activos(session, codigo: str = "ABC1234") -> set[str]:
+    session.expire_all()
+    return set(session.exec(
+        select(Matricula.cedula).where(Matricula.codigo == codigo, Matricula.matriculado == EstadoMatricula.MATRICULADO)
+    ).all())
+
+
+def llenarCursoConCola(cliente, cola: list[str]):
+    crearCurso(cliente, "ABC1234", cupo="1")
+    for cedula in ["1000000"] + cola:
+        crearEstudiante(cliente, cedula)
+    assert cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1000000")).status_code == 201
+    for cedula in cola:
+        respuesta = cliente.post("/matricula/lista-espera", data=dict(codigo="ABC1234", cedula=cedula))
+        assert respuesta.status_code == 201, respuesta.text
+
+
+def test_cupos_liberados_se_asignan_en_orden_de_llegada(cliente, session):
+    llenarCursoConCola(cliente, ["1000003", "1000001", "1000002"])
+    assert enEspera(cliente) == ["1000003", "1000001", "1000002"]
+
+    # Finalizar cede el cupo al primero de la cola
+    assert cliente.patch("/matricula/1000000/finalizar", params=dict(codigo="ABC1234")).status_code == 200
+    assert activos(session) == {"1000003"}
+    assert enEspera(cliente) == ["1000001", "1000002"]
+
+    # Desmatricular cede el cupo al siguiente
+    assert cliente.delete("/matricula/1000003/desmatricular", params=dict(codigo="ABC1234")).status_code == 200
+    assert activos(session) == {"1000001"}
+
+    # Eliminar al estudiante tambien cede su cupo
+    assert cliente.delete("/estudiante/1000001/eliminar").status_code == 200
+    assert activos(session) == {"1000002"}
+    assert enEspera(cliente) == []
+
+
+def test_eliminar_estudiante_responde_400_si_el_promovido_ya_tiene_otro_curso(cliente, session, monkeypatch):
+    llenarCursoConCola(cliente, ["1000001"])
+    crearCurso(cliente, "XYZ9876")
+
+    # Simular que otra peticion matriculo en paralelo al estudiante promovido en otro curso
+    def promoverConConflicto(session, codigo):
+        promovidos = promoverListaEspera(session, codigo)
+        session.add(Matricula(codigo="XYZ9876", cedula=promovidos[0], matriculado=EstadoMatricula.MATRICULADO))
+        return promovidos
+
+    monkeypatch.setattr(estudianteRouter, "promoverListaEspera", promoverConConflicto)
+
+    respuesta = cliente.delete("/estudiante/1000000/eliminar")
+
+    assert respuesta.status_code == 400
+    # La eliminacion se revierte completa
+    assert cliente.get("/estudiante/cedula/1000000").status_code == 200
+    assert activos(session) == {"1000000"}
+    assert enEspera(cliente) == ["1000001"]
+
+
+def test_promocion_de_cola_larga_en_lotes(cliente, session, engine):
+    crearCurso(cliente, "ABC1234", cupo="1")
+    cantidad = 3 * TAMANO_LOTE_PROMOCION
+    cedulas = [str(2000000 + numero) for numero in range(cantidad + 1)]
+    filas = [f"{cedula},estudiante,e{cedula}@ucatolica.edu.co,1" for cedula in cedulas]
+    contenido = "\n".join(["cedula,nombre,email,semestre"] + filas).encode("utf-8")
+    assert cliente.post("/estudiante/importar", files={"archivo": ("e.csv", contenido, "text/csv")}).status_code == 201
+    assert cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula=cedulas[0])).status_code == 201
+
+    # Cola en orden inverso de cedula para comprobar que se respeta el orden de llegada
+    cola = list(reversed(cedulas[1:]))
+    session.exec(insert(ListaEspera), params=[{"codigo": "ABC1234", "cedula": cedula} for cedula in cola])
+    # Ampliar el cupo para todos menos los dos ultimos de la cola
+    session.get(Curso, session.exec(select(Curso.id).where(Curso.codigo == "ABC1234")).one()).cupo = cantidad - 1
+    session.commit()
+
+    with contarSentencias(engine) as sentencias:
+        promovidos = promoverListaEspera(session, "ABC1234")
+        session.commit()
+
+    assert promovidos == cola[:cantidad - 2]
+    assert activos(session) == {cedulas[0], *cola[:cantidad - 2]}
+    assert enEspera(cliente) == cola[cantidad - 2:]
+    # La cantidad de sentencias depende de los lotes, no del largo de la cola
+    lotes = -(-cantidad // TAMANO_LOTE_PROMOCION)
+    assert len(sentencias) <= 2 + 8 * lotes, sentencias
@@ -0,0 +1,96 @@
+"""
+Pruebas de concurrencia de la matrícula: muchas peticiones simultáneas contra
+el mismo archivo SQLite no deben exceder el cupo de un curso, matricular a un
+estudiante en dos cursos ni responder con errores 500.
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+from sqlmodel import select, func
+
+from conftest import modulo, crearCurso, crearEstudiante
+
+Matricula = modulo("models.matricula").Matricula
+CursoConteo = modulo("models.curso").CursoConteo
+EstadoMatricula = modulo("utils.enum").EstadoMatricula
+
+HILOS = 32
+
+
+def matricularEnParalelo(cliente, pares: list[tuple[str, str]]) -> Counter:
+    """
+    Enviar todas las matrículas a la vez y contar los códigos de estado.
+    """
+    inicio = Event()
+
+    def matricular(par):
+        codigo, cedula = par
+        inicio.wait()
+        respuesta = cliente.post("/matricula/matricular-estudiante", data=dict(codigo=codigo, cedula=cedula))
+        return respuesta.status_code
+
+    with ThreadPoolExecutor(max_workers=HILOS) as ejecutor:
+        estados = ejecutor.map(matricular, pares)
+        inicio.set()
+        return Counter(estados)
+
+
+def importarEstudiantes(cliente, cedulas: list[str]):
+    filas = [f"{cedula},estudiante,e{cedula}@ucatolica.edu.co,1" for cedula in cedulas]
+    contenido = "\n".join(["cedula,nombre,email,semestre"] + filas).encode("utf-8")
+    respuesta = cliente.post("/estudiante/importar", files={"archivo": ("e.csv", contenido, "text/csv")})
+    assert respuesta.json()["importados"] == len(cedulas)
+
+
+def matriculados(session, **filtros) -> int:
+    condiciones = [getattr(Matricula, campo) == valor for campo, valor in filtros.items()]
+    return session.exec(
+        select(func.count()).select_from(Matricula).where(
+            Matricula.matriculado == EstadoMatricula.MATRICULADO, *condiciones
+        )
+    ).one()
+
+
+def test_cupo_no_se_excede(cliente, session):
+    crearCurso(cliente, "ABC1234", cupo="5")
+    cedulas = [str(1000000 + numero) for numero in range(300)]
+    importarEstudiantes(cliente, cedulas)
+
+    estados = matricularEnParalelo(cliente, [("ABC1234", cedula) for cedula in cedulas])
+
+    assert estados == {201: 5, 400: 295}
+    assert matriculados(session, codigo="ABC1234") == 5
+    # El contador precalculado coincide con las filas
+    assert session.get(CursoConteo, "ABC1234").matriculados == 5
+
+
+def test_un_solo_curso_activo_por_estudiante(cliente, session):
+    codigos = [f"CUR{numero:04d}" for numero in range(200)]
+    for codigo in codigos:
+        crearCurso(cliente, codigo)
+    crearEstudiante(cliente, "8888888")
+
+    estados = matricularEnParalelo(cliente, [(codigo, "8888888") for codigo in codigos])
+
+    assert estados == {201: 1, 400: 199}
+    assert matriculados(session, cedula="8888888") == 1
+
+
+def test_cupo_y_estudiantes_compitiendo(cliente, session):
+    codigos = [f"CUR{numero:04d}" for numero in range(10)]
+    for codigo in codigos:
+        crearCurso(cliente, codigo, cupo="3")
+    cedulas = [str(2000000 + numero) for numero in range(40)]
+    importarEstudiantes(cliente, cedulas)
+
+    # Cada estudiante intenta matricularse en todos los cursos a la vez
+    estados = matricularEnParalelo(cliente, [(codigo, cedula) for cedula in cedulas for codigo in codigos])
+
+    assert set(estados) <= {201, 400}
+    assert sum(matriculados(session, codigo=codigo) for codigo in codigos) == estados[201]
+    for codigo in codigos:
+        assert matriculados(session, codigo=codigo) <= 3
+    for cedula in cedulas:
+        assert matriculados(session, cedula=cedula) <= 1
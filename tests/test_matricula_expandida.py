@@ -0,0 +1,91 @@
+"""
+Pruebas de las matrículas expandidas (`expandir=true`): cada matrícula incluye
+su curso y su estudiante, y la cantidad de consultas no depende de la cantidad
+de matrículas.
+"""
+
+import pytest
+
+from conftest import crearCurso, crearEstudiante, contarSentencias
+
+
+def importarEstudiantes(cliente, cedulas: list[str]):
+    filas = [f"{cedula},estudiante {cedula},e{cedula}@ucatolica.edu.co,1" for cedula in cedulas]
+    contenido = "\n".join(["cedula,nombre,email,semestre"] + filas).encode("utf-8")
+    respuesta = cliente.post("/estudiante/importar", files={"archivo": ("e.csv", contenido, "text/csv")})
+    assert respuesta.json()["importados"] == len(cedulas)
+
+
+def matricularEnCurso(cliente, codigo: str, cedulas: list[str]):
+    importarEstudiantes(cliente, cedulas)
+    respuesta = cliente.post("/matricula/matricular-lote", json={"codigo": codigo, "cedulas": cedulas})
+    assert [resultado["status"] for resultado in respuesta.json()] == [201] * len(cedulas)
+
+
+def sentenciasDe(cliente, engine, ruta: str, **parametros) -> int:
+    # La primera peticion llena las caches de cursos y estudiantes
+    assert cliente.get(ruta, params=parametros).status_code == 200
+    with contarSentencias(engine) as sentencias:
+        respuesta = cliente.get(ruta, params=parametros)
+    assert respuesta.status_code == 200, respuesta.text
+    return len(sentencias)
+
+
+def test_matriculas_incluyen_curso_y_estudiante(cliente):
+    crearCurso(cliente, "ABC1234", nombre="calculo")
+    matricularEnCurso(cliente, "ABC1234", ["1000001", "1000002"])
+
+    planas = cliente.get("/matricula/curso/ABC1234").json()
+    expandidas = cliente.get("/matricula/curso/ABC1234", params=dict(expandir=True)).json()
+
+    assert [{clave: valor for clave, valor in matricula.items() if clave not in ("curso", "estudiante")}
+            for matricula in expandidas] == planas
+    assert expandidas[0]["curso"] == cliente.get("/curso/codigo/ABC1234").json()
+    assert expandidas[0]["estudiante"] == cliente.get("/estudiante/cedula/1000001").json()
+    assert [matricula["estudiante"]["nombre"] for matricula in expandidas] == ["ESTUDIANTE 1000001", "ESTUDIANTE 1000002"]
+
+
+@pytest.mark.parametrize("ruta, parametros", [
+    ("/matricula/todos", {}),
+    ("/matricula/todos", {"limit": 1000}),
+    ("/matricula/curso/ABC1234", {}),
+])
+def test_consultas_constantes_por_pagina(cliente, engine, ruta, parametros):
+    crearCurso(cliente, "ABC1234")
+    matricularEnCurso(cliente, "ABC1234", [str(1000000 + numero) for numero in range(3)])
+    pocas = sentenciasDe(cliente, engine, ruta, expandir=True, **parametros)
+
+    matricularEnCurso(cliente, "ABC1234", [str(2000000 + numero) for numero in range(60)])
+    muchas = sentenciasDe(cliente, engine, ruta, expandir=True, **parametros)
+
+    assert muchas == pocas
+    assert muchas <= 2
+
+
+def test_matriculas_de_estudiante_expandidas(cliente, engine):
+    crearEstudiante(cliente, "1000001")
+    for numero in range(5):
+        codigo = f"CUR{numero:04d}"
+        crearCurso(cliente, codigo, nombre=f"curso {numero}")
+        assert cliente.post("/matricula/matricular-estudiante", data=dict(codigo=codigo, cedula="1000001")).status_code == 201
+        if numero < 4:
+            assert cliente.patch("/matricula/1000001/finalizar", params=dict(codigo=codigo)).status_code == 200
+
+    respuesta = cliente.get("/matricula/estudiante/1000001", params=dict(expandir=True))
+
+    assert respuesta.status_code == 200
+    assert [matricula["curso"]["nombre"] for matricula in respuesta.json()] == [f"CURSO {numero}" for numero in range(5)]
+    assert {matricula["estudiante"]["cedula"] for matricula in respuesta.json()} == {"1000001"}
+    assert sentenciasDe(cliente, engine, "/matricula/estudiante/1000001", expandir=True) <= 3
+
+
+def test_paginacion_expandida(cliente):
+    crearCurso(cliente, "ABC1234")
+    matricularEnCurso(cliente, "ABC1234", [str(1000000 + numero) for numero in range(5)])
+
+    primera = cliente.get("/matricula/todos", params=dict(expandir=True, limit=3))
+    segunda = cliente.get("/matricula/todos", params=dict(expandir=True, limit=3, after=primera.headers["X-Siguiente-Cursor"]))
+
+    assert [matricula["cedula"] for matricula in primera.json() + segunda.json()] == [str(1000000 + numero) for numero in range(5)]
+    assert "X-Siguiente-Cursor" not in segunda.headers
+    assert all(matricula["curso"]["codigo"] == "ABC1234" for matricula in segunda.json())
@@ -0,0 +1,26 @@
+"""
+Pruebas de la matrícula por lotes.
+"""
+
+from conftest import crearCurso, crearEstudiante
+
+
+def test_lote_matricula_cedulas_del_curso(cliente):
+    crearCurso(cliente, "ABC1234")
+    crearEstudiante(cliente, "1111111")
+
+    respuesta = cliente.post("/matricula/matricular-lote", json={"codigo": "abc1234", "cedulas": ["1111111", "9999999"]})
+
+    assert respuesta.status_code == 200
+    assert [resultado["status"] for resultado in respuesta.json()] == [201, 404]
+
+
+def test_lote_rechaza_cedulas_sin_codigo(cliente):
+    crearCurso(cliente, "ABC1234")
+    crearEstudiante(cliente, "1111111")
+
+    respuesta = cliente.post("/matricula/matricular-lote", json={"cedulas": ["1111111"]})
+
+    assert respuesta.status_code == 422
+    assert respuesta.json()["detail"] == "Las cedulas requieren el codigo del curso"
+    assert cliente.get("/matricula/estudiante/1111111").status_code == 404
@@ -0,0 +1,71 @@
+"""
+Pruebas de `/metrics`: las series se etiquetan con la plantilla de la ruta y
+cuentan las sentencias SQL que ejecutó cada petición.
+"""
+
+from conftest import modulo, crearCurso, contarSentencias
+
+metricas = modulo("utils.metricas")
+
+
+def leerMetricas(cliente) -> dict:
+    """
+    Valores de `/metrics` por nombre de la serie con sus etiquetas.
+    """
+    respuesta = cliente.get("/metrics")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["Content-Type"] == metricas.TIPO_CONTENIDO_PROMETHEUS
+    valores = {}
+    for linea in respuesta.text.splitlines():
+        if linea and not linea.startswith("#"):
+            serie, valor = linea.rsplit(" ", 1)
+            valores[serie] = float(valor)
+    return valores
+
+
+def etiquetas(ruta: str, metodo: str = "GET") -> str:
+    return f'method="{metodo}",route="{ruta}"'
+
+
+def test_series_con_la_plantilla_de_la_ruta(cliente):
+    for codigo in ("ABC0001", "ABC0002"):
+        crearCurso(cliente, codigo)
+        assert cliente.get(f"/curso/codigo/{codigo}").status_code == 200
+    assert cliente.get("/curso/codigo/XYZ9999").status_code == 404
+    assert cliente.get("/no/existe").status_code == 404
+
+    valores = leerMetricas(cliente)
+
+    ruta = etiquetas("/curso/codigo/{codigo}")
+    assert valores[f"http_request_duration_seconds_count{{{ruta}}}"] == 3
+    assert valores[f'http_request_duration_seconds_bucket{{{ruta},le="+Inf"}}'] == 3
+    assert valores[f'http_responses_total{{{ruta},status="200"}}'] == 2
+    assert valores[f'http_responses_total{{{ruta},status="404"}}'] == 1
+    assert valores[f'http_responses_total{{{etiquetas("/curso/crear", "POST")},status="201"}}'] == 2
+    # Las URL sin ruta comparten una sola serie
+    assert valores[f'http_responses_total{{{etiquetas("sin_ruta")},status="404"}}'] == 1
+    # Ninguna serie lleva los valores concretos de la URL
+    assert not [serie for serie in valores if "ABC0001" in serie or "XYZ9999" in serie or "/no/existe" in serie]
+
+
+def test_cuenta_las_sentencias_de_cada_peticion(cliente, engine):
+    crearCurso(cliente, "ABC0001")
+    modulo("db.cache").cacheCursos.limpiar()
+
+    with contarSentencias(engine) as sentencias:
+        assert cliente.get("/curso/codigo/ABC0001").status_code == 200
+    # La segunda consulta sale de la cache y no ejecuta sentencias
+    with contarSentencias(engine) as enCache:
+        assert cliente.get("/curso/codigo/ABC0001").status_code == 200
+
+    valores = leerMetricas(cliente)
+
+    ruta = etiquetas("/curso/codigo/{codigo}")
+    assert len(sentencias) > 0
+    assert enCache == []
+    assert valores[f"db_statements_total{{{ruta}}}"] == len(sentencias)
+    assert valores[f"db_duration_seconds_total{{{ruta}}}"] > 0
+    # Las sentencias fuera de una peticion no se suman a ninguna ruta
+    with engine.connect() as conexion:
+        conexion.exec_driver_sql("SELECT 1")
+    assert leerMetricas(cliente)[f"db_statements_total{{{ruta}}}"] == len(sentencias)
@@ -0,0 +1,125 @@
+"""
+Pruebas de la paginación por llave (`limit`, `after` y `X-Siguiente-Cursor`) y
+del formato NDJSON de los listados `/todos`, que debe tener las mismas claves,
+en el mismo orden, que el arreglo y que los *endpoints* con `response_model`.
+"""
+
+import json
+
+import pytest
+
+from conftest import modulo, crearCurso, crearEstudiante
+
+paginacion = modulo("utils.paginacion")
+Curso = modulo("models.curso").Curso
+Estudiante = modulo("models.estudiante").Estudiante
+Matricula = modulo("models.matricula").Matricula
+
+
+@pytest.fixture
+def estudiantes(cliente):
+    return [crearEstudiante(cliente, str(1000000 + numero))["id"] for numero in range(5)]
+
+
+def recorrerPaginas(cliente, limit: int) -> list[list[int]]:
+    paginas = []
+    after = None
+    while True:
+        parametros = {"limit": limit} if after is None else {"limit": limit, "after": after}
+        respuesta = cliente.get("/estudiante/todos", params=parametros)
+        assert respuesta.status_code == 200, respuesta.text
+        paginas.append([fila["id"] for fila in respuesta.json()])
+        after = respuesta.headers.get(paginacion.CABECERA_CURSOR)
+        if after is None:
+            return paginas
+        assert int(after) == paginas[-1][-1]
+
+
+@pytest.mark.parametrize("limit, tamanos", [(1, [1] * 5), (2, [2, 2, 1]), (4, [4, 1]), (5, [5]), (6, [5])])
+def test_paginas_cubren_todas_las_filas_una_vez(cliente, estudiantes, limit, tamanos):
+    paginas = recorrerPaginas(cliente, limit)
+
+    assert [len(pagina) for pagina in paginas] == tamanos
+    assert [id for pagina in paginas for id in pagina] == estudiantes
+
+
+def test_cursor_despues_de_la_ultima_fila(cliente, estudiantes):
+    respuesta = cliente.get("/estudiante/todos", params={"limit": 2, "after": estudiantes[-1]})
+
+    # Una pagina vacia despues del ultimo cursor no es un 404
+    assert respuesta.status_code == 200
+    assert respuesta.json() == []
+    assert paginacion.CABECERA_CURSOR not in respuesta.headers
+
+
+def test_cursor_no_depende_de_filas_eliminadas(cliente, estudiantes):
+    primera = cliente.get("/estudiante/todos", params={"limit": 2})
+    # La fila del cursor se elimina antes de pedir la pagina siguiente
+    cliente.delete("/estudiante/1000001/eliminar")
+
+    siguiente = cliente.get("/estudiante/todos", params={"limit": 2, "after": primera.headers[paginacion.CABECERA_CURSOR]})
+
+    assert [fila["id"] for fila in siguiente.json()] == estudiantes[2:4]
+
+
+@pytest.mark.parametrize("limit", [0, 1001])
+def test_limit_fuera_de_rango(cliente, limit):
+    assert cliente.get("/estudiante/todos", params={"limit": limit}).status_code == 422
+
+
+def lineasNDJSON(respuesta) -> list[dict]:
+    assert respuesta.headers["content-type"] == "application/x-ndjson"
+    cuerpo = respuesta.text
+    # Cada objeto termina en salto de linea y no hay lineas vacias ni cortadas
+    assert cuerpo == "" or cuerpo.endswith("\n")
+    return [json.loads(linea) for linea in cuerpo.split("\n")[:-1]]
+
+
+def test_ndjson_una_fila_por_linea_entre_lotes(cliente, estudiantes, monkeypatch):
+    # Lotes de 2 filas: la respuesta se transmite en 3 fragmentos
+    monkeypatch.setattr(paginacion, "TAMANO_LOTE_NDJSON", 2)
+
+    respuesta = cliente.get("/estudiante/todos", params={"ndjson": True})
+
+    assert respuesta.status_code == 200
+    assert [fila["id"] for fila in lineasNDJSON(respuesta)] == estudiantes
+
+
+def test_ndjson_respeta_limit_y_after(cliente, estudiantes):
+    respuesta = cliente.get("/estudiante/todos", params={"ndjson": True, "after": estudiantes[0], "limit": 3})
+
+    assert [fila["id"] for fila in lineasNDJSON(respuesta)] == estudiantes[1:4]
+
+
+def test_ndjson_vacio(cliente, estudiantes):
+    respuesta = cliente.get("/estudiante/todos", params={"ndjson": True, "after": estudiantes[-1]})
+
+    assert respuesta.status_code == 200
+    assert lineasNDJSON(respuesta) == []
+
+
+@pytest.mark.parametrize("ruta, modelo", [
+    ("/curso/todos", Curso),
+    ("/estudiante/todos", Estudiante),
+    ("/matricula/todos", Matricula),
+])
+def test_ndjson_y_arreglo_con_las_mismas_claves_que_el_response_model(cliente, ruta, modelo):
+    crearCurso(cliente, "ABC1234")
+    crearEstudiante(cliente, "1234567")
+    assert cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1234567")).status_code == 201
+    # Endpoints que responden validando con su response_model
+    esperado = {
+        Curso: [cliente.get("/curso/codigo/ABC1234").json()],
+        Estudiante: [cliente.get("/estudiante/cedula/1234567").json()],
+        Matricula: cliente.get("/matricula/estudiante/1234567").json(),
+    }[modelo]
+
+    arreglo = cliente.get(ruta).json()
+    lineas = lineasNDJSON(cliente.get(ruta, params={"ndjson": True}))
+
+    # Las dos formas tienen las claves en el orden de los campos del modelo
+    campos = list(modelo.model_fields)
+    assert [list(fila) for fila in arreglo] == [campos]
+    assert [list(fila) for fila in lineas] == [campos]
+    # Y los mismos valores que la respuesta validada con el modelo
+    assert arreglo == lineas == esperado
@@ -0,0 +1,138 @@
+"""
+Pruebas contra PostgreSQL: el índice único parcial de matrículas activas, los
+índices `text_pattern_ops` del filtro por prefijo, las inserciones que chocan
+con una restricción única y la promoción de la lista de espera cuando otra
+transacción matricula al mismo estudiante.
+
+Se omiten si `DATABASE_URL` no apunta a PostgreSQL (ver `conftest.py`). En
+SQLite el bloqueo de escritura de la base serializa las transacciones, así que
+estas carreras solo se pueden reproducir con PostgreSQL.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from threading import Event
+
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from conftest import modulo, crearCurso, crearEstudiante
+from test_matricula_concurrencia import matricularEnParalelo, matriculados
+
+pytestmark = pytest.mark.postgres
+
+Matricula = modulo("models.matricula").Matricula
+ListaEspera = modulo("models.matricula").ListaEspera
+Curso = modulo("models.curso").Curso
+Estudiante = modulo("models.estudiante").Estudiante
+EstadoMatricula = modulo("utils.enum").EstadoMatricula
+filtros = modulo("utils.filtros")
+
+
+def test_indice_parcial_de_matricula_activa(cliente, session):
+    definicion = session.exec(
+        text("SELECT indexdef FROM pg_indexes WHERE indexname = 'ux_matricula_cedula_activa'")
+    ).scalar_one()
+    assert definicion.startswith("CREATE UNIQUE INDEX")
+    assert "WHERE" in definicion
+
+    crearCurso(cliente, "ABC1234")
+    crearCurso(cliente, "XYZ9876")
+    crearEstudiante(cliente, "1234567")
+    session.add(Matricula(codigo="ABC1234", cedula="1234567", matriculado=EstadoMatricula.MATRICULADO))
+    session.commit()
+
+    # Una matricula no activa en otro curso cumple el indice
+    session.add(Matricula(codigo="XYZ9876", cedula="1234567", matriculado=EstadoMatricula.FINALIZADO))
+    session.commit()
+    # Una segunda matricula activa lo viola
+    session.add(Matricula(codigo="XYZ9876", cedula="1234567", matriculado=EstadoMatricula.MATRICULADO))
+    with pytest.raises(IntegrityError):
+        session.commit()
+
+
+@pytest.mark.parametrize("modelo, indice", [
+    (Curso, "ix_curso_nombre_patron"),
+    (Estudiante, "ix_estudiante_nombre_patron"),
+])
+def test_prefijo_usa_el_indice_text_pattern_ops(cliente, session, modelo, indice):
+    definicion = session.exec(
+        text("SELECT indexdef FROM pg_indexes WHERE indexname = :indice").bindparams(indice=indice)
+    ).scalar_one()
+    assert "text_pattern_ops" in definicion
+
+    consulta = select(modelo.id).where(filtros.filtroPrefijo(modelo.nombre, "CAL", "postgresql"))
+    compilada = consulta.compile(dialect=session.get_bind().dialect)
+    # Con las tablas vacias el planificador prefiere recorrerlas: se desactiva para ver si el indice aplica
+    conexion = session.connection()
+    conexion.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    plan = "\n".join(conexion.exec_driver_sql(f"EXPLAIN {compilada}", compilada.params).scalars())
+    assert indice in plan, plan
+
+
+def test_un_solo_curso_activo_con_peticiones_simultaneas(cliente, session):
+    codigos = [f"CUR{numero:04d}" for numero in range(50)]
+    for codigo in codigos:
+        crearCurso(cliente, codigo)
+    crearEstudiante(cliente, "8888888")
+
+    estados = matricularEnParalelo(cliente, [(codigo, "8888888") for codigo in codigos])
+
+    assert estados == {201: 1, 400: 49}
+    assert matriculados(session, cedula="8888888") == 1
+
+
+def test_inscripciones_simultaneas_en_la_lista_de_espera(cliente, session):
+    crearCurso(cliente, "ABC1234", cupo="1")
+    crearEstudiante(cliente, "1000000")
+    crearEstudiante(cliente, "1000001")
+    cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1000000"))
+    inicio = Event()
+
+    def inscribir(_):
+        inicio.wait()
+        return cliente.post("/matricula/lista-espera", data=dict(codigo="ABC1234", cedula="1000001")).status_code
+
+    # El indice unico (codigo, cedula) rechaza las inscripciones que pasan la validacion a la vez
+    with ThreadPoolExecutor(max_workers=16) as ejecutor:
+        estados = ejecutor.map(inscribir, range(16))
+        inicio.set()
+        estados = Counter(estados)
+
+    assert estados == {201: 1, 400: 15}
+    assert session.exec(select(ListaEspera.cedula)).all() == ["1000001"]
+
+
+def test_promocion_con_matricula_concurrente_responde_400(cliente, session, engine):
+    crearCurso(cliente, "ABC1234", cupo="1")
+    crearCurso(cliente, "XYZ9876")
+    crearEstudiante(cliente, "1000000")
+    crearEstudiante(cliente, "1000001")
+    cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1000000"))
+    cliente.post("/matricula/lista-espera", data=dict(codigo="ABC1234", cedula="1000001"))
+    concurrentes = []
+
+    def matricularEnOtroCurso(conexion, cursor, sql, parametros, contexto, executemany):
+        # Despues de que la promocion leyo las matriculas del promovido y antes de
+        # insertar la suya, otra transaccion lo matricula en otro curso y confirma
+        if sql.startswith("DELETE FROM listaespera WHERE listaespera.id IN") and not concurrentes:
+            with Session(engine) as otra:
+                otra.add(Matricula(codigo="XYZ9876", cedula="1000001", matriculado=EstadoMatricula.MATRICULADO))
+                otra.commit()
+            concurrentes.append("1000001")
+
+    event.listen(engine, "before_cursor_execute", matricularEnOtroCurso)
+    try:
+        respuesta = cliente.delete("/estudiante/1000000/eliminar")
+    finally:
+        event.remove(engine, "before_cursor_execute", matricularEnOtroCurso)
+
+    assert concurrentes == ["1000001"]
+    assert respuesta.status_code == 400
+    assert respuesta.json()["detail"].startswith("Otra peticion matriculo al siguiente estudiante")
+    # La eliminacion se revierte completa
+    assert cliente.get("/estudiante/cedula/1000000").status_code == 200
+    assert matriculados(session, codigo="ABC1234") == 1
+    assert matriculados(session, cedula="1000001") == 1
@@ -0,0 +1,58 @@
+"""
+Pruebas de la validación consolidada de la matrícula: una sola consulta por
+petición y datos coherentes de la matrícula del estudiante en el curso.
+"""
+
+from conftest import modulo, crearCurso, crearEstudiante, contarSentencias
+
+matriculaRouter = modulo("routers.matricula_router")
+Matricula = modulo("models.matricula").Matricula
+EstadoMatricula = modulo("utils.enum").EstadoMatricula
+
+
+def lecturasAntesDeEscribir(sentencias: list[str]) -> list[str]:
+    lecturas = []
+    for sql in sentencias:
+        if not sql.lstrip().startswith("SELECT"):
+            break
+        lecturas.append(sql)
+    return lecturas
+
+
+def test_matricular_valida_en_una_consulta(cliente, engine):
+    crearCurso(cliente, "ABC1234")
+    crearEstudiante(cliente, "1234567")
+
+    with contarSentencias(engine) as sentencias:
+        respuesta = cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1234567"))
+
+    assert respuesta.status_code == 201, respuesta.text
+    # Validacion, cupo, insercion y lectura de la fila creada
+    assert len(sentencias) <= 4, sentencias
+    assert len(lecturasAntesDeEscribir(sentencias)) == 1, sentencias
+
+
+def test_matricula_rechazada_solo_consulta_la_validacion(cliente, engine):
+    crearCurso(cliente, "ABC1234")
+    crearCurso(cliente, "XYZ9876")
+    crearEstudiante(cliente, "1234567")
+    cliente.post("/matricula/matricular-estudiante", data=dict(codigo="ABC1234", cedula="1234567"))
+
+    with contarSentencias(engine) as sentencias:
+        respuesta = cliente.post("/matricula/matricular-estudiante", data=dict(codigo="XYZ9876", cedula="1234567"))
+
+    assert respuesta.status_code == 400
+    assert len(sentencias) == 1, sentencias
+
+
+def test_validacion_lee_una_sola_matricula_del_historial(session):
+    # Dos filas del mismo estudiante en el mismo curso: la validacion usa la mas reciente
+    session.add(Matricula(codigo="ABC1234", cedula="1234567", matriculado=EstadoMatricula.FINALIZADO))
+    session.commit()
+    reciente = Matricula(codigo="ABC1234", cedula="1234567", matriculado=EstadoMatricula.DESMATRICULADO)
+    session.add(reciente)
+    session.commit()
+
+    validacion = matriculaRouter.validacionMatricula(session, "ABC1234", "1234567")
+
+    assert (validacion.matriculaID, validacion.estado) == (reciente.id, EstadoMatricula.DESMATRICULADO)
@@ -0,0 +1,97 @@
+"""
+Pruebas de las respuestas condicionales del catálogo de cursos: el `304` no
+consulta la base de datos, usa la misma `ETag` que la respuesta comprimida y
+cualquier escritura posterior a la versión del cliente lo invalida.
+"""
+
+from email.utils import formatdate
+
+import pytest
+
+from conftest import modulo, crearCurso, contarSentencias
+
+versiones = modulo("utils.versiones")
+
+
+@pytest.fixture
+def catalogo(cliente):
+    # Suficientes cursos para que la respuesta supere el minimo de compresion
+    for numero in range(20):
+        crearCurso(cliente, f"CUR{numero:04d}", nombre=f"curso numero {numero}")
+
+
+def test_304_sin_consultas(cliente, engine, catalogo):
+    etag = cliente.get("/curso/todos").headers["ETag"]
+    # Una fecha posterior a cualquier cambio del catalogo
+    despues = formatdate(2**31, usegmt=True)
+
+    with contarSentencias(engine) as sentencias:
+        porETag = cliente.get("/curso/todos", headers={"If-None-Match": etag})
+        porFecha = cliente.get("/curso/todos", headers={"If-Modified-Since": despues})
+
+    assert (porETag.status_code, porFecha.status_code) == (304, 304)
+    assert porETag.content == b""
+    assert sentencias == []
+
+
+def test_304_y_respuesta_comprimida_con_la_misma_etag(cliente, catalogo):
+    comprimida = cliente.get("/curso/todos", headers={"Accept-Encoding": "gzip"})
+    assert comprimida.headers["Content-Encoding"] == "gzip"
+
+    noModificada = cliente.get("/curso/todos", headers={"If-None-Match": comprimida.headers["ETag"]})
+
+    assert noModificada.status_code == 304
+    assert noModificada.headers["ETag"] == comprimida.headers["ETag"]
+    assert comprimida.headers["ETag"].startswith('W/"')
+
+
+def test_escritura_despues_de_la_etag_la_invalida(cliente, catalogo):
+    etag = cliente.get("/curso/todos").headers["ETag"]
+
+    crearCurso(cliente, "NUE0001", nombre="nuevo")
+
+    respuesta = cliente.get("/curso/todos", headers={"If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["ETag"] != etag
+    assert "NUE0001" in [curso["codigo"] for curso in respuesta.json()]
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    ahora = [1000.2]
+    monkeypatch.setattr(versiones, "time", lambda: ahora[0])
+    return ahora
+
+
+def revalidar(version, fecha: str):
+    return versiones.respuestaCondicional(version, versiones.Response(), None, fecha)
+
+
+def test_escritura_en_el_mismo_segundo_invalida_if_modified_since(reloj):
+    version = versiones.VersionTabla("cursos", ttl=0)
+
+    # Dentro del segundo del cambio se publica el segundo anterior
+    reloj[0] = 1000.5
+    segundos = version.estado()[2]
+    assert segundos == 1000
+    assert revalidar(version, formatdate(segundos, usegmt=True)) is None
+
+    # Otro cambio en el mismo segundo tampoco se confunde con la copia del cliente
+    reloj[0] = 1000.7
+    version.incrementar()
+    assert revalidar(version, formatdate(1000, usegmt=True)) is None
+
+
+def test_if_modified_since_responde_304_hasta_la_siguiente_escritura(reloj):
+    version = versiones.VersionTabla("cursos", ttl=0)
+
+    # Pasado el segundo del cambio se publica el segundo siguiente
+    reloj[0] = 1001.5
+    segundos = version.estado()[2]
+    assert segundos == 1001
+    fecha = formatdate(segundos, usegmt=True)
+    assert revalidar(version, fecha).status_code == 304
+
+    reloj[0] = 1001.6
+    version.incrementar()
+    assert revalidar(version, fecha) is None
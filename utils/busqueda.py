@@ -0,0 +1,272 @@
+"""
+Módulo: busqueda
+----------------
+Índice invertido en memoria para buscar registros por nombre.
+
+Los textos se normalizan (minúsculas y sin tildes) y se separan en palabras. El
+índice guarda los registros de cada palabra y, sobre el vocabulario (las
+palabras distintas, muchas menos que los registros):
+
+* una lista ordenada que permite encontrar con búsqueda binaria todas las
+  palabras que empiezan por un prefijo, y
+* los trigramas de cada palabra (con relleno al inicio y al final, como
+  `pg_trgm`), para encontrar palabras parecidas aunque tengan errores de
+  escritura.
+
+Cada palabra de la búsqueda debe coincidir con alguna palabra del nombre. La
+coincidencia vale 1 si es la palabra completa, entre 0.5 y 1 si es un prefijo
+(más mientras más larga sea la parte escrita) y la mitad de la similitud de
+trigramas (coeficiente de Dice) si solo se parece. El puntaje del registro es el
+promedio de sus coincidencias más un punto si el nombre es exactamente la
+búsqueda.
+
+El índice es local a cada proceso y seguro para los hilos del *threadpool*. Como
+`CacheLRU`, cada escritura incrementa `generacion`, y una carga completa o una
+sincronización desde la base de datos solo se acepta si no hubo escrituras
+mientras se leía.
+"""
+
+import heapq
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter, defaultdict
+
+# Similitud minima de trigramas para aceptar una palabra parecida
+UMBRAL_SIMILITUD = 0.3
+
+
+def normalizar(texto: str) -> str:
+    """
+    Pasar un texto a minúsculas, sin tildes y con un solo espacio entre palabras.
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto or "")
+    sinTildes = "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter))
+    return " ".join(sinTildes.lower().split())
+
+
+def trigramas(palabra: str) -> set:
+    """
+    Obtener los trigramas de una palabra normalizada.
+    """
+    relleno = f"  {palabra} "
+    return {relleno[posicion:posicion + 3] for posicion in range(len(relleno) - 2)}
+
+
+class IndiceBusqueda:
+    """
+    Índice de búsqueda por prefijo y por similitud sobre un texto por registro.
+
+    Attributes:
+        cargado (bool): Si el índice ya tiene todos los registros de la tabla.
+        generacion (int): Contador de escrituras.
+        maximo (int): Mayor `id` de la tabla leído en la última sincronización.
+        sincronizado (float): Momento (`time.monotonic`) de la última
+            sincronización con la tabla.
+        verificado (float): Momento (`time.monotonic`) en que se compararon por
+            última vez todas las claves con la tabla.
+    """
+
+    def __init__(self):
+        self.cargado = False
+        self.generacion = 0
+        self.maximo = 0
+        self.sincronizado = 0.0
+        self.verificado = 0.0
+        self._textos = {}
+        self._palabras = defaultdict(set)
+        self._ordenadas = []
+        self._trigramas = defaultdict(set)
+        self._cantidadTrigramas = {}
+        self._lock = threading.Lock()
+
+    def cargar(self, documentos, generacion: int) -> bool:
+        """
+        Reemplazar el contenido del índice por los pares `(clave, texto)` dados.
+
+        Returns:
+            bool: `False` si hubo escrituras después de tomar `generacion`.
+        """
+        with self._lock:
+            if generacion != self.generacion:
+                return False
+            self._textos.clear()
+            self._palabras.clear()
+            self._ordenadas.clear()
+            self._trigramas.clear()
+            self._cantidadTrigramas.clear()
+            for clave, texto in documentos:
+                texto = normalizar(texto)
+                self._textos[clave] = texto
+                for palabra in set(texto.split()):
+                    self._palabras[palabra].add(clave)
+            for palabra in self._palabras:
+                self._indexarPalabra(palabra)
+            self._ordenadas.extend(sorted(self._palabras))
+            self.cargado = True
+            return True
+
+    def sincronizar(self, agregados, eliminadas, generacion: int) -> bool:
+        """
+        Agregar los pares `(clave, texto)` y quitar las claves leídas de la tabla.
+
+        Returns:
+            bool: `False` si hubo escrituras después de tomar `generacion`.
+        """
+        with self._lock:
+            if generacion != self.generacion:
+                return False
+            for clave in eliminadas:
+                self._eliminar(clave)
+            for clave, texto in agregados:
+                self._agregar(clave, texto)
+            return True
+
+    def claves(self) -> set:
+        """
+        Copia de las claves indexadas.
+        """
+        with self._lock:
+            return set(self._textos)
+
+    def __contains__(self, clave) -> bool:
+        return clave in self._textos
+
+    def __len__(self) -> int:
+        return len(self._textos)
+
+    def agregar(self, clave, texto: str):
+        """
+        Agregar o reemplazar el texto de un registro.
+        """
+        with self._lock:
+            self.generacion += 1
+            if self.cargado:
+                self._agregar(clave, texto)
+
+    def eliminar(self, clave):
+        """
+        Quitar un registro del índice.
+        """
+        with self._lock:
+            self.generacion += 1
+            if self.cargado:
+                self._eliminar(clave)
+
+    def buscar(self, consulta: str, limite: int, desplazamiento: int = 0) -> tuple[int, list]:
+        """
+        Buscar los registros que coinciden con `consulta`, del más al menos parecido.
+
+        Args:
+            consulta (str): Texto a buscar.
+            limite (int): Cantidad máxima de resultados.
+            desplazamiento (int): Resultados a omitir (paginación).
+
+        Returns:
+            tuple[int, list]: Total de coincidencias y página de pares `(clave, puntaje)`.
+        """
+        consulta = normalizar(consulta)
+        palabras = consulta.split()
+        if not palabras:
+            return 0, []
+
+        with self._lock:
+            puntajes = None
+            for palabra in set(palabras):
+                # Mejor coincidencia de la palabra en cada registro
+                mejores = {}
+                for candidata, puntaje in self._candidatas(palabra).items():
+                    for clave in self._palabras[candidata]:
+                        if puntaje > mejores.get(clave, 0):
+                            mejores[clave] = puntaje
+
+                # Conservar solo los registros que coinciden con todas las palabras
+                if puntajes is None:
+                    puntajes = mejores
+                else:
+                    menor, mayor = sorted((puntajes, mejores), key=len)
+                    puntajes = {clave: puntaje + mayor[clave] for clave, puntaje in menor.items() if clave in mayor}
+                if not puntajes:
+                    return 0, []
+
+            cantidad = len(set(palabras))
+            pagina = heapq.nsmallest(
+                desplazamiento + limite,
+                (
+                    (clave, puntaje / cantidad + (1.0 if self._textos[clave] == consulta else 0.0))
+                    for clave, puntaje in puntajes.items()
+                ),
+                key=lambda par: (-par[1], len(self._textos[par[0]]), self._textos[par[0]], str(par[0]))
+            )
+        return len(puntajes), pagina[desplazamiento:]
+
+    def _candidatas(self, palabra: str) -> dict:
+        """
+        Palabras del vocabulario que coinciden con `palabra` y su puntaje (el
+        llamador debe tener el lock).
+        """
+        candidatas = {}
+
+        # Palabras parecidas por trigramas
+        triPalabra = trigramas(palabra)
+        compartidos = Counter()
+        for trigrama in triPalabra:
+            compartidos.update(self._trigramas.get(trigrama, ()))
+        for candidata, cantidad in compartidos.items():
+            similitud = 2 * cantidad / (len(triPalabra) + self._cantidadTrigramas[candidata])
+            if similitud >= UMBRAL_SIMILITUD:
+                candidatas[candidata] = similitud / 2
+
+        # Palabras que empiezan por la palabra buscada
+        posicion = bisect_left(self._ordenadas, palabra)
+        while posicion < len(self._ordenadas) and self._ordenadas[posicion].startswith(palabra):
+            candidata = self._ordenadas[posicion]
+            candidatas[candidata] = 0.5 + 0.5 * len(palabra) / len(candidata)
+            posicion += 1
+        return candidatas
+
+    def _indexarPalabra(self, palabra: str):
+        """
+        Agregar una palabra nueva a los trigramas del vocabulario (el llamador
+        debe tener el lock).
+        """
+        triPalabra = trigramas(palabra)
+        self._cantidadTrigramas[palabra] = len(triPalabra)
+        for trigrama in triPalabra:
+            self._trigramas[trigrama].add(palabra)
+
+    def _agregar(self, clave, texto: str):
+        """
+        Agregar o reemplazar el texto de un registro (el llamador debe tener el lock).
+        """
+        self._eliminar(clave)
+        texto = normalizar(texto)
+        self._textos[clave] = texto
+        for palabra in set(texto.split()):
+            if palabra not in self._palabras:
+                insort(self._ordenadas, palabra)
+                self._indexarPalabra(palabra)
+            self._palabras[palabra].add(clave)
+
+    def _eliminar(self, clave):
+        """
+        Quitar un registro del índice (el llamador debe tener el lock).
+        """
+        texto = self._textos.pop(clave, None)
+        if texto is None:
+            return
+        for palabra in set(texto.split()):
+            claves = self._palabras[palabra]
+            claves.discard(clave)
+            if claves:
+                continue
+
+            # La palabra ya no esta en ningun registro: sacarla del vocabulario
+            del self._palabras[palabra]
+            del self._ordenadas[bisect_left(self._ordenadas, palabra)]
+            del self._cantidadTrigramas[palabra]
+            for trigrama in trigramas(palabra):
+                palabras = self._trigramas[trigrama]
+                palabras.discard(palabra)
+                if not palabras:
+                    del self._trigramas[trigrama]
@@ -0,0 +1,138 @@
+"""
+Módulo: cache
+-------------
+Caché en memoria con política LRU y tiempo de vida (TTL) para las consultas
+más frecuentes.
+
+Es segura para los hilos del *threadpool* de FastAPI y lleva contadores de
+aciertos, fallos, desalojos y expiraciones para poder dimensionarla. La caché es
+local a cada proceso: los *endpoints* que modifican los datos deben invalidarla
+de forma explícita.
+"""
+
+import threading
+from collections import OrderedDict
+from time import monotonic
+
+
+class CacheLRU:
+    """
+    Caché LRU con tiempo de vida por entrada.
+
+    Opcionalmente mantiene un índice secundario: `claveSecundaria` extrae de cada
+    valor otra llave (por ejemplo el email de un estudiante) con la que también
+    se puede consultar la entrada mediante `obtenerPorIndice`.
+
+    Cada invalidación incrementa `generacion`. Quien lee de la base de datos
+    después de un fallo debe tomar la generación antes de la consulta y pasarla a
+    `guardar`; si hubo una invalidación en medio, el valor leído puede estar
+    desactualizado y no se guarda.
+
+    Attributes:
+        tamanoMaximo (int): Cantidad máxima de entradas.
+        ttl (float): Segundos que una entrada se considera válida.
+        generacion (int): Contador de invalidaciones.
+    """
+
+    def __init__(self, tamanoMaximo: int, ttl: float, claveSecundaria=None):
+        self.tamanoMaximo = tamanoMaximo
+        self.ttl = ttl
+        self.generacion = 0
+        self._claveSecundaria = claveSecundaria
+        self._entradas = OrderedDict()
+        self._indice = {}
+        self._lock = threading.Lock()
+        self._aciertos = 0
+        self._fallos = 0
+        self._desalojos = 0
+        self._expirados = 0
+
+    def obtener(self, clave):
+        """
+        Obtener el valor asociado a `clave`, o `None` si no está o expiró.
+        """
+        with self._lock:
+            return self._obtener(clave)
+
+    def obtenerPorIndice(self, claveSecundaria):
+        """
+        Obtener el valor cuya llave secundaria es `claveSecundaria`.
+        """
+        with self._lock:
+            return self._obtener(self._indice.get(claveSecundaria))
+
+    def _obtener(self, clave):
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            self._fallos += 1
+            return None
+
+        expira, valor = entrada
+        if expira < monotonic():
+            self._eliminar(clave)
+            self._expirados += 1
+            self._fallos += 1
+            return None
+
+        self._entradas.move_to_end(clave)
+        self._aciertos += 1
+        return valor
+
+    def _eliminar(self, clave):
+        entrada = self._entradas.pop(clave, None)
+        if entrada is not None and self._claveSecundaria is not None:
+            self._indice.pop(self._claveSecundaria(entrada[1]), None)
+
+    def guardar(self, clave, valor, generacion: int = None):
+        """
+        Guardar un valor, desalojando las entradas menos usadas si hace falta.
+
+        Args:
+            clave: Llave de la entrada.
+            valor: Valor a guardar.
+            generacion (int): Generación tomada antes de leer el valor de la base
+                de datos. Si cambió, el valor no se guarda.
+        """
+        with self._lock:
+            if generacion is not None and generacion != self.generacion:
+                return
+
+            self._eliminar(clave)
+            self._entradas[clave] = (monotonic() + self.ttl, valor)
+            if self._claveSecundaria is not None:
+                self._indice[self._claveSecundaria(valor)] = clave
+            while len(self._entradas) > self.tamanoMaximo:
+                self._eliminar(next(iter(self._entradas)))
+                self._desalojos += 1
+
+    def invalidar(self, clave):
+        """
+        Eliminar una entrada de la caché.
+        """
+        with self._lock:
+            self.generacion += 1
+            self._eliminar(clave)
+
+    def limpiar(self):
+        """
+        Eliminar todas las entradas de la caché.
+        """
+        with self._lock:
+            self.generacion += 1
+            self._entradas.clear()
+            self._indice.clear()
+
+    def estadisticas(self) -> dict:
+        """
+        Obtener los contadores de uso de la caché.
+        """
+        with self._lock:
+            return {
+                "tamano": len(self._entradas),
+                "tamanoMaximo": self.tamanoMaximo,
+                "ttl": self.ttl,
+                "aciertos": self._aciertos,
+                "fallos": self._fallos,
+                "desalojos": self._desalojos,
+                "expirados": self._expirados,
+            }
@@ -0,0 +1,204 @@
+"""
+Módulo: compresion
+------------------
+Middleware ASGI que comprime las respuestas con gzip o brotli.
+
+Los listados son JSON muy repetitivo (los mismos nombres de campo y valores de
+enumerados en cada fila) y se comprimen a una fracción de su tamaño. El
+algoritmo se escoge según la cabecera `Accept-Encoding` del cliente y el orden
+de preferencia configurado; brotli solo se usa si el paquete `brotli` está
+instalado.
+
+* Las respuestas de un solo cuerpo se comprimen solo si miden al menos
+  `COMPRESION_MINIMO` bytes; las pequeñas no compensan el costo.
+* Las respuestas en *streaming* (NDJSON) se comprimen por partes: cada
+  fragmento se comprime y se vacía al cliente en cuanto llega, sin esperar el
+  final ni acumular el listado en memoria.
+
+Al comprimir se agrega `Vary: Accept-Encoding` y la `ETag` fuerte se vuelve
+débil (`W/"..."`), porque los bytes ya no son los de la representación
+original; las peticiones condicionales siguen funcionando porque `If-None-Match`
+usa comparación débil.
+
+Variables de entorno: `COMPRESION_ALGORITMOS` (por ejemplo `br,gzip`; vacío
+desactiva la compresión), `COMPRESION_MINIMO`, `COMPRESION_NIVEL_GZIP` y
+`COMPRESION_NIVEL_BROTLI`.
+"""
+
+import os
+import zlib
+from typing import Optional
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESION_ALGORITMOS = [
+    algoritmo.strip() for algoritmo in os.getenv("COMPRESION_ALGORITMOS", "br,gzip").split(",") if algoritmo.strip()
+]
+COMPRESION_MINIMO = int(os.getenv("COMPRESION_MINIMO", "1024"))
+COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", "6"))
+COMPRESION_NIVEL_BROTLI = int(os.getenv("COMPRESION_NIVEL_BROTLI", "4"))
+
+
+class CompresorGzip:
+    """
+    Compresor gzip incremental.
+    """
+
+    def __init__(self, nivel: int):
+        self._zlib = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        """
+        Comprimir un fragmento y vaciar lo comprimido hasta ahora.
+        """
+        return self._zlib.compress(datos) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def terminar(self) -> bytes:
+        """
+        Cerrar el flujo comprimido.
+        """
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompresorBrotli:
+    """
+    Compresor brotli incremental.
+    """
+
+    def __init__(self, nivel: int):
+        self._brotli = brotli.Compressor(quality=nivel)
+
+    def comprimir(self, datos: bytes) -> bytes:
+        """
+        Comprimir un fragmento y vaciar lo comprimido hasta ahora.
+        """
+        return self._brotli.process(datos) + self._brotli.flush()
+
+    def terminar(self) -> bytes:
+        """
+        Cerrar el flujo comprimido.
+        """
+        return self._brotli.finish()
+
+
+def elegirCodificacion(acceptEncoding: str, algoritmos: list[str]) -> Optional[str]:
+    """
+    Escoger el algoritmo aceptado por el cliente con mayor `q`; en empate, el
+    primero de `algoritmos`.
+    """
+    pesos = {}
+    for parte in acceptEncoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        peso = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                peso = float(parametros[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nombre.strip().lower()] = peso
+
+    candidatos = [
+        algoritmo for algoritmo in algoritmos
+        if pesos.get(algoritmo, pesos.get("*", 0.0)) > 0 and (algoritmo != "br" or brotli is not None)
+    ]
+    if not candidatos:
+        return None
+    return max(candidatos, key=lambda algoritmo: (pesos.get(algoritmo, pesos.get("*", 0.0)), -algoritmos.index(algoritmo)))
+
+
+class MiddlewareCompresion:
+    """
+    Middleware que comprime las respuestas HTTP con gzip o brotli.
+
+    Attributes:
+        algoritmos (list[str]): Algoritmos en orden de preferencia (`br`, `gzip`).
+        minimo (int): Tamaño mínimo en bytes de una respuesta para comprimirla.
+        nivelGzip (int): Nivel de compresión gzip (1 a 9).
+        nivelBrotli (int): Calidad de compresión brotli (0 a 11).
+    """
+
+    def __init__(
+        self,
+        app,
+        algoritmos: list[str] = COMPRESION_ALGORITMOS,
+        minimo: int = COMPRESION_MINIMO,
+        nivelGzip: int = COMPRESION_NIVEL_GZIP,
+        nivelBrotli: int = COMPRESION_NIVEL_BROTLI
+        ):
+        self.app = app
+        self.algoritmos = algoritmos
+        self.minimo = minimo
+        self.nivelGzip = nivelGzip
+        self.nivelBrotli = nivelBrotli
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.algoritmos:
+            await self.app(scope, receive, send)
+            return
+
+        codificacion = elegirCodificacion(Headers(scope=scope).get("accept-encoding", ""), self.algoritmos)
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+        compresor = None
+
+        async def enviar(mensaje):
+            nonlocal inicio, compresor
+
+            # Guardar el inicio hasta saber si el cuerpo se va a comprimir
+            if mensaje["type"] == "http.response.start":
+                inicio = mensaje
+                return
+            if mensaje["type"] != "http.response.body":
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            hayMas = mensaje.get("more_body", False)
+
+            # Primer fragmento: decidir si se comprime
+            if inicio is not None:
+                mensajeInicio, inicio = inicio, None
+                cabeceras = MutableHeaders(raw=mensajeInicio["headers"])
+                comprimible = (
+                    "content-encoding" not in cabeceras
+                    and mensajeInicio["status"] not in (204, 304)
+                    and (hayMas or len(cuerpo) >= self.minimo)
+                )
+                if comprimible:
+                    compresor = (
+                        CompresorBrotli(self.nivelBrotli) if codificacion == "br" else CompresorGzip(self.nivelGzip)
+                    )
+                    cabeceras["Content-Encoding"] = codificacion
+                    cabeceras.add_vary_header("Accept-Encoding")
+                    etag = cabeceras.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        cabeceras["ETag"] = f"W/{etag}"
+                    if "content-length" in cabeceras:
+                        del cabeceras["content-length"]
+                    if not hayMas:
+                        cuerpo = compresor.comprimir(cuerpo) + compresor.terminar()
+                        cabeceras["Content-Length"] = str(len(cuerpo))
+                        await send(mensajeInicio)
+                        await send({"type": "http.response.body", "body": cuerpo})
+                        return
+                await send(mensajeInicio)
+
+            if compresor is None:
+                await send(mensaje)
+                return
+
+            # Fragmento de una respuesta en streaming
+            comprimido = compresor.comprimir(cuerpo) if cuerpo else b""
+            if not hayMas:
+                comprimido += compresor.terminar()
+            await send({"type": "http.response.body", "body": comprimido, "more_body": hayMas})
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,87 @@
+"""
+Módulo: filtros
+---------------
+Construcción de consultas con filtros combinados, orden y paginación.
+
+Cada filtro recibido se convierte en una condición SQL y todas se unen con
+`AND` en un solo `WHERE`, así la base de datos escoge el índice más selectivo y
+la consulta se resuelve en un solo viaje. Los filtros que no se envían no
+agregan condición.
+
+Los enumerados se guardan por nombre (`UNO`, `SIETE_A_NUEVE`), por lo que para
+ordenar por ellos se usa su posición en el enumerado y no el texto guardado.
+"""
+
+from enum import Enum
+from typing import Optional
+from sqlmodel import select, case, and_
+
+# Caracter mayor que cualquier otro, para el limite superior de un prefijo
+FIN_PREFIJO = "\U0010ffff"
+
+
+def filtroValores(columna, valores: Optional[list]):
+    """
+    Condición de igualdad con uno o varios valores (`=` o `IN`).
+    """
+    if not valores:
+        return None
+    return columna == valores[0] if len(valores) == 1 else columna.in_(valores)
+
+
+def filtroPrefijo(columna, prefijo: Optional[str], dialecto: str):
+    """
+    Condición de texto que empieza por `prefijo`, en la forma que usa el índice
+    de la columna en cada motor (`dialecto` es `engine.dialect.name`).
+
+    En SQLite es un rango `>= prefijo` y `< prefijo + FIN_PREFIJO`, exacto con su
+    intercalación binaria; un `LIKE` no distingue mayúsculas y recorre la tabla.
+    En PostgreSQL el rango solo es correcto con una intercalación binaria, así
+    que se usa `LIKE 'prefijo%'` (con `%` y `_` escapados), que se resuelve con
+    los índices `text_pattern_ops` de los modelos.
+    """
+    if not prefijo:
+        return None
+    if dialecto == "sqlite":
+        return and_(columna >= prefijo, columna < prefijo + FIN_PREFIJO)
+    return columna.startswith(prefijo, autoescape=True)
+
+
+def ordenEnum(columna, enumerado: type[Enum]):
+    """
+    Expresión con la posición de cada valor del enumerado, para ordenar.
+    """
+    return case(*((columna == miembro, posicion) for posicion, miembro in enumerate(enumerado)))
+
+
+def patronOrden(columnas: dict) -> str:
+    """
+    Expresión regular con los valores válidos del parámetro de orden.
+    """
+    return f"^-?({'|'.join(columnas)})$"
+
+
+def consultaFiltrada(modelo, condiciones: list, columnas: dict, orden: str, limit: int, offset: int):
+
+    """
+    Construir la consulta de un modelo con filtros, orden y paginación.
+
+    Args:
+        modelo: Modelo de tabla con columna `id`.
+        condiciones (list): Condiciones SQL; las `None` se ignoran.
+        columnas (dict): Columnas o expresiones por las que se puede ordenar.
+        orden (str): Nombre de la columna, con `-` al inicio para orden descendente.
+        limit (int): Cantidad máxima de filas.
+        offset (int): Filas a omitir.
+
+    Returns:
+        Select: Consulta lista para ejecutar.
+    """
+
+    columna = columnas[orden.lstrip("-")]
+    consulta = select(modelo).where(*(condicion for condicion in condiciones if condicion is not None))
+    # Desempatar por id para que las paginas no se crucen
+    consulta = consulta.order_by(columna.desc() if orden.startswith("-") else columna.asc())
+    if columna is not modelo.id:
+        consulta = consulta.order_by(modelo.id)
+    return consulta.offset(offset).limit(limit)
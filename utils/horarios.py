@@ -0,0 +1,165 @@
+"""
+Módulo: horarios
+----------------
+Asignación de franjas horarias a los cursos del catálogo.
+
+El catálogo se modela como un grafo de conflictos: dos cursos están unidos si
+hay estudiantes que los quieren cursar a la vez, con un peso igual a la cantidad
+de esos estudiantes. Asignar horarios es colorear el grafo con las franjas de
+`HorarioCurso` minimizando:
+
+* los conflictos: suma de los pesos de los cursos unidos que quedan en la misma
+  franja (cada unidad es un estudiante con dos cursos a la misma hora), y
+* el desbalance: suma de los cuadrados de la cantidad de cursos por franja,
+  multiplicada por `pesoBalance`, que es mínima cuando las franjas tienen la
+  misma cantidad de cursos.
+
+Primero se construye una asignación voraz por grado (los cursos con más
+conflictos escogen franja primero) y después se mejora con búsqueda local,
+moviendo cada curso a la franja que más reduce el costo. La búsqueda local
+también parte de la asignación actual y se conserva la mejor de las dos, con
+preferencia por la actual en caso de empate para no mover cursos sin motivo.
+
+El grafo se guarda disperso (diccionarios de vecinos), así el costo de evaluar
+un movimiento es proporcional a los vecinos del curso y no al tamaño del
+catálogo.
+"""
+
+from collections import defaultdict
+from itertools import combinations
+
+
+def grafoConflictos(demandas) -> dict:
+    """
+    Construir el grafo de conflictos desde los cursos que quiere cada estudiante.
+
+    Args:
+        demandas: Iterable con el conjunto de códigos de curso de cada estudiante.
+
+    Returns:
+        dict: `{codigo: {vecino: peso}}` con el peso de cada par de cursos.
+    """
+    grafo = defaultdict(lambda: defaultdict(int))
+    for cursos in demandas:
+        for cursoA, cursoB in combinations(sorted(cursos), 2):
+            grafo[cursoA][cursoB] += 1
+            grafo[cursoB][cursoA] += 1
+    return grafo
+
+
+def costoAsignacion(asignacion: dict, grafo: dict, franjas: list, pesoBalance: float = 1.0):
+    """
+    Calcular los conflictos y el costo total de una asignación.
+
+    Args:
+        asignacion (dict): Franja de cada curso.
+        grafo (dict): Grafo de conflictos.
+        franjas (list): Franjas disponibles.
+        pesoBalance (float): Peso del desbalance entre franjas.
+
+    Returns:
+        tuple[int, float]: Conflictos (estudiantes con cruce) y costo total.
+    """
+    conflictos = sum(
+        peso
+        for curso, vecinos in grafo.items()
+        for vecino, peso in vecinos.items()
+        if curso < vecino and asignacion[curso] == asignacion[vecino]
+    )
+    cantidades = defaultdict(int)
+    for franja in asignacion.values():
+        cantidades[franja] += 1
+    desbalance = sum(cantidades[franja] ** 2 for franja in franjas)
+    return conflictos, conflictos + pesoBalance * desbalance
+
+
+def _asignacionVoraz(cursos: list, grafo: dict, franjas: list, pesoBalance: float) -> dict:
+    """
+    Asignar franjas de mayor a menor grado, cada curso a la franja más barata.
+    """
+    asignacion = {}
+    cantidades = dict.fromkeys(franjas, 0)
+    orden = sorted(cursos, key=lambda curso: -sum(grafo.get(curso, {}).values()))
+    for curso in orden:
+        choque = dict.fromkeys(franjas, 0)
+        for vecino, peso in grafo.get(curso, {}).items():
+            if vecino in asignacion:
+                choque[asignacion[vecino]] += peso
+        franja = min(franjas, key=lambda franja: choque[franja] + pesoBalance * (2 * cantidades[franja] + 1))
+        asignacion[curso] = franja
+        cantidades[franja] += 1
+    return asignacion
+
+
+def _busquedaLocal(asignacion: dict, grafo: dict, franjas: list, pesoBalance: float, maxPasadas: int) -> dict:
+    """
+    Mover cursos a la franja que más reduce el costo hasta no encontrar mejoras.
+    """
+    asignacion = dict(asignacion)
+    cantidades = dict.fromkeys(franjas, 0)
+    for franja in asignacion.values():
+        cantidades[franja] += 1
+
+    # Peso de los vecinos de cada curso en cada franja
+    choque = {curso: dict.fromkeys(franjas, 0) for curso in asignacion}
+    for curso, vecinos in grafo.items():
+        for vecino, peso in vecinos.items():
+            choque[curso][asignacion[vecino]] += peso
+
+    for _ in range(maxPasadas):
+        mejoro = False
+        for curso, actual in list(asignacion.items()):
+            choquesCurso = choque[curso]
+
+            def delta(franja):
+                return (
+                    choquesCurso[franja] - choquesCurso[actual]
+                    + pesoBalance * 2 * (cantidades[franja] - cantidades[actual] + 1)
+                )
+
+            mejor = min(franjas, key=delta)
+            if mejor == actual or delta(mejor) >= 0:
+                continue
+
+            # Aplicar el movimiento y actualizar los vecinos
+            asignacion[curso] = mejor
+            cantidades[actual] -= 1
+            cantidades[mejor] += 1
+            for vecino, peso in grafo.get(curso, {}).items():
+                choque[vecino][actual] -= peso
+                choque[vecino][mejor] += peso
+            mejoro = True
+        if not mejoro:
+            break
+    return asignacion
+
+
+def optimizarHorarios(
+    actual: dict,
+    grafo: dict,
+    franjas: list,
+    pesoBalance: float = 1.0,
+    maxPasadas: int = 50
+    ) -> dict:
+
+    """
+    Asignar una franja a cada curso minimizando conflictos y desbalance.
+
+    Args:
+        actual (dict): Franja actual de cada curso.
+        grafo (dict): Grafo de conflictos de `grafoConflictos`.
+        franjas (list): Franjas disponibles.
+        pesoBalance (float): Peso del desbalance entre franjas frente a un conflicto.
+        maxPasadas (int): Máximo de pasadas de búsqueda local sobre el catálogo.
+
+    Returns:
+        dict: Nueva franja de cada curso.
+    """
+
+    desdeActual = _busquedaLocal(actual, grafo, franjas, pesoBalance, maxPasadas)
+    voraz = _busquedaLocal(
+        _asignacionVoraz(list(actual), grafo, franjas, pesoBalance), grafo, franjas, pesoBalance, maxPasadas
+    )
+    costoActual = costoAsignacion(desdeActual, grafo, franjas, pesoBalance)[1]
+    costoVoraz = costoAsignacion(voraz, grafo, franjas, pesoBalance)[1]
+    return voraz if costoVoraz < costoActual else desdeActual
@@ -0,0 +1,120 @@
+"""
+Módulo: idempotencia
+--------------------
+Soporte para la cabecera `Idempotency-Key` en los endpoints que cambian el
+estado de una matrícula.
+
+Cuando un cliente reintenta una petición (por ejemplo después de un *timeout*)
+con la misma llave, se devuelve la respuesta guardada del primer intento sin
+volver a validar ni tocar la tabla `Matricula`. Las respuestas se guardan en una
+`CacheLRU` en memoria, configurable con `IDEMPOTENCIA_TAMANO` (cantidad de
+llaves) e `IDEMPOTENCIA_TTL` (segundos, 24 horas por defecto).
+
+Mientras una petición con llave se está procesando, la llave queda reservada:
+un reintento simultáneo con la misma llave recibe 409 en lugar de ejecutar la
+operación otra vez. La reserva se libera al terminar la petición, también si
+falla, de modo que un reintento posterior devuelve la respuesta guardada o, si
+el primer intento falló, vuelve a ejecutar la operación. Como la caché, la
+reserva es local a cada proceso.
+"""
+
+import os
+import threading
+from typing import Annotated, Optional
+from fastapi import Depends, Header, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from .cache import CacheLRU
+
+cacheIdempotencia = CacheLRU(
+    tamanoMaximo=int(os.getenv("IDEMPOTENCIA_TAMANO", "10000")),
+    ttl=float(os.getenv("IDEMPOTENCIA_TTL", "86400"))
+)
+
+# Llaves de las peticiones que se estan procesando
+llavesEnCurso = set()
+lockLlavesEnCurso = threading.Lock()
+
+
+def reservarLlaveIdempotencia(idempotencyKey: Optional[str] = Header(default=None, alias="Idempotency-Key")):
+
+    """
+    Dependencia que reserva la llave de idempotencia mientras dura la petición.
+
+    Args:
+        idempotencyKey (Optional[str]): Valor de la cabecera `Idempotency-Key`.
+
+    Yields:
+        Optional[str]: La llave reservada, o `None` si no se envió.
+
+    Raises:
+        HTTPException: 409 si otra petición con la misma llave se está procesando.
+    """
+
+    if idempotencyKey is None:
+        yield None
+        return
+
+    with lockLlavesEnCurso:
+        if idempotencyKey in llavesEnCurso:
+            raise HTTPException(409, "Ya se esta procesando una peticion con esa Idempotency-Key")
+        llavesEnCurso.add(idempotencyKey)
+
+    try:
+        yield idempotencyKey
+    finally:
+        with lockLlavesEnCurso:
+            llavesEnCurso.discard(idempotencyKey)
+
+
+LlaveIdempotencia = Annotated[Optional[str], Depends(reservarLlaveIdempotencia)]
+
+
+def respuestaIdempotente(clave: Optional[str], operacion: str, parametros: tuple) -> Optional[JSONResponse]:
+
+    """
+    Obtener la respuesta guardada para una llave de idempotencia.
+
+    Args:
+        clave (Optional[str]): Valor de la cabecera `Idempotency-Key`.
+        operacion (str): Nombre de la operación que recibe la petición.
+        parametros (tuple): Parámetros de la petición.
+
+    Returns:
+        Optional[JSONResponse]: La respuesta del primer intento, o `None` si no hay.
+
+    Raises:
+        HTTPException: 422 si la llave ya se usó con otra operación o parámetros.
+    """
+
+    if clave is None:
+        return None
+
+    guardada = cacheIdempotencia.obtener(clave)
+    if guardada is None:
+        return None
+
+    operacionGuardada, parametrosGuardados, status, contenido = guardada
+    if (operacionGuardada, parametrosGuardados) != (operacion, parametros):
+        raise HTTPException(422, "La Idempotency-Key ya se uso con otra peticion")
+
+    return JSONResponse(contenido, status_code=status)
+
+
+def guardarRespuestaIdempotente(clave: Optional[str], operacion: str, parametros: tuple, status: int, respuesta):
+
+    """
+    Guardar la respuesta exitosa de una petición con llave de idempotencia.
+
+    Args:
+        clave (Optional[str]): Valor de la cabecera `Idempotency-Key`.
+        operacion (str): Nombre de la operación que recibe la petición.
+        parametros (tuple): Parámetros de la petición.
+        status (int): Código de estado de la respuesta.
+        respuesta: Objeto devuelto por el endpoint.
+    """
+
+    if clave is None:
+        return
+
+    cacheIdempotencia.guardar(clave, (operacion, parametros, status, jsonable_encoder(respuesta)))
@@ -0,0 +1,28 @@
+"""
+Módulo: lotes
+-------------
+Utilidades para procesar iterables grandes en fragmentos de tamaño fijo.
+
+Se usan en las operaciones masivas para limitar la cantidad de parámetros de
+cada consulta `IN (...)` y el tamaño de cada transacción.
+"""
+
+from itertools import islice
+
+
+def fragmentar(iterable, tamano: int):
+
+    """
+    Dividir un iterable en listas de máximo `tamano` elementos.
+
+    Args:
+        iterable: Elementos a dividir (puede ser un generador).
+        tamano (int): Cantidad máxima de elementos por fragmento.
+
+    Yields:
+        list: Fragmento con los siguientes elementos del iterable.
+    """
+
+    iterador = iter(iterable)
+    while fragmento := list(islice(iterador, tamano)):
+        yield fragmento
@@ -0,0 +1,218 @@
+"""
+Módulo: metricas
+----------------
+Métricas por ruta de la aplicación en formato Prometheus.
+
+Un middleware ASGI mide cada petición y la registra con la plantilla de la ruta
+(`/curso/{codigo}/estudiantes`, no la URL concreta, para que la cantidad de
+series no crezca con los datos):
+
+* histograma de latencia (`http_request_duration_seconds`),
+* respuestas por código de estado (`http_responses_total`),
+* sentencias SQL ejecutadas y tiempo en la base de datos
+  (`db_statements_total` y `db_duration_seconds_total`).
+
+Las sentencias se cuentan con los eventos `before_cursor_execute` y
+`after_cursor_execute` del motor. La medición de la petición viaja en una
+`ContextVar`, que FastAPI copia al hilo del *threadpool* que ejecuta el
+*endpoint*, así cada consulta se suma a la petición que la hizo sin pasar nada
+por los routers.
+
+Con `METRICAS_SERVER_TIMING=1` cada respuesta incluye además la cabecera
+`Server-Timing` con el tiempo en la base de datos y el total, que los
+navegadores muestran en sus herramientas de desarrollo.
+
+Las métricas son locales a cada proceso; con varios *workers* Prometheus debe
+consultar cada uno.
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Optional
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+METRICAS_SERVER_TIMING = os.getenv("METRICAS_SERVER_TIMING", "0") == "1"
+
+# Limites superiores (segundos) de los buckets del histograma de latencia
+LIMITES_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+TIPO_CONTENIDO_PROMETHEUS = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class MedicionPeticion:
+    """
+    Sentencias SQL y tiempo en la base de datos de una petición.
+    """
+    __slots__ = ("consultas", "tiempoDB")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempoDB = 0.0
+
+
+peticionActual: ContextVar[Optional[MedicionPeticion]] = ContextVar("peticionActual", default=None)
+
+
+def _etiqueta(valor) -> str:
+    """
+    Escapar el valor de una etiqueta de Prometheus.
+    """
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RegistroMetricas:
+    """
+    Acumulado de las mediciones por ruta, seguro para varios hilos.
+
+    Attributes:
+        limites (tuple): Límites de los buckets de latencia en segundos.
+    """
+
+    def __init__(self, limites: tuple = LIMITES_LATENCIA):
+        self.limites = limites
+        # (metodo, ruta) -> [buckets, cantidad, suma, consultas, tiempoDB, {estado: cantidad}]
+        self._rutas = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, metodo: str, ruta: str, estado: int, duracion: float, consultas: int, tiempoDB: float):
+        """
+        Sumar la medición de una petición terminada.
+        """
+        bucket = bisect_left(self.limites, duracion)
+        with self._lock:
+            datos = self._rutas.get((metodo, ruta))
+            if datos is None:
+                datos = self._rutas[(metodo, ruta)] = [[0] * (len(self.limites) + 1), 0, 0.0, 0, 0.0, {}]
+            datos[0][bucket] += 1
+            datos[1] += 1
+            datos[2] += duracion
+            datos[3] += consultas
+            datos[4] += tiempoDB
+            estados = datos[5]
+            estados[estado] = estados.get(estado, 0) + 1
+
+    def limpiar(self):
+        """
+        Eliminar todas las mediciones acumuladas.
+        """
+        with self._lock:
+            self._rutas.clear()
+
+    def exportar(self) -> str:
+        """
+        Generar el texto de las métricas en el formato de exposición de Prometheus.
+        """
+        with self._lock:
+            rutas = {clave: [list(datos[0]), *datos[1:5], dict(datos[5])] for clave, datos in self._rutas.items()}
+
+        lineas = [
+            "# HELP http_request_duration_seconds Latencia de las peticiones por ruta.",
+            "# TYPE http_request_duration_seconds histogram"
+        ]
+        for (metodo, ruta), (buckets, cantidad, suma, _, _, _) in sorted(rutas.items()):
+            etiquetas = f'method="{_etiqueta(metodo)}",route="{_etiqueta(ruta)}"'
+            acumulado = 0
+            for limite, valor in zip((*self.limites, "+Inf"), buckets):
+                acumulado += valor
+                lineas.append(f'http_request_duration_seconds_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+            lineas.append(f"http_request_duration_seconds_sum{{{etiquetas}}} {suma}")
+            lineas.append(f"http_request_duration_seconds_count{{{etiquetas}}} {cantidad}")
+
+        lineas += [
+            "# HELP http_responses_total Respuestas por ruta y codigo de estado.",
+            "# TYPE http_responses_total counter"
+        ]
+        for (metodo, ruta), datos in sorted(rutas.items()):
+            for estado, cantidad in sorted(datos[5].items()):
+                lineas.append(
+                    f'http_responses_total{{method="{_etiqueta(metodo)}",route="{_etiqueta(ruta)}",status="{estado}"}} {cantidad}'
+                )
+
+        lineas += [
+            "# HELP db_statements_total Sentencias SQL ejecutadas por ruta.",
+            "# TYPE db_statements_total counter"
+        ]
+        for (metodo, ruta), datos in sorted(rutas.items()):
+            lineas.append(f'db_statements_total{{method="{_etiqueta(metodo)}",route="{_etiqueta(ruta)}"}} {datos[3]}')
+
+        lineas += [
+            "# HELP db_duration_seconds_total Tiempo en la base de datos por ruta.",
+            "# TYPE db_duration_seconds_total counter"
+        ]
+        for (metodo, ruta), datos in sorted(rutas.items()):
+            lineas.append(f'db_duration_seconds_total{{method="{_etiqueta(metodo)}",route="{_etiqueta(ruta)}"}} {datos[4]}')
+
+        return "\n".join(lineas) + "\n"
+
+
+registroMetricas = RegistroMetricas()
+
+
+def instrumentarEngine(engine):
+    """
+    Registrar los eventos del motor que cuentan las sentencias de cada petición.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def iniciarSentencia(conexion, cursor, sentencia, parametros, contexto, executemany):
+        if peticionActual.get() is not None:
+            conexion.info["inicioSentencia"] = perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def terminarSentencia(conexion, cursor, sentencia, parametros, contexto, executemany):
+        medicion = peticionActual.get()
+        inicio = conexion.info.pop("inicioSentencia", None)
+        if medicion is not None and inicio is not None:
+            medicion.consultas += 1
+            medicion.tiempoDB += perf_counter() - inicio
+
+
+class MiddlewareMetricas:
+    """
+    Middleware que mide cada petición y la registra por ruta.
+
+    Attributes:
+        registro (RegistroMetricas): Registro donde se acumulan las mediciones.
+        serverTiming (bool): Agregar la cabecera `Server-Timing` a las respuestas.
+    """
+
+    def __init__(self, app, registro: RegistroMetricas = registroMetricas, serverTiming: bool = METRICAS_SERVER_TIMING):
+        self.app = app
+        self.registro = registro
+        self.serverTiming = serverTiming
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        medicion = MedicionPeticion()
+        token = peticionActual.set(medicion)
+        inicio = perf_counter()
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                if self.serverTiming:
+                    MutableHeaders(scope=mensaje).append(
+                        "Server-Timing",
+                        f'db;dur={medicion.tiempoDB * 1000:.2f};desc="{medicion.consultas} consultas", '
+                        f"total;dur={(perf_counter() - inicio) * 1000:.2f}"
+                    )
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            peticionActual.reset(token)
+            # Plantilla de la ruta que atendio la peticion (FastAPI la deja en el scope)
+            ruta = getattr(scope.get("route"), "path", "sin_ruta")
+            self.registro.registrar(
+                scope["method"], ruta, estado, perf_counter() - inicio, medicion.consultas, medicion.tiempoDB
+            )
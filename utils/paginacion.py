@@ -0,0 +1,125 @@
+"""
+Módulo: paginacion
+------------------
+Utilidades para paginar los listados por llave (*keyset*) sobre `id` y para
+transmitirlos como NDJSON.
+
+La paginación por llave usa `WHERE id > after ORDER BY id LIMIT n`, que se
+resuelve con la llave primaria sin importar qué tan adelante esté la página.
+El siguiente cursor se envía en la cabecera `X-Siguiente-Cursor`, así el cuerpo
+de la respuesta conserva el mismo formato de lista.
+"""
+
+from typing import Optional
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from sqlmodel import select
+from .serializacion import camposRespuesta, codificarJSON
+
+CABECERA_CURSOR = "X-Siguiente-Cursor"
+CABECERA_TOTAL = "X-Total-Resultados"
+TAMANO_LOTE_NDJSON = 500
+
+
+def consultaPorLlave(
+    modelo,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+    columnas: Optional[list] = None,
+    origen=None
+    ):
+
+    """
+    Construir la consulta ordenada por `id` a partir de un cursor.
+
+    Args:
+        modelo: Modelo de tabla con columna `id`.
+        after (Optional[int]): Último `id` recibido; se devuelven los siguientes.
+        limit (Optional[int]): Cantidad máxima de filas.
+        columnas (Optional[list]): Columnas a consultar en lugar del modelo
+            completo; las filas se devuelven como tuplas.
+        origen: `FROM` explícito, por ejemplo un *join* con las tablas de otras
+            columnas de `columnas`.
+
+    Returns:
+        Select: Consulta lista para ejecutar.
+    """
+
+    consulta = (select(*columnas) if columnas else select(modelo)).order_by(modelo.id)
+    if origen is not None:
+        consulta = consulta.select_from(origen)
+    if after is not None:
+        consulta = consulta.where(modelo.id > after)
+    if limit is not None:
+        consulta = consulta.limit(limit)
+    return consulta
+
+
+def paginaPorLlave(
+    session,
+    modelo,
+    response: Response,
+    limit: Optional[int],
+    after: Optional[int],
+    columnas: Optional[list] = None,
+    origen=None
+    ):
+
+    """
+    Obtener una página de filas y publicar el siguiente cursor si hay más.
+
+    Se pide una fila extra para saber si existe una página siguiente sin hacer
+    una consulta de conteo.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        modelo: Modelo de tabla con columna `id`.
+        response (Response): Respuesta donde se agrega la cabecera del cursor.
+        limit (Optional[int]): Tamaño de la página; sin límite devuelve todo.
+        after (Optional[int]): Último `id` recibido.
+        columnas (Optional[list]): Columnas a consultar (deben incluir `id`).
+        origen: `FROM` explícito de la consulta (ver `consultaPorLlave`).
+
+    Returns:
+        list: Filas de la página.
+    """
+
+    if limit is None:
+        return session.exec(consultaPorLlave(modelo, after, columnas=columnas, origen=origen)).all()
+
+    filas = session.exec(consultaPorLlave(modelo, after, limit + 1, columnas, origen)).all()
+    if len(filas) > limit:
+        filas = filas[:limit]
+        response.headers[CABECERA_CURSOR] = str(filas[-1].id)
+    return filas
+
+
+def respuestaNDJSON(session, consulta, modelo, headers=None):
+
+    """
+    Transmitir el resultado de una consulta como NDJSON (un objeto JSON por línea).
+
+    Las filas se leen del cursor en lotes de `TAMANO_LOTE_NDJSON` y cada lote se
+    envía como un solo fragmento, así la memoria usada no depende del tamaño de
+    la tabla y cada fragmento se comprime completo. Cada línea se codifica igual
+    que `RespuestaFilas`, con las claves en el orden de los campos del modelo.
+
+    Args:
+        session (SessionDep): Sesión de base de datos.
+        consulta (Select): Consulta a transmitir, con las columnas de
+            `columnasRespuesta(modelo)`.
+        modelo: Modelo de las filas.
+        headers (Optional[Mapping]): Cabeceras adicionales de la respuesta.
+
+    Returns:
+        StreamingResponse: Respuesta con tipo `application/x-ndjson`.
+    """
+
+    campos = camposRespuesta(modelo)
+
+    def generarLineas():
+        filas = session.exec(consulta.execution_options(yield_per=TAMANO_LOTE_NDJSON))
+        for lote in filas.partitions():
+            yield b"".join(codificarJSON(dict(zip(campos, fila))) + b"\n" for fila in lote)
+
+    return StreamingResponse(generarLineas(), media_type="application/x-ndjson", headers=headers)
@@ -0,0 +1,117 @@
+"""
+Módulo: serializacion
+---------------------
+Serialización rápida de listados a JSON desde tuplas de la base de datos.
+
+Con `response_model`, FastAPI construye un objeto por fila, lo valida otra vez
+contra el modelo de respuesta y después lo convierte a JSON. Para listados
+grandes es más barato consultar solo las columnas del modelo (tuplas en lugar
+de objetos del ORM) y codificarlas directamente.
+
+Los enumerados se guardan por nombre (`UNO`) y se responden por valor (`"1"`),
+así que sus columnas se consultan con un `CASE` que ya devuelve el valor y las
+filas no se convierten en Python.
+
+Con `relacionados` se agregan a cada fila las columnas de otros modelos (unidos
+en la misma consulta), que se responden anidadas bajo su nombre, o `null` si la
+fila no tiene registro relacionado.
+
+Cada valor se codifica igual que en FastAPI: enumerados por su valor, fechas en
+ISO 8601 y JSON sin espacios ni escapes de caracteres no ASCII. Las claves salen
+en el orden en que se declaran los campos del modelo. Si está instalado `orjson`
+se usa como codificador; si no, se usa `json` de la librería estándar con las
+mismas opciones que `JSONResponse`.
+"""
+
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+from fastapi import Response
+from sqlmodel import case
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def camposRespuesta(modelo) -> list[str]:
+    """
+    Nombres de los campos del modelo en el orden de su respuesta JSON.
+    """
+    return list(modelo.model_fields)
+
+
+def columnaRespuesta(columna):
+    """
+    Columna lista para la respuesta: los enumerados se devuelven por su valor.
+    """
+    enumerado = getattr(columna.type, "enum_class", None)
+    if enumerado is None:
+        return columna
+    return case(*((columna == miembro, miembro.value) for miembro in enumerado)).label(columna.key)
+
+
+def columnasRespuesta(modelo, relacionados: Optional[dict] = None) -> list:
+    """
+    Columnas de la tabla del modelo en el orden de su respuesta JSON, seguidas de
+    las de cada modelo de `relacionados` (nombre en la respuesta: modelo).
+    """
+    columnas = [columnaRespuesta(getattr(modelo, campo)) for campo in camposRespuesta(modelo)]
+    for nombre, relacionado in (relacionados or {}).items():
+        columnas += [
+            columnaRespuesta(getattr(relacionado, campo)).label(f"{nombre}_{campo}")
+            for campo in camposRespuesta(relacionado)
+        ]
+    return columnas
+
+
+def _convertir(valor):
+    """
+    Convertir los tipos que `json` no conoce igual que lo hace FastAPI.
+    """
+    if isinstance(valor, Enum):
+        return valor.value
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f"No se puede convertir {type(valor).__name__} a JSON")
+
+
+def codificarJSON(contenido) -> bytes:
+    """
+    Codificar a JSON compacto en UTF-8.
+    """
+    if orjson is not None:
+        return orjson.dumps(contenido)
+    return json.dumps(
+        contenido, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_convertir
+    ).encode("utf-8")
+
+
+class RespuestaFilas(Response):
+    """
+    Respuesta JSON de una lista de filas (tuplas) con las columnas de un modelo y,
+    si se indican, las de sus modelos `relacionados` (ver `columnasRespuesta`).
+    """
+    media_type = "application/json"
+
+    def __init__(self, filas, modelo, headers=None, relacionados: Optional[dict] = None):
+        self.campos = camposRespuesta(modelo)
+        self.relacionados = [(nombre, camposRespuesta(relacionado)) for nombre, relacionado in (relacionados or {}).items()]
+        super().__init__(filas, headers=headers)
+
+    def render(self, filas) -> bytes:
+        if not self.relacionados:
+            return codificarJSON([dict(zip(self.campos, fila)) for fila in filas])
+
+        objetos = []
+        for fila in filas:
+            objeto = dict(zip(self.campos, fila))
+            posicion = len(self.campos)
+            for nombre, campos in self.relacionados:
+                valores = fila[posicion:posicion + len(campos)]
+                posicion += len(campos)
+                objeto[nombre] = dict(zip(campos, valores)) if any(valor is not None for valor in valores) else None
+            objetos.append(objeto)
+        return codificarJSON(objetos)
@@ -0,0 +1,148 @@
+"""
+Módulo: versiones
+-----------------
+Versiones de tabla para responder peticiones HTTP condicionales.
+
+Cada tabla cacheable lleva un contador que los *endpoints* de escritura
+incrementan después de guardar los cambios. Los listados publican la versión en
+una `ETag` débil (y la fecha del último cambio en `Last-Modified`), y cuando el
+cliente la devuelve en `If-None-Match` (o `If-Modified-Since`) y no hubo cambios
+se responde `304 Not Modified` sin consultar la base de datos ni serializar nada.
+
+La `ETag` es débil porque identifica el contenido y no los bytes: así es la misma
+con o sin compresión y en la respuesta `304`. `Last-Modified` solo tiene
+segundos, mientras que la fecha del cambio se guarda completa; la cabecera se
+redondea hacia arriba cuando ese segundo ya pasó, y un cambio posterior a la
+fecha que envía el cliente en `If-Modified-Since` siempre invalida la copia,
+aunque ocurra en el mismo segundo.
+
+El contador es local a cada proceso, como las cachés de `CacheLRU`. Para que un
+proceso que no recibió la escritura no siga respondiendo `304` indefinidamente,
+la `ETag` incluye el periodo de `ttl` segundos en curso: al cambiar de periodo
+la `ETag` cambia y el cliente vuelve a recibir los datos, así la respuesta nunca
+está más desactualizada que la caché de la misma tabla.
+"""
+
+import math
+import secrets
+import threading
+from email.utils import formatdate, parsedate_to_datetime
+from time import time
+from typing import Optional
+from fastapi import Response
+
+
+class VersionTabla:
+    """
+    Contador de cambios de una tabla con su `ETag` y fecha de modificación.
+
+    Attributes:
+        nombre (str): Nombre de la tabla, incluido en la `ETag`.
+        ttl (float): Segundos que una versión se considera válida (0 para siempre).
+        maxAge (int): Segundos de `Cache-Control: max-age` en las respuestas.
+        version (int): Cantidad de cambios desde que inició el proceso.
+        modificado (float): Segundos *epoch* del último cambio (o del inicio).
+    """
+
+    def __init__(self, nombre: str, ttl: float, maxAge: int = 0):
+        self.nombre = nombre
+        self.ttl = ttl
+        self.maxAge = maxAge
+        self.version = 0
+        self.modificado = time()
+        # Distingue las ETag de procesos distintos o de un reinicio
+        self._arranque = secrets.token_hex(4)
+        self._lock = threading.Lock()
+
+    def incrementar(self):
+        """
+        Registrar un cambio en la tabla. Llamar después del `commit`.
+        """
+        with self._lock:
+            self.version += 1
+            self.modificado = time()
+
+    def estado(self) -> tuple[str, float, int]:
+        """
+        Obtener la `ETag`, la fecha de modificación y los segundos *epoch* que se
+        publican en `Last-Modified`.
+
+        Se debe tomar antes de consultar la base de datos: si hay una escritura
+        mientras tanto, la `ETag` entregada ya no coincide y el cliente recibe los
+        datos nuevos en la siguiente petición.
+        """
+        with self._lock:
+            ahora = time()
+            version, modificado = self.version, self.modificado
+        if self.ttl > 0:
+            periodo = int(ahora // self.ttl)
+            modificado = max(modificado, periodo * self.ttl)
+        else:
+            periodo = 0
+        # Redondear hacia arriba solo si ese segundo ya paso: los cambios siguientes
+        # quedan despues de la fecha publicada
+        segundos = math.ceil(modificado)
+        if segundos >= ahora:
+            segundos = math.floor(modificado)
+        return f'W/"{self.nombre}-{self._arranque}-{version}-{periodo}"', modificado, segundos
+
+    def cabeceras(self, etag: str, segundos: int) -> dict:
+        """
+        Cabeceras de caché HTTP para una respuesta con la versión dada.
+        """
+        return {
+            "ETag": etag,
+            "Last-Modified": formatdate(segundos, usegmt=True),
+            "Cache-Control": f"max-age={self.maxAge}, must-revalidate"
+        }
+
+
+def coincideETag(ifNoneMatch: str, etag: str) -> bool:
+    """
+    Validar si `If-None-Match` contiene la `ETag` (comparación débil, RFC 9110).
+    """
+    for candidata in ifNoneMatch.split(","):
+        candidata = candidata.strip()
+        if candidata == "*" or candidata.removeprefix("W/") == etag.removeprefix("W/"):
+            return True
+    return False
+
+
+def respuestaCondicional(
+    version: VersionTabla,
+    response: Response,
+    ifNoneMatch: Optional[str],
+    ifModifiedSince: Optional[str]
+    ) -> Optional[Response]:
+
+    """
+    Publicar las cabeceras de caché y, si el cliente ya tiene la versión actual,
+    construir la respuesta `304`.
+
+    Args:
+        version (VersionTabla): Versión de la tabla consultada.
+        response (Response): Respuesta donde se agregan las cabeceras.
+        ifNoneMatch (Optional[str]): Cabecera `If-None-Match` de la petición.
+        ifModifiedSince (Optional[str]): Cabecera `If-Modified-Since`; solo se usa
+            si no llega `If-None-Match`.
+
+    Returns:
+        Optional[Response]: Respuesta `304 Not Modified`, o `None` si hay que
+            responder con los datos.
+    """
+
+    etag, modificado, segundos = version.estado()
+    cabeceras = version.cabeceras(etag, segundos)
+    response.headers.update(cabeceras)
+
+    if ifNoneMatch is not None:
+        noModificado = coincideETag(ifNoneMatch, etag)
+    elif ifModifiedSince is not None:
+        try:
+            noModificado = modificado <= parsedate_to_datetime(ifModifiedSince).timestamp()
+        except (TypeError, ValueError):
+            noModificado = False
+    else:
+        noModificado = False
+
+    return Response(status_code=304, headers=cabeceras) if noModificado else None